@@ -1,26 +1,93 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db, ErrorLog
+from app.core.wire import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, encode_response, read_model
+from app.core.writer import write_session
 from app.services.rag import analyze_error
+from app.services.tags import filter_by_tags, get_tag_counts
+from app.services.records import save_error_record
+from app.services.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    request_fingerprint,
+    run_once
+)
+from app.services.counters import count_errors
+from app.services import jobs
+from app.services.cache import detail_cache
+from app.services.pagination import keyset_page, encode_cursor
+import asyncio
+import hashlib
 import uuid
 import json
+import orjson
 
 router = APIRouter()
 
+# 목록에서 쓰는 컬럼 (큰 텍스트 컬럼은 읽지 않음)
+LIST_COLUMNS = (
+    ErrorLog.id,
+    ErrorLog.case_name,
+    ErrorLog.command,
+    ErrorLog.tags,
+    ErrorLog.created_at,
+)
+
+# 상세 조회에서 fields=로 고를 수 있는 필드
+DETAIL_FIELDS = (
+    "id",
+    "case_name",
+    "command",
+    "error_log",
+    "code_snippet",
+    "file_path",
+    "line_number",
+    "ai_solution",
+    "root_cause",
+    "tags",
+    "created_at",
+)
+
+# Idempotency-Key 헤더 최대 길이
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+# code_frames로 받는 최대 프레임 수 (프롬프트가 너무 길어지지 않게)
+MAX_CODE_FRAMES = 5
+
+# 보존 정책이 원본 로그를 아카이브할 때 비우는 필드
+STRIPPED_FIELDS = {"error_log", "code_snippet"}
+
+# If-None-Match로 304를 돌려준 횟수 (본문을 보내지 않음)
+detail_not_modified = 0
+
+# 이 프로세스에서 처리 중인 동기 분석 요청 수 (analysis_sync_max_inflight를 넘으면 429)
+sync_inflight = 0
+
 
 class CodeContext(BaseModel):
     file_path: str
     line_number: int
     code_snippet: str
     language: str = "python"
+    function: Optional[str] = None
 
 
 class AnalyzeRequest(BaseModel):
     command: str
     error_log: str
+    # 에러가 난 위치 (code_frames를 모르는 예전 클라이언트도 보냄)
     code_context: Optional[CodeContext] = None
+    # 에러 위치부터 바깥쪽 호출 순서의 사용자 코드 프레임들 (첫 번째가 에러 위치)
+    # MAX_CODE_FRAMES개보다 많이 보내면 거절하지 않고 에러 위치에 가까운 것만 씀
+    code_frames: List[CodeContext] = Field(default_factory=list)
+
+    @field_validator("code_frames")
+    @classmethod
+    def _limit_code_frames(cls, frames: List[CodeContext]) -> List[CodeContext]:
+        return frames[:MAX_CODE_FRAMES]
 
 
 class SimilarCase(BaseModel):
@@ -38,76 +105,246 @@ class AnalyzeResponse(BaseModel):
     similar_cases: List[SimilarCase]
 
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_error_endpoint(
-    request: AnalyzeRequest,
-    db: Session = Depends(get_db)
-):
+@router.post(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON_MEDIA_TYPE: {"schema": AnalyzeRequest.model_json_schema()},
+                MSGPACK_MEDIA_TYPE: {"schema": AnalyzeRequest.model_json_schema()}
+            }
+        }
+    }
+)
+async def analyze_error_endpoint(http_request: Request):
     """
     AI로 에러 로그를 분석하고 데이터베이스에 저장함
+
+    본문은 JSON 또는 msgpack(Content-Type: application/msgpack)이고 gzip으로 압축해도 됨
+    응답은 Accept 헤더에 따라 JSON 또는 msgpack으로 돌려줌
+
+    Idempotency-Key 헤더가 있으면 같은 키로 다시 온 요청에는 분석을 다시 하지 않고
+    저장된 결과를 돌려줌 (Idempotent-Replayed: true). 처리 중이면 끝날 때까지 기다림
+
+    Prefer: respond-async 헤더가 있으면 분석을 큐에 넣고 바로 202와 작업을 돌려줌
+    (Location: /api/jobs/{job_id}에서 결과를 가져옴). 큐가 가득 찼거나 동기 요청이
+    너무 많이 처리 중이면 429와 Retry-After를 돌려줌
     """
-    try:
-        # 고유 ID 생성
-        error_id = str(uuid.uuid4())
+    global sync_inflight
 
-        # RAG로 에러 분석
-        analysis = await analyze_error(
-            error_log=request.error_log,
-            code_context=request.code_context.dict() if request.code_context else None
-        )
+    request = await read_model(http_request, AnalyzeRequest)
 
-        # 데이터베이스에 저장
-        error_record = ErrorLog(
-            id=error_id,
-            case_name=analysis["case_name"],
-            command=request.command,
-            error_log=request.error_log,
-            code_snippet=request.code_context.code_snippet if request.code_context else None,
-            file_path=request.code_context.file_path if request.code_context else None,
-            line_number=request.code_context.line_number if request.code_context else None,
-            ai_solution=analysis["solution"],
-            root_cause=analysis["root_cause"],
-            tags=json.dumps(analysis["tags"]),
-            vector_id=analysis.get("vector_id")
-        )
+    idempotency_key = http_request.headers.get("idempotency-key")
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="잘못된 Idempotency-Key")
 
-        db.add(error_record)
-        db.commit()
+    if "respond-async" in http_request.headers.get("prefer", ""):
+        return await _enqueue_analysis(http_request, request, idempotency_key)
 
-        return AnalyzeResponse(
-            id=error_id,
-            case_name=analysis["case_name"],
-            root_cause=analysis["root_cause"],
-            solution=analysis["solution"],
-            tags=analysis["tags"],
-            similar_cases=analysis.get("similar_cases", [])
+    if sync_inflight >= settings.analysis_sync_max_inflight:
+        raise HTTPException(
+            status_code=429,
+            detail="처리 중인 분석 요청이 너무 많음",
+            # 동기 요청은 모두 동시에 처리 중이므로 하나가 끝날 때쯤 다시 보내게 함
+            headers={"Retry-After": str(jobs.retry_after(sync_inflight, sync_inflight))}
         )
 
+    sync_inflight += 1
+    try:
+        return await _analyze_now(http_request, request, idempotency_key)
+    finally:
+        sync_inflight -= 1
+
+
+async def _analyze_now(http_request: Request, request: AnalyzeRequest, idempotency_key: Optional[str]) -> Response:
+    """요청을 바로 분석하고 결과를 돌려줌"""
+    try:
+        if idempotency_key:
+            result, replayed = await run_once(
+                idempotency_key,
+                request_fingerprint(request.model_dump()),
+                lambda: _analyze_and_store(request)
+            )
+        else:
+            result, replayed = await _analyze_and_store(request), False
+
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="같은 Idempotency-Key로 다른 요청을 보냄"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="같은 Idempotency-Key의 요청이 아직 처리 중",
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # 분석 결과는 서버에서 만든 값이므로 AnalyzeResponse로 다시 검증하지 않고 바로 직렬화함
+    return encode_response(
+        http_request,
+        result,
+        headers={"Idempotent-Replayed": "true"} if replayed else None
+    )
+
+
+async def _enqueue_analysis(http_request: Request, request: AnalyzeRequest, idempotency_key: Optional[str]) -> Response:
+    """요청을 분석 큐에 넣고 202와 작업을 돌려줌"""
+    payload = request.model_dump()
+    try:
+        peer = _peer(http_request)
+        job, created = await jobs.enqueue(
+            payload,
+            peer,
+            _client_id(http_request, peer),
+            request_fingerprint(payload),
+            idempotency_key
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="같은 Idempotency-Key로 다른 요청을 보냄"
+        )
+    except jobs.QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    headers = {"Location": f"/api/jobs/{job['job_id']}"}
+    if not created:
+        headers["Idempotent-Replayed"] = "true"
+    return encode_response(http_request, job, status_code=202, headers=headers)
+
+
+async def process_analysis_job(payload: dict) -> dict:
+    """분석 큐 worker가 부르는 처리 함수 (큐에 넣은 요청을 동기 요청과 같은 방식으로 분석함)"""
+    return await _analyze_and_store(AnalyzeRequest.model_validate(payload))
+
+
+def _peer(http_request: Request) -> str:
+    """큐 한도와 공정성의 기준이 되는 접속 주소"""
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _client_id(http_request: Request, peer: str) -> str:
+    """같은 peer 안에서 처리 순서를 나누는 클라이언트 (X-Client-Id 헤더, 없으면 peer)"""
+    client_id = http_request.headers.get("x-client-id")
+    if client_id:
+        return client_id[:MAX_IDEMPOTENCY_KEY_LENGTH]
+    return peer
+
+
+async def _analyze_and_store(request: AnalyzeRequest) -> dict:
+    """
+    RAG로 에러를 분석하고 레코드를 저장함
+
+    Returns:
+        AnalyzeResponse 형식의 dict
+    """
+    # 고유 ID 생성
+    error_id = str(uuid.uuid4())
+
+    # 에러 위치 프레임 (code_frames만 온 경우 첫 번째)
+    code_context = request.code_context or (request.code_frames[0] if request.code_frames else None)
+
+    # RAG로 에러 분석
+    analysis = await analyze_error(
+        error_log=request.error_log,
+        code_context=code_context.dict() if code_context else None,
+        code_frames=[frame.dict() for frame in request.code_frames]
+    )
+
+    # 데이터베이스에 저장
+    error_record = ErrorLog(
+        id=error_id,
+        case_name=analysis["case_name"],
+        command=request.command,
+        error_log=request.error_log,
+        code_snippet=code_context.code_snippet if code_context else None,
+        file_path=code_context.file_path if code_context else None,
+        line_number=code_context.line_number if code_context else None,
+        ai_solution=analysis["solution"],
+        root_cause=analysis["root_cause"],
+        tags=json.dumps(analysis["tags"]),
+        vector_id=analysis.get("vector_id")
+    )
+
+    await asyncio.to_thread(_store_error_record, error_record, analysis["tags"])
+
+    return {
+        "id": error_id,
+        "case_name": analysis["case_name"],
+        "root_cause": analysis["root_cause"],
+        "solution": analysis["solution"],
+        "tags": analysis["tags"],
+        "similar_cases": analysis.get("similar_cases", [])
+    }
+
+
+def _store_error_record(record: ErrorLog, tags: List[str]) -> None:
+    """writer 잠금을 잡고 에러 레코드를 저장함 (스레드에서 실행)"""
+    with write_session() as db:
+        save_error_record(db, record, tags)
+
 
 @router.get("/errors")
 async def get_errors(
-    page: int = 1,
-    limit: int = 20,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
     tag: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    match: str = Query("all", pattern="^(all|any)$"),
+    cursor: Optional[str] = None,
+    total: str = Query("exact", pattern="^(exact|approx|none)$"),
     db: Session = Depends(get_db)
 ):
     """
     페이지네이션과 함께 에러 목록을 가져옴
+
+    tag 하나 또는 tags를 여러 번 넘겨서 필터링함
+    (match=all이면 모든 태그, match=any면 하나 이상 일치)
+
+    cursor를 넘기면 page 대신 (created_at, id) 키셋 페이지네이션을 사용함
+
+    total은 카운터 테이블에서 가져옴 (approx면 태그 카운트로 추정, none이면 생략)
     """
-    query = db.query(ErrorLog)
+    query = db.query(*LIST_COLUMNS)
 
-    if tag:
-        query = query.filter(ErrorLog.tags.contains(tag))
+    filter_tags = ([tag] if tag else []) + (tags or [])
+    if filter_tags:
+        query = filter_by_tags(query, filter_tags, match)
 
-    total = query.count()
-    errors = query.order_by(ErrorLog.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+    total_count = count_errors(db, filter_tags, match, total)
+
+    if cursor is not None:
+        try:
+            errors, next_cursor, prev_cursor = keyset_page(query, limit, cursor or None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page_info = {"next_cursor": next_cursor, "prev_cursor": prev_cursor}
+    else:
+        errors = (
+            query.order_by(ErrorLog.created_at.desc(), ErrorLog.id.desc())
+            .offset((page - 1) * limit)
+            .limit(limit + 1)
+            .all()
+        )
+        # page 모드에서도 다음 페이지부터 커서로 이어갈 수 있게 함
+        next_cursor = None
+        if len(errors) > limit:
+            errors = errors[:limit]
+            next_cursor = encode_cursor(errors[-1].created_at, errors[-1].id)
+        page_info = {"page": page, "next_cursor": next_cursor}
 
     return {
-        "total": total,
-        "page": page,
+        "total": total_count,
+        **page_info,
         "limit": limit,
         "errors": [
             {
@@ -125,26 +362,156 @@ async def get_errors(
 @router.get("/errors/{error_id}")
 async def get_error_detail(
     error_id: str,
+    request: Request,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     에러의 상세 정보를 가져옴
+
+    fields에 쉼표로 구분한 필드 이름을 넘기면 해당 컬럼만 읽음
+    (예: fields=case_name,root_cause,tags)
+
+    직렬화한 응답 본문으로 강한 ETag를 만들어 붙임. 레코드는 저장된 뒤 보존 정책이 원본 로그를
+    지울 때만 바뀌므로 (error_log, code_snippet) 이미 아카이브했거나 바뀔 수 없는 응답은
+    immutable로 오래 캐시하게 하고, 아직 지워질 수 있는 응답은 지워질 수 있는 시각까지만 캐시하게 함
+
+    직렬화된 응답과 ETag는 프로세스 내 LRU에 보관함. 바뀔 수 없는 응답은 If-None-Match가 맞으면
+    DB를 조회하지 않고 304를 반환하고, 바뀔 수 있는 응답은 다른 worker 프로세스가 지우거나
+    아카이브했을 수 있으므로 레코드의 버전(log_archived_at)을 DB와 비교한 뒤에 씀
     """
-    error = db.query(ErrorLog).filter(ErrorLog.id == error_id).first()
+    global detail_not_modified
+
+    selected = _parse_fields(fields)
+    cache_key = (error_id, tuple(selected))
+    if_none_match = request.headers.get("if-none-match")
+    cached = detail_cache.get(cache_key)
+    if cached is not None:
+        _, etag, _, changes_at = cached
+        if changes_at is None and _etag_matches(if_none_match, etag):
+            detail_not_modified += 1
+            return Response(status_code=304, headers=_detail_headers(etag, changes_at))
+
+        # 작은 컬럼 하나만 기본 키로 읽음 (큰 컬럼 읽기/압축 해제와 직렬화는 건너뜀)
+        current = db.query(ErrorLog.log_archived_at).filter(ErrorLog.id == error_id).first()
+        if current is None:
+            detail_cache.discard_where(lambda key: key[0] == error_id)
+            raise HTTPException(status_code=404, detail="에러를 찾을 수 없음")
+        if current.log_archived_at != cached[0]:
+            cached = None
+
+    if cached is None:
+        error = (
+            db.query(
+                ErrorLog.log_archived_at,
+                ErrorLog.created_at,
+                *[getattr(ErrorLog, field) for field in selected]
+            )
+            .filter(ErrorLog.id == error_id)
+            .first()
+        )
+
+        if not error:
+            raise HTTPException(status_code=404, detail="에러를 찾을 수 없음")
+
+        version, created_at, *values = error
+        result = dict(zip(selected, values))
+        if "tags" in result:
+            result["tags"] = json.loads(result["tags"]) if result["tags"] else []
+        if "created_at" in result:
+            result["created_at"] = result["created_at"].isoformat()
+
+        body = orjson.dumps(result)
+        changes_at = _detail_changes_at(selected, created_at, version)
+        cached = (version, _detail_etag(body), body, changes_at)
+        detail_cache.put(cache_key, cached)
+
+    _, etag, body, changes_at = cached
+    headers = _detail_headers(etag, changes_at)
+    if _etag_matches(if_none_match, etag):
+        detail_not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
 
-    if not error:
-        raise HTTPException(status_code=404, detail="에러를 찾을 수 없음")
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    에러 상세 캐시의 히트율과 304 응답 수를 가져옴
+    """
     return {
-        "id": error.id,
-        "case_name": error.case_name,
-        "command": error.command,
-        "error_log": error.error_log,
-        "code_snippet": error.code_snippet,
-        "file_path": error.file_path,
-        "line_number": error.line_number,
-        "ai_solution": error.ai_solution,
-        "root_cause": error.root_cause,
-        "tags": json.loads(error.tags) if error.tags else [],
-        "created_at": error.created_at.isoformat()
+        "detail_cache": detail_cache.stats(),
+        "detail_not_modified": detail_not_modified
     }
+
+
+def _detail_changes_at(
+    selected: List[str],
+    created_at: Optional[datetime],
+    archived_at: Optional[datetime]
+) -> Optional[datetime]:
+    """
+    보존 정책이 원본 로그를 지워서 응답이 바뀔 수 있는 가장 이른 시각
+    (이미 지웠거나, 정책이 꺼져 있거나, 지우는 필드를 고르지 않았으면 바뀌지 않으므로 None)
+    """
+    if archived_at is not None or settings.retention_full_log_days <= 0:
+        return None
+    if not STRIPPED_FIELDS.intersection(selected):
+        return None
+    return (created_at or datetime.utcnow()) + timedelta(days=settings.retention_full_log_days)
+
+
+def _detail_headers(etag: str, changes_at: Optional[datetime]) -> dict:
+    """바뀔 수 없는 응답은 immutable로, 바뀔 수 있는 응답은 바뀔 수 있는 시각까지만 캐시하게 함"""
+    if changes_at is None:
+        cache_control = f"private, max-age={settings.detail_cache_max_age}, immutable"
+    else:
+        remaining = int((changes_at - datetime.utcnow()).total_seconds())
+        cache_control = f"private, max-age={min(max(0, remaining), settings.detail_cache_max_age)}"
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def _detail_etag(body: bytes) -> str:
+    """직렬화한 응답 본문으로 강한 ETag를 만듦"""
+    digest = hashlib.sha1(body).hexdigest()[:16]
+    return f'"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 etag가 들어있는지 확인함 (약한 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """fields 파라미터를 검증해서 DETAIL_FIELDS 순서대로 돌려줌 (id는 항상 포함)"""
+    if not fields:
+        return list(DETAIL_FIELDS)
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(DETAIL_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 필드: {', '.join(sorted(unknown))}"
+        )
+
+    requested.add("id")
+    return [field for field in DETAIL_FIELDS if field in requested]
+
+
+@router.get("/tags")
+async def get_tags(
+    limit: int = Query(50, ge=1, le=500),
+    prefix: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    태그별 에러 개수를 가져옴 (유지되는 카운트 테이블에서 조회)
+    """
+    return {"tags": get_tag_counts(db, limit=limit, prefix=prefix)}
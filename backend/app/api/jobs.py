@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.core.config import settings
+from app.core.wire import encode_response
+from app.services.jobs import get_job
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(
+    http_request: Request,
+    job_id: str,
+    wait: float = Query(0, ge=0)
+):
+    """
+    비동기 분석 작업의 상태를 가져옴 (status: queued | running | done | failed)
+
+    done이면 result에 POST /api/analyze와 같은 분석 결과가, failed면 error에 이유가 있음
+    wait초(최대 analysis_long_poll_max_seconds)를 주면 그동안 작업이 끝나기를 기다렸다가 돌려줌 (long-poll)
+    아직 끝나지 않았으면 다시 확인할 시간을 Retry-After로 알려줌
+    """
+    job = await get_job(job_id, min(wait, settings.analysis_long_poll_max_seconds))
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없음")
+
+    headers = None
+    if job["status"] == "queued":
+        headers = {"Retry-After": str(min(5, job["queue_position"] + 1))}
+    elif job["status"] == "running":
+        headers = {"Retry-After": "1"}
+    return encode_response(http_request, job, headers=headers)
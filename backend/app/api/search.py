@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional, List
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.services.search import search_errors
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    match: str = Query("all", pattern="^(all|any)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    지식 베이스 전문 검색 (case_name, error_log, root_cause, ai_solution)
+
+    관련도 순으로 정렬하고, 일치한 부분은 <mark>로 감싼 snippet을 함께 반환함
+    """
+    try:
+        results, next_cursor = search_errors(
+            db, q, limit=limit, cursor=cursor, tags=tags, match=match
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "query": q,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "results": results
+    }
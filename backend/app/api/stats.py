@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.services.rollups import default_range, new_vs_recurring, top_keys, trend
+
+router = APIRouter()
+
+GRANULARITY_PATTERN = "^(hour|day)$"
+
+
+@router.get("/stats/top")
+async def get_top(
+    dimension: str = Query("case", pattern="^(case|tag|command)$"),
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    구간 안에서 가장 많이 발생한 에러/태그/명령어를 가져옴 (집계 테이블에서 조회)
+    """
+    since, until = default_range(granularity, since, until)
+    return {
+        "dimension": dimension,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "items": top_keys(db, dimension, granularity, since, until, limit)
+    }
+
+
+@router.get("/stats/trends")
+async def get_trends(
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    dimension: str = Query("all", pattern="^(all|case|tag|command)$"),
+    key: str = "*",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    시간/일 단위 발생 수 추이를 가져옴 (dimension과 key로 특정 태그/에러/명령어만 볼 수 있음)
+    """
+    since, until = default_range(granularity, since, until)
+    return {
+        "granularity": granularity,
+        "dimension": dimension,
+        "key": key,
+        "series": trend(db, granularity, since, until, dimension, key)
+    }
+
+
+@router.get("/stats/new-vs-recurring")
+async def get_new_vs_recurring(
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    구간별 처음 보는 에러와 재발한 에러 수를 가져옴
+    """
+    since, until = default_range(granularity, since, until)
+    return {
+        "granularity": granularity,
+        "series": new_vs_recurring(db, granularity, since, until)
+    }
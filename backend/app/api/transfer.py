@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, List
+from datetime import datetime
+from app.core.wire import iter_body
+from app.services.transfer import iter_export_lines, import_stream
+
+router = APIRouter()
+
+
+@router.get("/export")
+def export_errors(
+    since: Optional[datetime] = None,
+    tags: Optional[List[str]] = Query(None),
+    match: str = Query("all", pattern="^(all|any)$"),
+    include_vectors: bool = False
+):
+    """
+    지식 베이스를 NDJSON으로 스트리밍해서 내보냄 (한 줄에 에러 하나)
+
+    include_vectors=true면 각 줄에 Chroma 임베딩(vector)도 포함함
+    """
+    return StreamingResponse(
+        iter_export_lines(since=since, tags=tags, match=match, include_vectors=include_vectors),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="errors.ndjson"'}
+    )
+
+
+@router.post("/import")
+async def import_errors(request: Request):
+    """
+    /api/export 형식의 NDJSON 본문을 스트리밍으로 받아 배치 단위로 저장함
+    이미 있는 id는 건너뛰고, 잘못된 줄은 세어서 줄 번호와 함께 알려줌
+    Content-Encoding: gzip이면 받으면서 풂
+    """
+    return await import_stream(iter_body(request))
@@ -0,0 +1,74 @@
+from typing import Optional, Union
+from sqlalchemy.types import Text, TypeDecorator
+from app.core.config import settings
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd가 없으면 zlib만 사용
+    zstandard = None
+
+# 압축된 값의 형식 표시: MAGIC + 코덱 1바이트 + 압축 데이터
+# 표시가 없는 TEXT 값은 압축 전 레코드로 보고 그대로 읽음
+MAGIC = b"WTFC"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+
+def compress_text(value: str, threshold: Optional[int] = None) -> Union[str, bytes]:
+    """
+    임계값 이상인 텍스트를 압축함
+
+    Returns:
+        압축한 bytes (형식 표시 포함), 임계값 미만이거나 압축 효과가 없으면 원래 str
+    """
+    if threshold is None:
+        threshold = settings.compression_threshold
+
+    raw = value.encode("utf-8")
+    if len(raw) < threshold:
+        return value
+
+    if settings.compression_codec == "zstd" and zstandard is not None:
+        packed = MAGIC + CODEC_ZSTD + zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        packed = MAGIC + CODEC_ZLIB + zlib.compress(raw, 6)
+
+    return packed if len(packed) < len(raw) else value
+
+
+def decompress_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """compress_text로 저장한 값을 원래 텍스트로 되돌림 (압축 안 된 값은 그대로)"""
+    if value is None or isinstance(value, str):
+        return value
+
+    value = bytes(value)
+    if not value.startswith(MAGIC):
+        return value.decode("utf-8")
+
+    codec = value[len(MAGIC):len(MAGIC) + 1]
+    payload = value[len(MAGIC) + 1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 값을 읽으려면 zstandard 패키지가 필요함")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    raise ValueError(f"알 수 없는 압축 코덱: {codec!r}")
+
+
+class CompressedText(TypeDecorator):
+    """
+    큰 값만 압축해서 저장하는 TEXT 컬럼 타입
+    SQLite는 TEXT 컬럼에 BLOB도 저장할 수 있으므로 스키마 변경 없이 기존 행과 섞여 있어도 됨
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
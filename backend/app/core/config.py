@@ -10,14 +10,60 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite:////data/sqlite/errors.db"
+    sqlite_busy_timeout_ms: int = 5000
 
     # ChromaDB
+    # chroma_host를 지정하면 별도로 띄운 Chroma 서버에 HTTP로 연결함 (여러 worker/호스트 공유용)
+    # 지정하지 않으면 chroma_persist_directory에 직접 저장함 (worker 1개일 때만 안전)
     chroma_persist_directory: str = "/data/chroma"
+    chroma_host: Optional[str] = None
+    chroma_port: int = 8000
 
     # RAG
     similarity_threshold: float = 0.8
     max_similar_cases: int = 3
 
+    # 큰 텍스트 컬럼 압축 (zstd가 설치되어 있지 않으면 zlib 사용)
+    compression_threshold: int = 1024
+    compression_codec: str = "zstd"
+
+    # 보존 정책 (0이면 해당 단계 비활성화)
+    # 예: full_log_days=90이면 90일 지난 에러의 원본 로그를 아카이브로 옮기고 분석만 남김
+    #     single_occurrence_days=365면 1년 지나도록 한 번만 발생한 에러를 아카이브 후 삭제
+    retention_full_log_days: int = 0
+    retention_single_occurrence_days: int = 0
+    retention_batch_size: int = 200
+    retention_interval_seconds: int = 3600
+    archive_directory: str = "/data/archive"
+
+    # 에러 상세 응답 캐시 (보존 정책이 아직 원본 로그를 지울 수 있는 응답은 지울 수 있는 시각까지만 캐시함)
+    detail_cache_size: int = 1024
+    detail_cache_max_age: int = 31536000
+
+    # Idempotency-Key (같은 키로 다시 온 분석 요청은 저장된 결과를 돌려줌)
+    # pending_timeout이 지나도록 끝나지 않은 처리는 중단된 것으로 보고 다시 실행함
+    idempotency_ttl_seconds: int = 86400
+    idempotency_wait_seconds: int = 60
+    idempotency_pending_timeout_seconds: int = 300
+
+    # 비동기 분석 큐 (POST /api/analyze에 Prefer: respond-async → 202와 작업 id, GET /api/jobs/{id}로 결과)
+    # 프로세스마다 analysis_workers개의 작업을 동시에 처리하고, 대기 중인 작업이 queue_max_depth개
+    # (접속 주소 하나당 max_per_client개, X-Client-Id와 상관없음)를 넘으면 429와 Retry-After로 거절함
+    # 동기 요청도 동시에 sync_max_inflight개를 넘으면 OpenAI 응답을 기다리며 쌓이지 않도록 429로 거절함
+    analysis_workers: int = 4
+    analysis_queue_max_depth: int = 200
+    analysis_queue_max_per_client: int = 20
+    analysis_sync_max_inflight: int = 32
+    analysis_job_lease_seconds: int = 300
+    analysis_job_max_attempts: int = 3
+    analysis_job_ttl_seconds: int = 86400
+    analysis_long_poll_max_seconds: int = 30
+
+    # 요청 본문(gzip이면 풀었을 때)의 최대 크기 (bytes, /api/import 스트리밍 업로드는 제외)
+    max_request_body_size: int = 16 * 1024 * 1024
+    # /api/import에서 한 줄(레코드 하나)의 최대 크기 (bytes, 넘는 줄은 잘못된 줄로 세고 건너뜀)
+    max_import_line_bytes: int = 8 * 1024 * 1024
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,20 +1,60 @@
-from sqlalchemy import create_engine, Column, String, Integer, Text, DateTime
+from sqlalchemy import create_engine, event, Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
 from datetime import datetime
 import os
 from app.core.config import settings
+from app.core.compression import CompressedText, decompress_text
 
-# 데이터베이스 디렉토리 존재하는지 확인
 db_path = settings.database_url.replace("sqlite:///", "")
-os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}
-)
+# 엔진은 get_engine()이 처음 호출될 때 만듦 (import만으로 디렉토리를 만들거나 연결하지 않음)
+engine = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_engine():
+    """
+    데이터베이스 디렉토리와 엔진을 준비하고 SessionLocal에 바인딩함
+    앱 시작(lifespan) 때 한 번 호출되고, 이후 호출은 같은 엔진을 돌려줌
+    """
+    global engine
+
+    if engine is None:
+        # 데이터베이스 디렉토리 존재하는지 확인
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        engine = create_engine(
+            settings.database_url,
+            connect_args={"check_same_thread": False}
+        )
+        event.listen(engine, "connect", _register_sqlite_functions)
+        event.listen(engine, "connect", _configure_sqlite)
+        SessionLocal.configure(bind=engine)
+
+    return engine
+
+
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """FTS 트리거와 검색 뷰가 압축된 컬럼을 읽을 수 있도록 함수를 등록함"""
+    dbapi_connection.create_function(
+        "wtf_decompress", 1, decompress_text, deterministic=True
+    )
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    여러 worker 프로세스가 같은 DB 파일을 쓰도록 연결을 설정함
+    WAL이면 읽기가 쓰기를 기다리지 않고, busy_timeout으로 잠금 충돌 시 바로 실패하지 않음
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.close()
+
+
+# get_engine()이 엔진을 바인딩함
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
 
@@ -24,20 +64,150 @@ class ErrorLog(Base):
     id = Column(String, primary_key=True)
     case_name = Column(Text, nullable=False)
     command = Column(Text, nullable=False)
-    error_log = Column(Text, nullable=False)
-    code_snippet = Column(Text)
+    # 큰 텍스트 컬럼은 실제로 접근할 때만 읽고 압축을 풂
+    error_log = deferred(Column(CompressedText, nullable=False))
+    code_snippet = deferred(Column(CompressedText))
     file_path = Column(Text)
     line_number = Column(Integer)
-    ai_solution = Column(Text)
-    root_cause = Column(Text)
+    ai_solution = deferred(Column(CompressedText))
+    root_cause = deferred(Column(CompressedText))
     tags = Column(Text)  # JSON 문자열
     created_at = Column(DateTime, default=datetime.utcnow)
     vector_id = Column(String)
+    log_archived_at = Column(DateTime)  # 원본 로그를 아카이브로 옮긴 시각
+
+    __table_args__ = (
+        # 최신순 목록과 커서 페이지네이션용
+        Index("ix_errors_created_at_id", "created_at", "id"),
+        # 보존 정책에서 같은 에러가 다시 발생했는지 확인용
+        Index("ix_errors_case_name", "case_name"),
+    )
+
+
+class ErrorTag(Base):
+    """에러-태그 연관 테이블 (태그 필터링용 인덱스)"""
+    __tablename__ = "error_tags"
+
+    error_id = Column(String, ForeignKey("errors.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(collation="NOCASE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_error_tags_tag_error_id", "tag", "error_id"),
+    )
+
+
+class TagCount(Base):
+    """태그별 에러 개수 (facet 조회용, insert/delete 시 함께 갱신)"""
+    __tablename__ = "tag_counts"
+
+    tag = Column(String(collation="NOCASE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Counter(Base):
+    """행 개수 카운터 (목록 API의 total을 COUNT(*) 없이 제공)"""
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class ErrorRollup(Base):
+    """
+    시간 단위별 에러 발생 집계 (insert 시 증분 갱신)
+
+    granularity: "hour" | "day"
+    dimension: "all" | "tag" | "case" | "command" | "status"
+    key: 정규화된 값 (status는 "new" | "recurring", all은 "*")
+    """
+    __tablename__ = "error_rollups"
+
+    granularity = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    key = Column(String(collation="NOCASE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ErrorCase(Base):
+    """정규화된 에러 이름별 최초/최근 발생 정보 (신규 vs 재발 판단용)"""
+    __tablename__ = "error_cases"
+
+    case_key = Column(String(collation="NOCASE"), primary_key=True)
+    case_name = Column(Text, nullable=False)  # 표시용 대표 이름
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False)
+    occurrences = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency-Key로 받은 분석 요청의 처리 상태와 결과 (만료 시각이 지나면 삭제)
+
+    status: "pending" (처리 중) | "done" (response에 결과 JSON 저장)
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    response = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+
+class AnalysisJob(Base):
+    """
+    비동기 분석 요청 큐 (POST /api/analyze에 Prefer: respond-async로 온 요청)
+
+    status: "queued" (실패 후 다시 기다리면 not_before부터) | "running" (lease_expires_at까지 처리 중)
+            | "done" (result에 결과 JSON) | "failed"
+    peer는 접속 주소로 한도와 처리 순서의 기준이고, client_id(X-Client-Id)는 같은 peer 안에서만 순서를 나눔
+    끝난 작업은 finished_at부터 analysis_job_ttl_seconds 뒤에 삭제함
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True)
+    peer = Column(String, nullable=False)
+    client_id = Column(String, nullable=False)
+    idempotency_key = Column(String, unique=True)
+    request_hash = Column(String, nullable=False)
+    request = Column(Text, nullable=False)  # AnalyzeRequest JSON
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    lease_expires_at = Column(DateTime)
+    not_before = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+        # peer별 한도 확인용
+        Index("ix_analysis_jobs_peer_status", "peer", "status"),
+        # 작업을 고를 때 peer/클라이언트가 마지막으로 작업을 시작한 시각을 찾는 용도
+        Index("ix_analysis_jobs_peer_started_at", "peer", "started_at"),
+        Index("ix_analysis_jobs_peer_client_id_started_at", "peer", "client_id", "started_at"),
+    )
+
+
+class SchemaMigration(Base):
+    """적용된 데이터 마이그레이션 기록"""
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
 
 
 def init_db():
     """데이터베이스 테이블 초기화"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 
 def get_db():
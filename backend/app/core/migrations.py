@@ -0,0 +1,209 @@
+from typing import Callable, List, Tuple
+import json
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, ErrorLog, SchemaMigration
+from app.services.tags import add_error_tags, rebuild_tag_counts
+from app.services import counters
+from app.services.rollups import rebuild_rollups
+from app.services.search import sync_search_index
+
+BATCH_SIZE = 500
+
+
+def _backfill_error_tags(db: Session) -> None:
+    """기존 errors.tags JSON 문자열로 error_tags 연관 테이블을 채움"""
+    last_id = ""
+    while True:
+        rows = (
+            db.query(ErrorLog.id, ErrorLog.tags)
+            .filter(ErrorLog.id > last_id)
+            .order_by(ErrorLog.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+
+        for error_id, tags in rows:
+            try:
+                parsed = json.loads(tags) if tags else []
+            except ValueError:
+                parsed = []
+            if isinstance(parsed, list):
+                add_error_tags(db, error_id, parsed)
+
+        db.commit()
+        last_id = rows[-1].id
+
+    # 배치 도중 중복 카운트가 생기지 않도록 마지막에 다시 계산
+    rebuild_tag_counts(db)
+
+
+def _create_errors_indexes(db: Session) -> None:
+    """기존 errors 테이블에 모델에 정의된 인덱스 중 없는 것을 추가함"""
+    for index in ErrorLog.__table__.indexes:
+        index.create(bind=db.connection(), checkfirst=True)
+
+
+def _rebuild_counters(db: Session) -> None:
+    """기존 행 수로 카운터 테이블을 초기화함"""
+    counters.rebuild(db)
+
+
+def _create_errors_fts(db: Session) -> None:
+    """
+    압축을 푼 텍스트를 보여주는 errors_fts_source 뷰를 content로 쓰는 FTS5 검색 인덱스와
+    변경 기록 트리거를 만들고 기존 행을 색인함
+
+    external content 방식이라 본문은 errors에만 (압축된 채로) 저장되고 rowid로 연결됨
+    (VACUUM 후에는 rowid가 바뀔 수 있으므로 'rebuild'로 다시 색인해야 함)
+
+    트리거는 앱이 등록하는 wtf_decompress()를 쓰지 않고 바뀐 행의 원래 값(압축된 값 그대로)만
+    errors_fts_changes에 남김. 그래서 sqlite3 셸 같은 다른 도구로도 errors에 쓸 수 있고,
+    남은 변경은 앱이 압축을 풀어 색인함 (search.sync_search_index)
+    """
+    statements = [
+        """
+        CREATE VIEW IF NOT EXISTS errors_fts_source AS
+        SELECT rowid AS rowid, case_name,
+               wtf_decompress(error_log) AS error_log,
+               wtf_decompress(root_cause) AS root_cause,
+               wtf_decompress(ai_solution) AS ai_solution
+        FROM errors
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS errors_fts USING fts5(
+            case_name, error_log, root_cause, ai_solution,
+            content='errors_fts_source', content_rowid='rowid',
+            tokenize='unicode61'
+        )
+        """,
+        # old_*는 인덱스에서 뺄 값, new_*는 넣을 값 (has_old/has_new로 어느 쪽이 있는지 표시)
+        """
+        CREATE TABLE IF NOT EXISTS errors_fts_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            row INTEGER NOT NULL,
+            has_old INTEGER NOT NULL,
+            old_case_name, old_error_log, old_root_cause, old_ai_solution,
+            has_new INTEGER NOT NULL,
+            new_case_name, new_error_log, new_root_cause, new_ai_solution
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS errors_fts_ai AFTER INSERT ON errors BEGIN
+            INSERT INTO errors_fts_changes(row, has_old, has_new,
+                new_case_name, new_error_log, new_root_cause, new_ai_solution)
+            VALUES (new.rowid, 0, 1, new.case_name, new.error_log, new.root_cause, new.ai_solution);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS errors_fts_ad AFTER DELETE ON errors BEGIN
+            INSERT INTO errors_fts_changes(row, has_old, has_new,
+                old_case_name, old_error_log, old_root_cause, old_ai_solution)
+            VALUES (old.rowid, 1, 0, old.case_name, old.error_log, old.root_cause, old.ai_solution);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS errors_fts_au
+        AFTER UPDATE OF case_name, error_log, root_cause, ai_solution ON errors BEGIN
+            INSERT INTO errors_fts_changes(row, has_old, has_new,
+                old_case_name, old_error_log, old_root_cause, old_ai_solution,
+                new_case_name, new_error_log, new_root_cause, new_ai_solution)
+            VALUES (new.rowid, 1, 1,
+                old.case_name, old.error_log, old.root_cause, old.ai_solution,
+                new.case_name, new.error_log, new.root_cause, new.ai_solution);
+        END
+        """,
+        # rebuild가 현재 내용을 모두 색인하므로 그 전에 쌓인 변경은 버림
+        "INSERT INTO errors_fts(errors_fts) VALUES ('rebuild')",
+        "DELETE FROM errors_fts_changes",
+    ]
+    for statement in statements:
+        db.execute(text(statement))
+
+
+def _compress_existing_rows(db: Session) -> None:
+    """
+    임계값 이상인 기존 텍스트 값을 배치 단위로 압축함
+    CompressedText 타입을 거쳐 다시 쓰기만 하면 압축 여부는 타입이 결정함
+    """
+    columns = ["error_log", "code_snippet", "ai_solution", "root_cause"]
+    candidate = " OR ".join(
+        f"(typeof({name}) = 'text' AND length(CAST({name} AS BLOB)) >= :threshold)"
+        for name in columns
+    )
+    last_rowid = 0
+    while True:
+        rows = db.execute(
+            text(
+                f"SELECT rowid, id, {', '.join(columns)} FROM errors "
+                f"WHERE rowid > :last AND ({candidate}) ORDER BY rowid LIMIT :limit"
+            ),
+            {"last": last_rowid, "threshold": settings.compression_threshold, "limit": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+
+        for row in rows:
+            values = {
+                name: getattr(row, name)
+                for name in columns
+                if isinstance(getattr(row, name), str)
+            }
+            db.execute(
+                update(ErrorLog.__table__)
+                .where(ErrorLog.__table__.c.id == row.id)
+                .values(**values)
+            )
+
+        sync_search_index(db)
+        db.commit()
+        last_rowid = rows[-1].rowid
+        print(f"  압축 진행: rowid {last_rowid}까지")
+
+
+def _add_log_archived_at(db: Session) -> None:
+    """보존 정책용 log_archived_at 컬럼과 case_name 인덱스를 추가함"""
+    columns = [row[1] for row in db.execute(text("PRAGMA table_info(errors)")).all()]
+    if "log_archived_at" not in columns:
+        db.execute(text("ALTER TABLE errors ADD COLUMN log_archived_at DATETIME"))
+    _create_errors_indexes(db)
+
+
+def _backfill_rollups(db: Session) -> None:
+    """기존 에러로 시간/일 집계 테이블을 채움"""
+    rebuild_rollups(db, BATCH_SIZE)
+
+
+# (이름, 함수) 순서대로 한 번씩만 적용됨
+MIGRATIONS: List[Tuple[str, Callable[[Session], None]]] = [
+    ("0001_backfill_error_tags", _backfill_error_tags),
+    ("0002_errors_created_at_index", _create_errors_indexes),
+    ("0003_rebuild_counters", _rebuild_counters),
+    ("0004_create_errors_fts", _create_errors_fts),
+    ("0005_compress_existing_rows", _compress_existing_rows),
+    ("0006_retention_columns", _add_log_archived_at),
+    ("0007_backfill_rollups", _backfill_rollups),
+]
+
+
+def run_migrations() -> None:
+    """아직 적용되지 않은 데이터 마이그레이션을 순서대로 실행함"""
+    db = SessionLocal()
+    try:
+        applied = {name for (name,) in db.query(SchemaMigration.name).all()}
+        for name, migrate in MIGRATIONS:
+            if name in applied:
+                continue
+            print(f"마이그레이션 적용: {name}")
+            migrate(db)
+            db.add(SchemaMigration(name=name))
+            db.commit()
+
+        # 앱이 꺼져 있는 동안 다른 도구로 바꾼 행을 색인함
+        sync_search_index(db)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+from typing import Any, AsyncIterator, Dict, Optional, Type, TypeVar
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+import orjson
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # msgpack이 없으면 JSON으로만 주고받음
+    msgpack = None
+
+# 요청/응답 본문 형식 (Content-Type / Accept로 협상)
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPE = "application/json"
+
+# gzip을 풀 때 한 번에 만드는 최대 크기 (압축률이 아주 높은 본문도 조금씩 풀어서 크기를 확인함)
+INFLATE_CHUNK_SIZE = 256 * 1024
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+async def read_model(request: Request, model: Type[ModelT]) -> ModelT:
+    """
+    요청 본문을 Content-Encoding(gzip)과 Content-Type(JSON/msgpack)에 맞게 풀어서 모델로 검증함
+
+    Raises:
+        HTTPException: 지원하지 않는 형식(415), 풀린 크기 초과(413), 잘못된 본문(400)
+        RequestValidationError: 모델 검증 실패 (FastAPI 기본 본문 검증과 같은 422)
+    """
+    body = await read_body(request)
+
+    media_type = request.headers.get("content-type", JSON_MEDIA_TYPE).split(";")[0].strip().lower()
+    try:
+        if media_type == MSGPACK_MEDIA_TYPE:
+            if msgpack is None:
+                raise HTTPException(status_code=415, detail="msgpack을 지원하지 않음")
+            data = msgpack.unpackb(body, raw=False)
+        elif media_type == JSON_MEDIA_TYPE or media_type.endswith("+json"):
+            data = orjson.loads(body)
+        else:
+            raise HTTPException(status_code=415, detail=f"지원하지 않는 Content-Type: {media_type}")
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"본문을 읽을 수 없음: {e}")
+
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+        )
+
+
+def encode_response(
+    request: Request,
+    content: Dict[str, Any],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Accept 헤더에 msgpack이 있으면 msgpack으로, 아니면 orjson으로 직렬화함
+    내부에서 만든 dict를 그대로 쓰므로 response_model 재검증을 거치지 않음
+    """
+    accept = request.headers.get("accept", "")
+    if msgpack is not None and MSGPACK_MEDIA_TYPE in accept:
+        return Response(
+            content=msgpack.packb(content, use_bin_type=True),
+            status_code=status_code,
+            media_type=MSGPACK_MEDIA_TYPE,
+            headers=headers
+        )
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+async def read_body(request: Request) -> bytes:
+    """
+    요청 본문을 받으면서 Content-Encoding(gzip)을 풀어서 돌려줌
+    압축한 본문 전체를 먼저 모으지 않고 조각마다 풀고, 크기는 max_request_body_size로 제한함
+
+    Raises:
+        HTTPException: 본문(또는 풀린 본문)이 너무 큼(413), 지원하지 않는 Content-Encoding(415), 잘못된 gzip(400)
+    """
+    limit = settings.max_request_body_size
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail="본문이 너무 큼")
+
+    body = bytearray()
+    async for chunk in iter_body(request):
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="본문이 너무 큼")
+    return bytes(body)
+
+
+async def iter_body(request: Request) -> AsyncIterator[bytes]:
+    """
+    요청 본문을 Content-Encoding(gzip)을 풀면서 조각으로 돌려줌 (크기 제한 없음, 스트리밍 업로드용)
+
+    Raises:
+        HTTPException: 지원하지 않는 Content-Encoding(415), 잘못되거나 잘린 gzip(400)
+    """
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding == "identity":
+        async for chunk in request.stream():
+            if chunk:
+                yield chunk
+        return
+    if encoding != "gzip":
+        raise HTTPException(status_code=415, detail=f"지원하지 않는 Content-Encoding: {encoding}")
+
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        async for chunk in request.stream():
+            # 풀린 크기를 INFLATE_CHUNK_SIZE씩 끊어서 읽는 쪽이 중간에 크기 제한을 걸 수 있게 함
+            while chunk:
+                data = decompressor.decompress(chunk, INFLATE_CHUNK_SIZE)
+                if data:
+                    yield data
+                chunk = decompressor.unconsumed_tail
+        data = decompressor.flush()
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"gzip 본문을 풀 수 없음: {e}")
+
+    if data:
+        yield data
+    if not decompressor.eof:
+        raise HTTPException(status_code=400, detail="gzip 본문이 중간에 끊김")
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, db_path
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows에서는 프로세스 간 잠금 없이 프로세스 내 잠금만 사용
+    fcntl = None
+
+# SQLite는 한 번에 하나의 writer만 허용하므로, 여러 uvicorn worker가 쓰기 트랜잭션을
+# 동시에 열어 "database is locked"로 실패하지 않도록 쓰기를 한 줄로 세움
+# (읽기는 WAL 모드라 쓰기와 상관없이 동시에 진행됨)
+WRITER_LOCK_PATH = f"{db_path}.writer.lock"
+LEADER_LOCK_PATH = f"{db_path}.leader.lock"
+
+_thread_lock = threading.Lock()
+_leader_file = None
+
+
+@contextmanager
+def writer_lock() -> Iterator[None]:
+    """같은 호스트의 모든 worker 프로세스/스레드 사이에서 쓰기를 직렬화함"""
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+
+        with open(WRITER_LOCK_PATH, "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def write_session() -> Iterator[Session]:
+    """
+    writer 잠금을 잡은 상태로 세션을 열고, 끝나면 커밋하고 잠금을 풂
+    예외가 나면 롤백함
+
+    블로킹 호출이므로 async 핸들러에서는 asyncio.to_thread로 감싸서 씀
+    """
+    with writer_lock():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def is_leader() -> bool:
+    """
+    이 프로세스가 백그라운드 작업(보존 정책 등)을 맡을 leader인지 확인함
+    leader 잠금은 프로세스가 살아있는 동안 유지되고, leader가 죽으면 다른 worker가 이어받음
+    """
+    global _leader_file
+
+    if _leader_file is not None:
+        return True
+    if fcntl is None:
+        return True
+
+    lock_file = open(LEADER_LOCK_PATH, "a+")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    _leader_file = lock_file
+    return True
+
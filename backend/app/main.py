@@ -1,13 +1,88 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
-from app.core.database import init_db
-from app.api import analyze
+from app.core.database import get_engine, init_db
+from app.core.migrations import run_migrations
+from app.core.writer import writer_lock
+from app.services.rag import warm_up
+from app.services.retention import retention_loop
+from app.services.jobs import start_workers
+from app.api import analyze, jobs, search, stats, transfer
+
+# 백그라운드 작업
+background_tasks = []
+
+# 준비 상태 (/health는 프로세스가 살아있는지만, /ready는 요청을 처리할 수 있는지 알려줌)
+started_at = time.monotonic()
+readiness = {"database": False, "vector_store": False}
+time_to_ready: Optional[float] = None
+
+
+def _prepare_database():
+    """DB 디렉토리/엔진을 만들고 스키마와 마이그레이션을 적용함 (스레드에서 실행)"""
+    get_engine()
+    # worker가 여러 개여도 스키마 생성과 마이그레이션은 한 번에 하나씩만 실행함
+    with writer_lock():
+        init_db()
+        run_migrations()
+
+
+async def prepare():
+    """
+    서버가 요청을 받기 시작한 뒤 백그라운드에서 DB와 Chroma를 준비함
+    DB(디렉토리 권한, 잠금, 마이그레이션)나 Chroma 준비가 실패하면 로그를 남기고 잠시 후 다시 시도함
+    (그동안 /ready는 503으로 어느 쪽이 준비되지 않았는지 알려줌)
+    """
+    global time_to_ready
+
+    while not readiness["database"]:
+        try:
+            await asyncio.to_thread(_prepare_database)
+            readiness["database"] = True
+        except Exception as e:
+            print(f"DB 준비 실패, 5초 후 다시 시도: {e}")
+            await asyncio.sleep(5)
+
+    if settings.retention_full_log_days > 0 or settings.retention_single_occurrence_days > 0:
+        background_tasks.append(asyncio.create_task(retention_loop()))
+
+    while not readiness["vector_store"]:
+        try:
+            await warm_up()
+            readiness["vector_store"] = True
+        except Exception as e:
+            print(f"Chroma 준비 실패, 5초 후 다시 시도: {e}")
+            await asyncio.sleep(5)
+
+    # 비동기 분석 큐는 Chroma가 준비된 뒤에 처리하기 시작함 (그 전에 들어온 작업은 큐에서 기다림)
+    background_tasks.extend(start_workers(analyze.process_analysis_job))
+
+    time_to_ready = time.monotonic() - started_at
+    print(f"준비 완료: {time_to_ready:.2f}초")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 준비 작업을 기다리지 않고 바로 요청(/health)을 받기 시작함
+    background_tasks.append(asyncio.create_task(prepare()))
+    yield
+    # 종료 시 백그라운드 작업 정리
+    for task in background_tasks:
+        task.cancel()
+
 
 app = FastAPI(
     title="CLI-Mate API",
     description="AI-Powered Error Analysis and Knowledge Base",
-    version="1.0.0"
+    version="1.0.0",
+    # 응답 직렬화는 표준 json 대신 orjson으로 함
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS 미들웨어
@@ -19,18 +94,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 시작 시 데이터베이스 초기화
-@app.on_event("startup")
-async def startup_event():
-    init_db()
+# DB가 준비되기 전에 들어온 API 요청은 503으로 돌려보냄
+@app.middleware("http")
+async def require_database(request: Request, call_next):
+    if request.url.path.startswith("/api") and not readiness["database"]:
+        return ORJSONResponse(
+            {"detail": "서버 준비 중"},
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
+    return await call_next(request)
 
-# 헬스 체크 엔드포인트
+# 헬스 체크 엔드포인트 (준비 상태와 상관없이 바로 응답함)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "cli-mate-backend"}
 
+# 준비 상태 확인 엔드포인트 (DB와 Chroma가 모두 준비되면 200, 아니면 503)
+@app.get("/ready")
+async def readiness_check():
+    ready = all(readiness.values())
+    return ORJSONResponse(
+        {
+            "status": "ready" if ready else "starting",
+            "checks": readiness,
+            "time_to_ready": time_to_ready,
+            "uptime": time.monotonic() - started_at
+        },
+        status_code=200 if ready else 503
+    )
+
 # 라우터 포함
 app.include_router(analyze.router, prefix="/api", tags=["analyze"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(transfer.router, prefix="/api", tags=["transfer"])
+app.include_router(stats.router, prefix="/api", tags=["stats"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.core.config import settings
+import threading
+
+
+class LRUCache:
+    """
+    크기가 제한된 프로세스 내 LRU 캐시
+    여러 요청 스레드에서 함께 쓰므로 lock으로 보호함
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """값을 가져오고 가장 최근 사용으로 표시함 (없으면 None)"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """값을 저장하고 넘치면 가장 오래 안 쓴 항목을 버림"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """조건에 맞는 키를 모두 지움 (레코드 삭제/변경 시 사용)"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def stats(self) -> Dict:
+        """히트율 등 캐시 상태를 반환함"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# 에러 상세 응답 캐시: (error_id, fields 튜플) -> (log_archived_at, ETag 문자열, 직렬화된 JSON bytes)
+# 프로세스마다 따로 있으므로 쓰기 전에 log_archived_at을 DB와 비교해서 다른 프로세스의 변경을 알아챔
+# (이 프로세스에서 지우거나 아카이브한 레코드는 discard_where로 바로 지움)
+detail_cache = LRUCache(settings.detail_cache_size)
@@ -0,0 +1,78 @@
+from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.core.database import Counter, ErrorLog, TagCount
+from app.services.tags import normalize_tags, tagged_error_ids
+
+ERRORS_TOTAL = "errors"
+
+
+def increment(db: Session, name: str, delta: int = 1) -> None:
+    """
+    카운터를 delta만큼 변경함 (없으면 생성)
+    커밋은 호출하는 쪽에서 데이터 변경과 같은 트랜잭션으로 처리함
+    """
+    stmt = insert(Counter).values(name=name, value=max(delta, 0))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Counter.name],
+        set_={"value": Counter.value + delta}
+    )
+    db.execute(stmt)
+
+
+def get_value(db: Session, name: str) -> int:
+    """카운터 값을 가져옴 (없으면 0)"""
+    value = db.query(Counter.value).filter(Counter.name == name).scalar()
+    return value or 0
+
+
+def rebuild(db: Session) -> None:
+    """실제 행 개수로 카운터를 다시 맞춤 (마이그레이션/복구용)"""
+    total = db.query(func.count(ErrorLog.id)).scalar()
+    db.merge(Counter(name=ERRORS_TOTAL, value=total))
+
+
+def count_errors(
+    db: Session,
+    tags: Optional[List[str]] = None,
+    match: str = "all",
+    mode: str = "exact"
+) -> Optional[int]:
+    """
+    목록 API의 total 값을 계산함
+
+    Args:
+        tags: 필터링 중인 태그 리스트
+        match: "all" 또는 "any"
+        mode: "exact"면 정확한 값, "approx"면 카운터만으로 추정, "none"이면 계산 안 함
+
+    Returns:
+        에러 개수 (mode가 "none"이면 None)
+    """
+    if mode == "none":
+        return None
+
+    tags = normalize_tags(tags)
+    if not tags:
+        return get_value(db, ERRORS_TOTAL)
+
+    values = [
+        count for (count,) in
+        db.query(TagCount.count).filter(TagCount.tag.in_(tags)).all()
+    ]
+
+    if len(tags) == 1:
+        return values[0] if values else 0
+
+    if match == "all" and len(values) < len(tags):
+        return 0
+
+    if mode == "approx":
+        if match == "all":
+            return min(values)
+        return min(sum(values), get_value(db, ERRORS_TOTAL))
+
+    # 여러 태그 조합은 error_tags 인덱스만 훑어서 셈
+    tagged = tagged_error_ids(tags, match).subquery()
+    return db.execute(select(func.count()).select_from(tagged)).scalar()
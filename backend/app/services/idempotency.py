@@ -0,0 +1,145 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from app.core.config import settings
+from app.core.database import IdempotencyKey
+from app.core.writer import write_session
+import asyncio
+import hashlib
+import orjson
+
+# 다른 worker가 처리 중인 키를 기다릴 때 DB를 다시 확인하는 간격 (초)
+POLL_INTERVAL = 0.25
+
+# 이 프로세스에서 처리 중인 키 -> (요청 해시, 처리 작업)
+# 같은 worker로 온 반복 요청은 DB를 폴링하지 않고 작업을 직접 기다림
+_inflight: Dict[str, Tuple[str, "asyncio.Task[Dict]"]] = {}
+
+
+class IdempotencyKeyReused(ValueError):
+    """같은 키로 다른 내용의 요청이 왔을 때"""
+
+
+class IdempotencyInProgress(Exception):
+    """같은 키의 처리가 기다리는 시간 안에 끝나지 않았을 때"""
+
+
+def request_fingerprint(payload: Dict) -> str:
+    """요청 내용의 해시 (같은 키로 다른 요청이 왔는지 확인용)"""
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+async def run_once(
+    key: str,
+    fingerprint: str,
+    work: Callable[[], Awaitable[Dict]]
+) -> Tuple[Dict, bool]:
+    """
+    같은 Idempotency-Key로 온 요청은 work를 한 번만 실행하고 결과를 재사용함
+
+    - 처음 온 요청: 키를 pending으로 잡고 work를 실행한 뒤 결과를 TTL 동안 저장함
+    - 완료된 키: 저장된 결과를 바로 돌려줌
+    - 처리 중인 키: 끝날 때까지 기다렸다가 같은 결과를 돌려줌 (다른 worker면 DB를 폴링함)
+
+    work가 실패하면 키를 풀어서 다음 요청이 다시 실행할 수 있게 함
+    work는 별도 태스크로 실행되므로 클라이언트가 끊어져도 끝까지 처리되고 결과가 저장됨
+
+    Returns:
+        (결과 dict, 저장된 결과를 재사용했는지)
+
+    Raises:
+        IdempotencyKeyReused: 같은 키로 다른 내용의 요청이 왔을 때
+        IdempotencyInProgress: idempotency_wait_seconds 안에 처리가 끝나지 않았을 때
+    """
+    deadline = asyncio.get_running_loop().time() + settings.idempotency_wait_seconds
+
+    while True:
+        if key in _inflight:
+            inflight_fingerprint, task = _inflight[key]
+            if inflight_fingerprint != fingerprint:
+                raise IdempotencyKeyReused(key)
+            return await asyncio.shield(task), True
+
+        claimed, stored = await asyncio.to_thread(_claim, key, fingerprint)
+        if claimed:
+            task = asyncio.create_task(_execute(key, work))
+            _inflight[key] = (fingerprint, task)
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+            return await asyncio.shield(task), False
+        if stored is not None:
+            return stored, True
+
+        if asyncio.get_running_loop().time() >= deadline:
+            raise IdempotencyInProgress(key)
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def _execute(key: str, work: Callable[[], Awaitable[Dict]]) -> Dict:
+    """work를 실행하고 결과를 저장함 (실패하면 키를 풂)"""
+    try:
+        result = await work()
+    except BaseException:
+        await asyncio.to_thread(_release, key)
+        raise
+
+    await asyncio.to_thread(_complete, key, result)
+    return result
+
+
+def _claim(key: str, fingerprint: str) -> Tuple[bool, Optional[Dict]]:
+    """
+    키를 pending으로 잡아봄 (만료된 키는 지우고 새로 잡음)
+
+    Returns:
+        (이번에 잡았는지, 완료된 키면 저장된 결과)
+
+    Raises:
+        IdempotencyKeyReused: 저장된 요청 해시가 다를 때
+    """
+    now = datetime.utcnow()
+
+    with write_session() as db:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+
+        stmt = insert(IdempotencyKey).values(
+            key=key,
+            request_hash=fingerprint,
+            status="pending",
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_pending_timeout_seconds)
+        ).on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+        if db.execute(stmt).rowcount:
+            return True, None
+
+        row = db.get(IdempotencyKey, key)
+        if row is None:
+            return False, None
+        if row.request_hash != fingerprint:
+            raise IdempotencyKeyReused(key)
+        if row.status == "done":
+            return False, orjson.loads(row.response)
+        return False, None
+
+
+def _complete(key: str, result: Dict) -> None:
+    """처리 결과를 저장하고 만료 시각을 TTL만큼 뒤로 미룸"""
+    now = datetime.utcnow()
+    with write_session() as db:
+        row = db.get(IdempotencyKey, key)
+        if row is None:
+            return
+        row.status = "done"
+        row.response = orjson.dumps(result).decode("utf-8")
+        row.expires_at = now + timedelta(seconds=settings.idempotency_ttl_seconds)
+
+
+def _release(key: str) -> None:
+    """실패한 처리의 키를 지워서 다음 요청이 다시 실행할 수 있게 함"""
+    with write_session() as db:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == "pending"
+            )
+        )
@@ -0,0 +1,380 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import aliased
+from app.core.config import settings
+from app.core.database import AnalysisJob, SessionLocal
+from app.core.writer import write_session
+from app.services.idempotency import IdempotencyKeyReused
+import asyncio
+import math
+import orjson
+import uuid
+
+# 큐가 비었을 때 다른 worker 프로세스가 넣은 작업이 있는지 다시 확인하는 간격 (초)
+POLL_INTERVAL = 1.0
+# 결과를 기다리는 요청이 다른 프로세스에서 끝난 작업을 확인하는 간격 (초)
+WAIT_POLL_INTERVAL = 0.5
+# 처리 시간 추정의 초기값 (초, Retry-After 계산용)
+INITIAL_JOB_SECONDS = 10.0
+# Retry-After 최대값 (초)
+MAX_RETRY_AFTER = 600
+# 실패한 작업을 다시 잡기까지 기다리는 시간 (초, 시도할 때마다 두 배, 최대 MAX_RETRY_BACKOFF)
+RETRY_BACKOFF = 5.0
+MAX_RETRY_BACKOFF = 300.0
+# worker 자체가 실패했을 때 (DB 잠금 등) 다시 돌기까지 기다리는 최대 시간 (초)
+MAX_WORKER_BACKOFF = 30.0
+
+FINISHED = ("done", "failed")
+
+# 작업이 들어오면 이 프로세스의 worker를 깨움
+_wakeup: Optional[asyncio.Event] = None
+# 이 프로세스에서 작업이 끝날 때마다 set하고 새 이벤트로 바꿈 (long-poll 중인 요청을 깨움)
+_finished: Optional[asyncio.Event] = None
+# 최근 작업 처리 시간의 지수 이동 평균 (초)
+_average_seconds = INITIAL_JOB_SECONDS
+
+
+class QueueFull(Exception):
+    """큐(또는 클라이언트 몫)가 가득 차서 작업을 받을 수 없을 때"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after(waiting: int, workers: Optional[int] = None) -> int:
+    """
+    앞에 waiting개의 작업이 있을 때 다시 보내기까지 기다릴 시간 (초)
+    (workers개가 동시에 처리하고 작업 하나에 최근 평균 처리 시간이 걸린다고 봄)
+    """
+    seconds = math.ceil(waiting / max(1, workers or settings.analysis_workers) * _average_seconds)
+    return min(max(1, seconds), MAX_RETRY_AFTER)
+
+
+async def enqueue(
+    request: Dict,
+    peer: str,
+    client_id: str,
+    fingerprint: str,
+    idempotency_key: Optional[str] = None
+) -> Tuple[Dict, bool]:
+    """
+    분석 요청을 큐에 넣음
+
+    peer(접속 주소)마다 한도와 처리 순서를 나누고, client_id는 같은 peer 안에서만 순서를 나눔
+    (클라이언트가 보내는 값이라 client_id를 바꿔 가며 한도를 피할 수 없게 함)
+    같은 Idempotency-Key로 이미 넣은 작업이 있으면 새로 넣지 않고 그 작업을 돌려줌
+
+    Returns:
+        (작업 dict, 이번에 새로 넣었는지)
+
+    Raises:
+        QueueFull: 대기 중인 작업이 analysis_queue_max_depth개 이상이거나
+                   이 peer의 대기/처리 중인 작업이 analysis_queue_max_per_client개 이상일 때
+        IdempotencyKeyReused: 같은 키로 다른 내용의 요청이 왔을 때
+    """
+    job, created = await asyncio.to_thread(_insert, request, peer, client_id, fingerprint, idempotency_key)
+    if created and _wakeup is not None:
+        _wakeup.set()
+    return job, created
+
+
+async def get_job(job_id: str, wait: float = 0) -> Optional[Dict]:
+    """
+    작업 상태를 가져옴. wait초 동안은 작업이 끝나기를 기다림 (long-poll)
+
+    Returns:
+        작업 dict (없으면 None)
+    """
+    deadline = asyncio.get_running_loop().time() + wait
+
+    while True:
+        # 확인하기 전에 이벤트를 잡아둬야 확인과 대기 사이에 끝난 작업을 놓치지 않음
+        finished = _finished
+        job = await asyncio.to_thread(_load, job_id)
+        remaining = deadline - asyncio.get_running_loop().time()
+        if job is None or job["status"] in FINISHED or remaining <= 0:
+            return job
+
+        try:
+            await asyncio.wait_for(
+                finished.wait() if finished is not None else asyncio.sleep(remaining),
+                min(remaining, WAIT_POLL_INTERVAL)
+            )
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers(work: Callable[[Dict], Awaitable[Dict]]) -> List["asyncio.Task[None]"]:
+    """
+    analysis_workers개의 worker 태스크를 시작함
+
+    work는 작업의 요청 dict를 받아 결과 dict를 돌려줌. 예외가 나면 analysis_job_max_attempts번까지
+    점점 길게 기다렸다가 다시 처리하고, 프로세스가 죽어 running으로 남은 작업은 lease가 지나면
+    다른 worker가 다시 처리함
+    """
+    global _wakeup, _finished
+    _wakeup = asyncio.Event()
+    _finished = asyncio.Event()
+    return [asyncio.create_task(_worker(work)) for _ in range(settings.analysis_workers)]
+
+
+async def _worker(work: Callable[[Dict], Awaitable[Dict]]) -> None:
+    failures = 0
+    while True:
+        try:
+            await _work_once(work)
+        except Exception as e:
+            # DB 잠금 등으로 잡기/저장이 실패해도 worker가 멈추지 않게 잠시 쉬었다가 다시 돎
+            # (저장하지 못한 작업은 running으로 남았다가 lease가 지나면 다시 처리됨)
+            failures += 1
+            delay = min(POLL_INTERVAL * 2 ** failures, MAX_WORKER_BACKOFF)
+            print(f"분석 worker 오류 ({delay:.0f}초 뒤 다시 시도): {e}")
+            await asyncio.sleep(delay)
+        else:
+            failures = 0
+
+
+async def _work_once(work: Callable[[Dict], Awaitable[Dict]]) -> None:
+    """작업 하나를 잡아서 처리함 (없으면 새 작업이 들어오거나 POLL_INTERVAL이 지날 때까지 기다림)"""
+    global _average_seconds
+
+    claimed = await asyncio.to_thread(_claim_next)
+    if claimed is None:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        return
+
+    loop = asyncio.get_running_loop()
+    job_id, request, attempts = claimed
+    started = loop.time()
+    try:
+        result = await work(request)
+    except asyncio.CancelledError:
+        # 종료 중이면 시도 횟수를 세지 않고 큐로 돌려놓아 다음에 바로 다시 처리함
+        await asyncio.to_thread(_requeue, job_id)
+        raise
+    except Exception as e:
+        retry = attempts < settings.analysis_job_max_attempts
+        print(f"분석 작업 실패 ({job_id}, {attempts}번째): {e}")
+        await asyncio.to_thread(_finish, job_id, error=str(e), retry=retry)
+    else:
+        _average_seconds = 0.8 * _average_seconds + 0.2 * (loop.time() - started)
+        await asyncio.to_thread(_finish, job_id, result=result)
+    _notify_finished()
+
+
+def _notify_finished() -> None:
+    global _finished
+    finished, _finished = _finished, asyncio.Event()
+    finished.set()
+
+
+def _insert(
+    request: Dict,
+    peer: str,
+    client_id: str,
+    fingerprint: str,
+    idempotency_key: Optional[str]
+) -> Tuple[Dict, bool]:
+    now = datetime.utcnow()
+
+    with write_session() as db:
+        db.execute(
+            delete(AnalysisJob).where(
+                AnalysisJob.status.in_(FINISHED),
+                AnalysisJob.finished_at < now - timedelta(seconds=settings.analysis_job_ttl_seconds)
+            )
+        )
+
+        if idempotency_key is not None:
+            existing = db.query(AnalysisJob).filter(AnalysisJob.idempotency_key == idempotency_key).first()
+            if existing is not None:
+                if existing.request_hash != fingerprint:
+                    raise IdempotencyKeyReused(idempotency_key)
+                return _serialize(db, existing), False
+
+        waiting = db.scalar(select(func.count()).where(AnalysisJob.status == "queued"))
+        if waiting >= settings.analysis_queue_max_depth:
+            raise QueueFull("분석 대기열이 가득 참", retry_after(waiting))
+
+        own = db.scalar(
+            select(func.count()).where(
+                AnalysisJob.peer == peer,
+                AnalysisJob.status.in_(("queued", "running"))
+            )
+        )
+        if own >= settings.analysis_queue_max_per_client:
+            raise QueueFull("이 클라이언트의 분석 요청이 너무 많음", retry_after(own))
+
+        job = AnalysisJob(
+            id=str(uuid.uuid4()),
+            peer=peer,
+            client_id=client_id,
+            idempotency_key=idempotency_key,
+            request_hash=fingerprint,
+            request=orjson.dumps(request).decode("utf-8"),
+            status="queued",
+            attempts=0,
+            created_at=now
+        )
+        db.add(job)
+        db.flush()
+        return _serialize(db, job), True
+
+
+def _claim_next() -> Optional[Tuple[str, Dict, int]]:
+    """
+    다음 작업을 running으로 잡음 (writer 잠금 안이라 여러 worker/프로세스가 같은 작업을 잡지 않음)
+
+    처리 중인 작업이 적은 peer, 같으면 가장 오래전에 작업을 시작한 peer의 작업부터 고르고,
+    같은 peer 안에서는 같은 기준으로 client_id끼리, 그 안에서는 먼저 들어온 작업부터 고름
+    (돌아가며 처리하므로 한 클라이언트가 작업을 많이 넣어도 다른 클라이언트가 뒤로 밀리지 않음)
+    실패해서 not_before까지 기다리는 작업은 건너뛰고,
+    lease가 지난 running 작업은 중단된 것으로 보고 다시 잡음
+
+    Returns:
+        (작업 id, 요청 dict, 이번이 몇 번째 시도인지), 없으면 None
+    """
+    now = datetime.utcnow()
+    claimable = or_(
+        (AnalysisJob.status == "queued") & or_(AnalysisJob.not_before.is_(None), AnalysisJob.not_before <= now),
+        (AnalysisJob.status == "running") & (AnalysisJob.lease_expires_at < now)
+    )
+
+    # 큐가 비었으면 writer 잠금을 잡지 않고 끝냄 (비어 있을 때의 폴링이 다른 쓰기를 막지 않게)
+    db = SessionLocal()
+    try:
+        if db.scalar(select(AnalysisJob.id).where(claimable).limit(1)) is None:
+            return None
+    finally:
+        db.close()
+
+    with write_session() as db:
+        # 처리 중인 작업 수는 대기/처리 중인 작업만 묶어서 셈 (끝난 작업은 TTL 동안 남아 있으므로 훑지 않음)
+        active = AnalysisJob.status.in_(("queued", "running"))
+        running = func.count().filter(
+            AnalysisJob.status == "running",
+            AnalysisJob.lease_expires_at >= now
+        ).label("running")
+        peers = (
+            select(AnalysisJob.peer, running)
+            .where(active)
+            .group_by(AnalysisJob.peer)
+            .subquery()
+        )
+        clients = (
+            select(AnalysisJob.peer, AnalysisJob.client_id, running)
+            .where(active)
+            .group_by(AnalysisJob.peer, AnalysisJob.client_id)
+            .subquery()
+        )
+        # 마지막으로 작업을 시작한 시각은 끝난 작업까지 봐야 하므로 (peer[, client_id], started_at) 인덱스로
+        # 후보마다 최댓값만 찾음 (후보는 대기 중인 작업이라 analysis_queue_max_depth개를 넘지 않음)
+        previous = aliased(AnalysisJob)
+        peer_last_started = (
+            select(func.max(previous.started_at))
+            .where(previous.peer == AnalysisJob.peer)
+            .scalar_subquery()
+        )
+        client_last_started = (
+            select(func.max(previous.started_at))
+            .where(previous.peer == AnalysisJob.peer, previous.client_id == AnalysisJob.client_id)
+            .scalar_subquery()
+        )
+        while True:
+            job = db.execute(
+                select(AnalysisJob)
+                .join(peers, peers.c.peer == AnalysisJob.peer)
+                .join(clients, (clients.c.peer == AnalysisJob.peer) & (clients.c.client_id == AnalysisJob.client_id))
+                .where(claimable)
+                .order_by(
+                    peers.c.running,
+                    peer_last_started.asc().nullsfirst(),
+                    clients.c.running,
+                    client_last_started.asc().nullsfirst(),
+                    AnalysisJob.created_at
+                )
+                .limit(1)
+            ).scalar()
+            if job is None:
+                return None
+
+            if job.attempts >= settings.analysis_job_max_attempts:
+                # 처리하던 프로세스가 계속 죽는 작업은 더 시도하지 않음
+                job.status = "failed"
+                job.error = job.error or "처리 중 중단됨"
+                job.finished_at = now
+                db.flush()
+                continue
+
+            job.status = "running"
+            job.attempts += 1
+            job.started_at = now
+            job.not_before = None
+            job.lease_expires_at = now + timedelta(seconds=settings.analysis_job_lease_seconds)
+            return job.id, orjson.loads(job.request), job.attempts
+
+
+def _finish(job_id: str, result: Optional[Dict] = None, error: Optional[str] = None, retry: bool = False) -> None:
+    """처리 결과를 저장함 (retry면 시도 횟수에 따라 기다릴 시각을 정해 다시 queued로 돌려놓음)"""
+    with write_session() as db:
+        job = db.get(AnalysisJob, job_id)
+        if job is None or job.status != "running":
+            return
+        job.error = error
+        job.lease_expires_at = None
+        if retry:
+            delay = min(RETRY_BACKOFF * 2 ** (job.attempts - 1), MAX_RETRY_BACKOFF)
+            job.status = "queued"
+            job.not_before = datetime.utcnow() + timedelta(seconds=delay)
+            return
+        job.status = "failed" if error is not None else "done"
+        job.result = orjson.dumps(result).decode("utf-8") if result is not None else None
+        job.finished_at = datetime.utcnow()
+
+
+def _requeue(job_id: str) -> None:
+    """처리하던 작업을 이번 시도를 세지 않고 바로 다시 잡을 수 있게 돌려놓음 (종료할 때)"""
+    with write_session() as db:
+        job = db.get(AnalysisJob, job_id)
+        if job is None or job.status != "running":
+            return
+        job.status = "queued"
+        job.attempts = max(0, job.attempts - 1)
+        job.lease_expires_at = None
+        job.not_before = None
+
+
+def _load(job_id: str) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        job = db.get(AnalysisJob, job_id)
+        return _serialize(db, job) if job is not None else None
+    finally:
+        db.close()
+
+
+def _serialize(db, job: AnalysisJob) -> Dict:
+    """작업을 응답 dict로 만듦 (대기 중이면 앞에 있는 작업 수도 넣음)"""
+    content = {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == "queued":
+        content["queue_position"] = db.scalar(
+            select(func.count()).where(AnalysisJob.status == "queued", AnalysisJob.created_at < job.created_at)
+        )
+    if job.status == "done":
+        content["result"] = orjson.loads(job.result)
+    if job.status == "failed":
+        content["error"] = job.error
+    return content
@@ -0,0 +1,127 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import tuple_
+from app.core.database import ErrorLog
+import base64
+import json
+
+
+def _encode(data: dict) -> str:
+    """dict를 URL에 안전한 불투명 문자열로 만듦"""
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    """_encode로 만든 문자열을 dict로 되돌림"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(data, dict):
+        raise ValueError(cursor)
+    return data
+
+
+def encode_cursor(created_at: datetime, error_id: str, direction: str = "next") -> str:
+    """(created_at, id) 위치를 불투명한 커서 문자열로 만듦"""
+    return _encode({"t": created_at.isoformat(), "id": error_id, "d": direction})
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, str]:
+    """
+    커서 문자열을 해석함
+
+    Returns:
+        (created_at, id, direction) 튜플
+
+    Raises:
+        ValueError: 잘못된 커서
+    """
+    try:
+        data = _decode(cursor)
+        direction = data.get("d", "next")
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data["t"]), str(data["id"]), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
+
+def encode_rank_cursor(score: float, rowid: int) -> str:
+    """검색 결과의 (점수, rowid) 위치를 커서 문자열로 만듦"""
+    return _encode({"s": score, "r": rowid})
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    검색 커서 문자열을 해석함
+
+    Raises:
+        ValueError: 잘못된 커서
+    """
+    try:
+        data = _decode(cursor)
+        return float(data["s"]), int(data["r"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
+
+def keyset_page(
+    query,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List, Optional[str], Optional[str]]:
+    """
+    (created_at, id) 인덱스를 따라 최신순 한 페이지를 가져옴
+    OFFSET 없이 커서 위치부터 읽으므로 깊은 페이지도 비용이 같음
+
+    Args:
+        query: ErrorLog 컬럼을 조회하는 쿼리 (필터 적용 후)
+        limit: 페이지 크기
+        cursor: 이전 응답의 next_cursor 또는 prev_cursor (없으면 첫 페이지)
+
+    Returns:
+        (rows, next_cursor, prev_cursor) 튜플
+    """
+    key = tuple_(ErrorLog.created_at, ErrorLog.id)
+    newest_first = (ErrorLog.created_at.desc(), ErrorLog.id.desc())
+    oldest_first = (ErrorLog.created_at.asc(), ErrorLog.id.asc())
+
+    if cursor is None:
+        rows = query.order_by(*newest_first).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _cursor_for(rows[-1], "next") if has_more and rows else None
+        return rows, next_cursor, None
+
+    created_at, error_id, direction = decode_cursor(cursor)
+
+    if direction == "next":
+        rows = (
+            query.filter(key < tuple_(created_at, error_id))
+            .order_by(*newest_first)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _cursor_for(rows[-1], "next") if has_more and rows else None
+        prev_cursor = _cursor_for(rows[0], "prev") if rows else None
+        return rows, next_cursor, prev_cursor
+
+    # 이전 페이지는 오래된 순으로 읽은 뒤 뒤집음
+    rows = (
+        query.filter(key > tuple_(created_at, error_id))
+        .order_by(*oldest_first)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = list(reversed(rows[:limit]))
+    next_cursor = _cursor_for(rows[-1], "next") if rows else None
+    prev_cursor = _cursor_for(rows[0], "prev") if has_more and rows else None
+    return rows, next_cursor, prev_cursor
+
+
+def _cursor_for(row, direction: str) -> str:
+    """조회된 행에서 커서를 만듦"""
+    return encode_cursor(row.created_at, row.id, direction)
@@ -1,15 +1,61 @@
-from typing import Optional, Dict, List
-from app.services.vector_store import VectorStore
-from app.services.ai import AIService
+from typing import TYPE_CHECKING, Optional, Dict, List
 from app.core.config import settings
+import asyncio
+import threading
 
-vector_store = VectorStore()
-ai_service = AIService()
+if TYPE_CHECKING:
+    from app.services.ai import AIService
+    from app.services.vector_store import VectorStore
+
+# chromadb/openai는 import와 초기화가 느리므로 처음 필요할 때 만듦
+# (앱 시작 시에는 warm_up()이 백그라운드에서 미리 만들어 둠)
+_vector_store: Optional["VectorStore"] = None
+_ai_service: Optional["AIService"] = None
+_init_lock = threading.Lock()
+
+
+def get_ai_service() -> "AIService":
+    """공유 AIService를 가져옴 (처음 호출 시 생성)"""
+    global _ai_service
+
+    if _ai_service is None:
+        with _init_lock:
+            if _ai_service is None:
+                from app.services.ai import AIService
+                _ai_service = AIService()
+    return _ai_service
+
+
+def get_vector_store() -> "VectorStore":
+    """
+    공유 VectorStore를 가져옴 (처음 호출 시 Chroma에 연결)
+    블로킹 호출이므로 async 코드에서는 asyncio.to_thread로 감싸서 씀
+    """
+    global _vector_store
+
+    if _vector_store is None:
+        ai_service = get_ai_service()
+        with _init_lock:
+            if _vector_store is None:
+                from app.services.vector_store import VectorStore
+                _vector_store = VectorStore(ai_service=ai_service)
+    return _vector_store
+
+
+def vector_store_ready() -> bool:
+    """VectorStore가 이미 만들어졌는지 확인함"""
+    return _vector_store is not None
+
+
+async def warm_up() -> None:
+    """Chroma 연결과 OpenAI 클라이언트를 스레드에서 미리 만들어 둠"""
+    await asyncio.to_thread(get_vector_store)
 
 
 async def analyze_error(
     error_log: str,
-    code_context: Optional[Dict] = None
+    code_context: Optional[Dict] = None,
+    code_frames: Optional[List[Dict]] = None
 ) -> Dict:
     """
     RAG 파이프라인으로 에러를 분석함
@@ -19,10 +65,15 @@ async def analyze_error(
     3. GPT-4o-mini 호출해서 분석
     4. ChromaDB에 임베딩 저장
 
+    code_frames가 있으면 에러 위치부터 호출한 쪽 순서로 모두 프롬프트에 넣음
+
     Returns:
         case_name, root_cause, solution, tags, similar_cases, vector_id를 담은 Dict
     """
 
+    vector_store = await asyncio.to_thread(get_vector_store)
+    ai_service = get_ai_service()
+
     # 유사한 에러 검색
     similar_cases = await vector_store.search_similar(
         error_log=error_log,
@@ -34,6 +85,7 @@ async def analyze_error(
     prompt = _build_analysis_prompt(
         error_log=error_log,
         code_context=code_context,
+        code_frames=code_frames,
         similar_cases=similar_cases
     )
 
@@ -65,7 +117,8 @@ async def analyze_error(
 def _build_analysis_prompt(
     error_log: str,
     code_context: Optional[Dict],
-    similar_cases: List[Dict]
+    similar_cases: List[Dict],
+    code_frames: Optional[List[Dict]] = None
 ) -> str:
     """AI 분석용 종합 프롬프트를 만듦"""
 
@@ -85,13 +138,19 @@ def _build_analysis_prompt(
     prompt_parts.append("## 현재 에러 로그\n")
     prompt_parts.append(f"```\n{error_log}\n```\n\n")
 
-    # 코드 컨텍스트가 있으면 추가
-    if code_context:
-        prompt_parts.append("## 에러 발생 지점 소스 코드\n")
-        prompt_parts.append(f"파일: {code_context.get('file_path', 'unknown')}\n")
-        prompt_parts.append(f"라인: {code_context.get('line_number', 'unknown')}\n")
-        prompt_parts.append(f"```{code_context.get('language', 'python')}\n")
-        prompt_parts.append(f"{code_context.get('code_snippet', '')}\n```\n\n")
+    # 코드 컨텍스트가 있으면 추가 (첫 프레임이 에러 위치, 나머지는 호출한 쪽)
+    frames = code_frames or ([code_context] if code_context else [])
+    for i, frame in enumerate(frames):
+        if i == 0:
+            prompt_parts.append("## 에러 발생 지점 소스 코드\n")
+        elif i == 1:
+            prompt_parts.append("## 호출 경로 소스 코드 (안쪽부터)\n")
+        prompt_parts.append(f"파일: {frame.get('file_path', 'unknown')}\n")
+        prompt_parts.append(f"라인: {frame.get('line_number', 'unknown')}\n")
+        if frame.get('function'):
+            prompt_parts.append(f"함수: {frame['function']}\n")
+        prompt_parts.append(f"```{frame.get('language', 'python')}\n")
+        prompt_parts.append(f"{frame.get('code_snippet', '')}\n```\n\n")
 
     # 출력 형식 지시사항 추가
     prompt_parts.append("""
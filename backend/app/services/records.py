@@ -0,0 +1,75 @@
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+from app.core.database import ErrorLog
+from app.services import counters
+from app.services.cache import detail_cache
+from app.services.rollups import record_rollups
+from app.services.search import sync_search_index
+from app.services.tags import add_error_tags, remove_error_tags
+import json
+
+
+def save_error_record(db: Session, record: ErrorLog, tags: List[str]) -> None:
+    """
+    에러 레코드를 저장하고 태그/카운터/집계를 같은 트랜잭션에서 갱신함
+    커밋은 호출하는 쪽에서 처리함
+    """
+    save_error_records(db, [(record, tags)])
+
+
+def save_error_records(db: Session, items: List[Tuple[ErrorLog, List[str]]]) -> None:
+    """
+    여러 에러 레코드를 한 번에 저장하고 태그/카운터/집계를 같은 트랜잭션에서 갱신함
+    커밋은 호출하는 쪽에서 처리함
+    """
+    if not items:
+        return
+
+    db.add_all([record for record, _ in items])
+    db.flush()
+    for record, tags in items:
+        add_error_tags(db, record.id, tags)
+        record_rollups(db, record, tags)
+    counters.increment(db, counters.ERRORS_TOTAL, len(items))
+    sync_search_index(db)
+
+
+def delete_error_records(db: Session, error_ids: List[str]) -> int:
+    """
+    에러 레코드들을 지우고 태그/카운터를 같은 트랜잭션에서 갱신함
+    커밋은 호출하는 쪽에서 처리함
+
+    Returns:
+        실제로 삭제된 행 수
+    """
+    if not error_ids:
+        return 0
+
+    remove_error_tags(db, error_ids)
+    deleted = db.query(ErrorLog).filter(ErrorLog.id.in_(error_ids)).delete(
+        synchronize_session=False
+    )
+    counters.increment(db, counters.ERRORS_TOTAL, -deleted)
+    sync_search_index(db)
+
+    removed = set(error_ids)
+    detail_cache.discard_where(lambda key: key[0] in removed)
+    return deleted
+
+
+def serialize_record(record: ErrorLog) -> Dict:
+    """에러 레코드 전체를 JSON으로 옮길 수 있는 dict로 만듦 (아카이브/내보내기용)"""
+    return {
+        "id": record.id,
+        "case_name": record.case_name,
+        "command": record.command,
+        "error_log": record.error_log,
+        "code_snippet": record.code_snippet,
+        "file_path": record.file_path,
+        "line_number": record.line_number,
+        "ai_solution": record.ai_solution,
+        "root_cause": record.root_cause,
+        "tags": json.loads(record.tags) if record.tags else [],
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "vector_id": record.vector_id
+    }
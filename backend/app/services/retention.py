@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, undefer
+from app.core.config import settings
+from app.core.database import ErrorCase, ErrorLog
+from app.core.writer import is_leader, write_session
+from app.services.cache import detail_cache
+from app.services.records import delete_error_records, serialize_record
+from app.services.rag import get_vector_store
+from app.services.rollups import normalize_case_name
+from app.services.search import sync_search_index
+import asyncio
+import gzip
+import json
+import os
+
+
+def archive_records(records: List[ErrorLog], reason: str) -> None:
+    """
+    레코드를 생성 날짜별 gzip JSONL 파일에 추가함
+    (archive_directory/YYYY/MM/errors-YYYY-MM-DD.jsonl.gz)
+
+    gzip은 멤버를 이어 붙여도 유효하므로 배치마다 append 모드로 씀
+    """
+    archived_at = datetime.utcnow().isoformat()
+    partitions: Dict[str, List[str]] = {}
+
+    for record in records:
+        day = (record.created_at or datetime.utcnow()).date()
+        path = os.path.join(
+            settings.archive_directory,
+            f"{day.year:04d}",
+            f"{day.month:02d}",
+            f"errors-{day.isoformat()}.jsonl.gz"
+        )
+        line = json.dumps({
+            **serialize_record(record),
+            "archive_reason": reason,
+            "archived_at": archived_at
+        }, ensure_ascii=False)
+        partitions.setdefault(path, []).append(line)
+
+    for path, lines in partitions.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def strip_full_logs(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    cutoff 이전 에러의 원본 로그를 아카이브하고 DB에는 분석 결과만 남김
+
+    Returns:
+        처리한 레코드 수 (한 배치)
+    """
+    records = (
+        db.query(ErrorLog)
+        .options(undefer(ErrorLog.error_log), undefer(ErrorLog.code_snippet),
+                 undefer(ErrorLog.ai_solution), undefer(ErrorLog.root_cause))
+        .filter(ErrorLog.created_at < cutoff, ErrorLog.log_archived_at.is_(None))
+        .order_by(ErrorLog.created_at, ErrorLog.id)
+        .limit(batch_size)
+        .all()
+    )
+    if not records:
+        return 0
+
+    archive_records(records, "log_stripped")
+
+    now = datetime.utcnow()
+    for record in records:
+        record.error_log = ""
+        record.code_snippet = None
+        record.log_archived_at = now
+    db.flush()
+    sync_search_index(db)
+
+    stripped = {record.id for record in records}
+    detail_cache.discard_where(lambda key: key[0] in stripped)
+    return len(records)
+
+
+def drop_single_occurrences(
+    db: Session,
+    cutoff: datetime,
+    batch_size: int,
+    after: Optional[Tuple[datetime, str]] = None
+) -> Tuple[List[str], Optional[Tuple[datetime, str]]]:
+    """
+    cutoff 이전에 한 번만 발생한 에러를 아카이브 후 삭제함
+    한 번만 발생했는지는 집계와 같은 기준(normalize_case_name으로 정규화한 에러 이름의 error_cases 발생 수)으로
+    판단하므로 "KeyError: 'a'"와 "KeyError: 'b'"처럼 값만 다른 에러는 재발한 것으로 보고 남김
+
+    Args:
+        after: 이전 배치가 돌려준 (created_at, id) 위치 (이 뒤부터 훑음)
+
+    Returns:
+        (삭제한 레코드의 vector_id 리스트 (커밋 후 Chroma에서 지워야 함),
+         다음 배치를 시작할 위치 (끝까지 훑었으면 None))
+    """
+    key = tuple_(ErrorLog.created_at, ErrorLog.id)
+    query = db.query(ErrorLog.id, ErrorLog.case_name, ErrorLog.created_at).filter(ErrorLog.created_at < cutoff)
+    if after is not None:
+        query = query.filter(key > tuple_(*after))
+    candidates = query.order_by(ErrorLog.created_at, ErrorLog.id).limit(batch_size).all()
+    if not candidates:
+        return [], None
+    next_after = (candidates[-1].created_at, candidates[-1].id) if len(candidates) == batch_size else None
+
+    case_keys = {candidate.id: normalize_case_name(candidate.case_name) for candidate in candidates}
+    occurrences = dict(
+        db.query(ErrorCase.case_key, ErrorCase.occurrences)
+        .filter(ErrorCase.case_key.in_(set(case_keys.values())))
+        .all()
+    )
+    single_ids = [error_id for error_id, case_key in case_keys.items() if occurrences.get(case_key, 0) <= 1]
+    if not single_ids:
+        return [], next_after
+
+    records = (
+        db.query(ErrorLog)
+        .options(undefer(ErrorLog.error_log), undefer(ErrorLog.code_snippet),
+                 undefer(ErrorLog.ai_solution), undefer(ErrorLog.root_cause))
+        .filter(ErrorLog.id.in_(single_ids))
+        .order_by(ErrorLog.created_at, ErrorLog.id)
+        .all()
+    )
+    archive_records(records, "expired")
+
+    delete_error_records(db, [record.id for record in records])
+    return [record.vector_id for record in records], next_after
+
+
+def apply_retention() -> Dict[str, int]:
+    """
+    설정된 보존 정책을 작은 배치로 끝까지 적용함
+    배치마다 writer 잠금을 잡고 커밋하므로 그 사이에 다른 쓰기가 끼어들 수 있음
+
+    Returns:
+        stripped, dropped 처리 수를 담은 dict
+    """
+    stats = {"stripped": 0, "dropped": 0}
+    batch_size = settings.retention_batch_size
+    now = datetime.utcnow()
+
+    if settings.retention_full_log_days > 0:
+        cutoff = now - timedelta(days=settings.retention_full_log_days)
+        while True:
+            with write_session() as db:
+                n = strip_full_logs(db, cutoff, batch_size)
+            stats["stripped"] += n
+            if n < batch_size:
+                break
+
+    if settings.retention_single_occurrence_days > 0:
+        cutoff = now - timedelta(days=settings.retention_single_occurrence_days)
+        after = None
+        while True:
+            with write_session() as db:
+                vector_ids, after = drop_single_occurrences(db, cutoff, batch_size, after)
+            # DB 커밋 후에 벡터를 지움 (실패해도 검색 결과에 고아 벡터가 남을 뿐임)
+            if vector_ids:
+                get_vector_store().delete_errors(vector_ids)
+            stats["dropped"] += len(vector_ids)
+            if after is None:
+                break
+
+    return stats
+
+
+async def retention_loop() -> None:
+    """
+    보존 정책을 주기적으로 적용하는 백그라운드 작업
+    worker가 여러 개면 leader 잠금을 잡은 하나만 실행함
+    """
+    while True:
+        try:
+            if is_leader():
+                stats = await asyncio.to_thread(apply_retention)
+                if stats["stripped"] or stats["dropped"]:
+                    print(f"보존 정책 적용: {stats}")
+        except Exception as e:
+            print(f"보존 정책 적용 실패: {e}")
+        await asyncio.sleep(settings.retention_interval_seconds)
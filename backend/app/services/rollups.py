@@ -0,0 +1,251 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.core.database import ErrorCase, ErrorLog, ErrorRollup
+from app.services.tags import normalize_tags
+import json
+import os
+import re
+
+GRANULARITIES = ("hour", "day")
+
+# 에러 이름에서 실행마다 달라지는 부분을 지우는 패턴
+_CASE_NORMALIZERS = [
+    (re.compile(r"(['\"`]).*?\1"), "<*>"),           # 따옴표 안의 값
+    (re.compile(r"(?:[A-Za-z]:)?[\\/][^\s:,)]+"), "<path>"),  # 파일 경로
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<hex>"),     # 주소
+    (re.compile(r"\b\d+\b"), "<n>"),                  # 숫자 (라인 번호 등)
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_case_name(case_name: str) -> str:
+    """
+    집계용으로 에러 이름을 정규화함
+    (예: "NameError: name 'x' is not defined" -> "nameerror: name <*> is not defined")
+    """
+    key = case_name or ""
+    for pattern, replacement in _CASE_NORMALIZERS:
+        key = pattern.sub(replacement, key)
+    return key.strip().lower()[:200]
+
+
+def normalize_command(command: str) -> str:
+    """
+    집계용으로 명령어를 정규화함 (실행 파일 이름 + 하위 명령어)
+    (예: "python test.py" -> "python", "npm run build" -> "npm run")
+    """
+    parts = (command or "").split()
+    if not parts:
+        return ""
+
+    key = os.path.basename(parts[0])
+    if len(parts) > 1 and re.fullmatch(r"[a-z][a-z-]*", parts[1]):
+        key += f" {parts[1]}"
+    return key.lower()
+
+
+def record_rollups(db: Session, record: ErrorLog, tags: List[str]) -> None:
+    """
+    새 에러 한 건을 시간/일 집계에 반영함
+    커밋은 호출하는 쪽에서 에러 insert와 같은 트랜잭션으로 처리함
+    """
+    created_at = record.created_at or datetime.utcnow()
+    case_key = normalize_case_name(record.case_name)
+
+    case = db.get(ErrorCase, case_key)
+    if case is None:
+        status = "new"
+        db.add(ErrorCase(
+            case_key=case_key,
+            case_name=record.case_name,
+            first_seen=created_at,
+            last_seen=created_at,
+            occurrences=1
+        ))
+    else:
+        status = "recurring"
+        case.occurrences += 1
+        case.last_seen = max(case.last_seen, created_at)
+        case.first_seen = min(case.first_seen, created_at)
+
+    keys = [
+        ("all", "*"),
+        ("case", case_key),
+        ("command", normalize_command(record.command)),
+        ("status", status),
+    ] + [("tag", tag) for tag in normalize_tags(tags)]
+
+    rows = [
+        {
+            "granularity": granularity,
+            "dimension": dimension,
+            "bucket_start": bucket_start(created_at, granularity),
+            "key": key,
+            "count": 1
+        }
+        for granularity in GRANULARITIES
+        for dimension, key in keys
+    ]
+    stmt = insert(ErrorRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ErrorRollup.granularity,
+            ErrorRollup.dimension,
+            ErrorRollup.bucket_start,
+            ErrorRollup.key
+        ],
+        set_={"count": ErrorRollup.count + stmt.excluded.count}
+    )
+    db.execute(stmt)
+    db.flush()
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """시각이 속한 집계 구간의 시작 시각을 구함"""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def default_range(
+    granularity: str,
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """조회 구간 기본값 (hour는 최근 48시간, day는 최근 30일)"""
+    until = until or datetime.utcnow()
+    if since is None:
+        span = timedelta(hours=48) if granularity == "hour" else timedelta(days=30)
+        since = until - span
+    return bucket_start(since, granularity), until
+
+
+def top_keys(
+    db: Session,
+    dimension: str,
+    granularity: str,
+    since: datetime,
+    until: datetime,
+    limit: int = 10
+) -> List[Dict]:
+    """
+    구간 안에서 가장 많이 발생한 값(태그/에러/명령어)을 가져옴
+
+    Returns:
+        key, count (case는 대표 case_name 포함)를 담은 dict 리스트
+    """
+    total = func.sum(ErrorRollup.count).label("total")
+    rows = (
+        db.query(ErrorRollup.key, total)
+        .filter(
+            ErrorRollup.granularity == granularity,
+            ErrorRollup.dimension == dimension,
+            ErrorRollup.bucket_start >= since,
+            ErrorRollup.bucket_start <= until
+        )
+        .group_by(ErrorRollup.key)
+        .order_by(total.desc(), ErrorRollup.key)
+        .limit(limit)
+        .all()
+    )
+
+    results = [{"key": key, "count": count} for key, count in rows]
+    if dimension == "case" and results:
+        cases = {
+            case.case_key.lower(): case
+            for case in db.query(ErrorCase).filter(
+                ErrorCase.case_key.in_([item["key"] for item in results])
+            )
+        }
+        for item in results:
+            case = cases.get(item["key"].lower())
+            if case:
+                item["case_name"] = case.case_name
+                item["first_seen"] = case.first_seen.isoformat()
+                item["occurrences"] = case.occurrences
+    return results
+
+
+def trend(
+    db: Session,
+    granularity: str,
+    since: datetime,
+    until: datetime,
+    dimension: str = "all",
+    key: str = "*"
+) -> List[Dict]:
+    """
+    구간별 발생 수 시계열을 가져옴 (발생이 없는 구간은 빠짐)
+
+    Returns:
+        bucket, count를 담은 dict 리스트 (오래된 순)
+    """
+    rows = (
+        db.query(ErrorRollup.bucket_start, ErrorRollup.count)
+        .filter(
+            ErrorRollup.granularity == granularity,
+            ErrorRollup.dimension == dimension,
+            ErrorRollup.bucket_start >= since,
+            ErrorRollup.bucket_start <= until,
+            ErrorRollup.key == key
+        )
+        .order_by(ErrorRollup.bucket_start)
+        .all()
+    )
+    return [{"bucket": bucket.isoformat(), "count": count} for bucket, count in rows]
+
+
+def new_vs_recurring(
+    db: Session,
+    granularity: str,
+    since: datetime,
+    until: datetime
+) -> List[Dict]:
+    """
+    구간별 신규 에러와 재발 에러 수를 가져옴
+
+    Returns:
+        bucket, new, recurring을 담은 dict 리스트 (오래된 순)
+    """
+    rows = (
+        db.query(ErrorRollup.bucket_start, ErrorRollup.key, ErrorRollup.count)
+        .filter(
+            ErrorRollup.granularity == granularity,
+            ErrorRollup.dimension == "status",
+            ErrorRollup.bucket_start >= since,
+            ErrorRollup.bucket_start <= until
+        )
+        .order_by(ErrorRollup.bucket_start)
+        .all()
+    )
+
+    series: Dict[datetime, Dict] = {}
+    for bucket, status, count in rows:
+        item = series.setdefault(bucket, {"bucket": bucket.isoformat(), "new": 0, "recurring": 0})
+        item[status] = count
+    return list(series.values())
+
+
+def rebuild_rollups(db: Session, batch_size: int = 500) -> None:
+    """기존 에러 전체로 집계 테이블을 다시 만듦 (마이그레이션용, 오래된 순으로 처리)"""
+    db.query(ErrorRollup).delete(synchronize_session=False)
+    db.query(ErrorCase).delete(synchronize_session=False)
+
+    last = None
+    while True:
+        query = db.query(ErrorLog.id, ErrorLog.case_name, ErrorLog.command,
+                         ErrorLog.tags, ErrorLog.created_at)
+        if last is not None:
+            query = query.filter(tuple_(ErrorLog.created_at, ErrorLog.id) > tuple_(*last))
+        rows = query.order_by(ErrorLog.created_at, ErrorLog.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        for row in rows:
+            tags = json.loads(row.tags) if row.tags else []
+            record_rollups(db, row, tags if isinstance(tags, list) else [])
+        db.commit()
+        last = (rows[-1].created_at, rows[-1].id)
@@ -0,0 +1,168 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import column, func, literal_column, select, table, text, tuple_
+from sqlalchemy.orm import Session
+from app.core.compression import decompress_text
+from app.core.database import ErrorLog
+from app.services.pagination import encode_rank_cursor, decode_rank_cursor
+from app.services.tags import normalize_tags, tagged_error_ids
+import json
+import re
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# bm25 컬럼 가중치: case_name, error_log, root_cause, ai_solution 순
+COLUMN_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# 검색 인덱스에 넣는 컬럼 (errors_fts와 같은 순서)
+FTS_COLUMNS = ("case_name", "error_log", "root_cause", "ai_solution")
+
+
+def sync_search_index(db: Session) -> int:
+    """
+    errors 트리거가 errors_fts_changes에 남긴 변경을 압축을 풀어서 검색 인덱스에 반영함
+    errors를 바꾼 쓰기 트랜잭션 안에서 부름 (커밋은 호출하는 쪽에서 처리함)
+
+    Returns:
+        반영한 변경 수
+    """
+    changes = db.execute(text("SELECT * FROM errors_fts_changes ORDER BY id")).mappings().all()
+    if not changes:
+        return 0
+
+    # external content 테이블은 색인했던 값과 같은 값으로 'delete'해야 하므로 기록된 순서대로 반영함
+    names = ", ".join(FTS_COLUMNS)
+    values = ", ".join(f":{name}" for name in FTS_COLUMNS)
+    statements = {
+        "delete": text(f"INSERT INTO errors_fts(errors_fts, rowid, {names}) VALUES ('delete', :row, {values})"),
+        "insert": text(f"INSERT INTO errors_fts(rowid, {names}) VALUES (:row, {values})"),
+    }
+
+    operations = []
+    for change in changes:
+        old = {name: decompress_text(change[f"old_{name}"]) for name in FTS_COLUMNS} if change["has_old"] else None
+        new = {name: decompress_text(change[f"new_{name}"]) for name in FTS_COLUMNS} if change["has_new"] else None
+        if old == new:
+            # 압축만 바뀐 경우 (색인할 텍스트가 같음)
+            continue
+        if old is not None:
+            operations.append(("delete", {"row": change["row"], **old}))
+        if new is not None:
+            operations.append(("insert", {"row": change["row"], **new}))
+
+    # 같은 종류가 이어지는 구간은 한 번에 실행함
+    start = 0
+    while start < len(operations):
+        kind = operations[start][0]
+        end = start
+        while end < len(operations) and operations[end][0] == kind:
+            end += 1
+        db.execute(statements[kind], [params for _, params in operations[start:end]])
+        start = end
+
+    db.execute(text("DELETE FROM errors_fts_changes WHERE id <= :last"), {"last": changes[-1]["id"]})
+    return len(changes)
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    사용자 입력을 FTS5 MATCH 구문으로 바꿈
+    토큰마다 따옴표로 감싸 특수문자로 인한 문법 오류를 막고,
+    마지막 토큰은 입력 중인 단어도 찾도록 접두사 검색으로 만듦
+
+    Returns:
+        MATCH 문자열 (검색할 토큰이 없으면 None)
+    """
+    tokens = _TOKEN_PATTERN.findall(q)
+    if not tokens:
+        return None
+
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_errors(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match: str = "all"
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    FTS5 인덱스로 에러를 검색해서 관련도 순으로 가져옴
+
+    Args:
+        q: 검색어
+        limit: 페이지 크기
+        cursor: 이전 응답의 next_cursor
+        tags: 태그 필터
+        match: 태그 필터 방식 ("all" 또는 "any")
+
+    Returns:
+        (결과 리스트, next_cursor) 튜플
+
+    Raises:
+        ValueError: 잘못된 커서
+    """
+    match_query = build_match_query(q)
+    if match_query is None:
+        return [], None
+
+    fts_table = table("errors_fts", column("rowid"))
+    fts = literal_column("errors_fts")
+    rowid = literal_column("errors.rowid")
+
+    ranked = (
+        select(
+            ErrorLog.id,
+            ErrorLog.case_name,
+            ErrorLog.command,
+            ErrorLog.tags,
+            ErrorLog.created_at,
+            rowid.label("rowid"),
+            func.bm25(fts, *COLUMN_WEIGHTS).label("score"),
+            func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_END).label("case_name_highlight"),
+            func.snippet(fts, -1, HIGHLIGHT_START, HIGHLIGHT_END, "…", 24).label("snippet"),
+        )
+        .select_from(fts_table)
+        .join(ErrorLog, rowid == fts_table.c.rowid)
+        .where(fts.op("MATCH")(match_query))
+    )
+
+    tags = normalize_tags(tags)
+    if tags:
+        ranked = ranked.where(ErrorLog.id.in_(tagged_error_ids(tags, match)))
+
+    ranked = ranked.subquery()
+    stmt = select(ranked).order_by(ranked.c.score, ranked.c.rowid).limit(limit + 1)
+
+    if cursor:
+        score, last_rowid = decode_rank_cursor(cursor)
+        stmt = stmt.where(tuple_(ranked.c.score, ranked.c.rowid) > tuple_(score, last_rowid))
+
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_rank_cursor(rows[-1].score, rows[-1].rowid)
+
+    results = [
+        {
+            "id": row.id,
+            "case_name": row.case_name,
+            "case_name_highlight": row.case_name_highlight,
+            "command": row.command,
+            "tags": json.loads(row.tags) if row.tags else [],
+            "created_at": row.created_at.isoformat(),
+            "score": -row.score,
+            "snippet": row.snippet,
+        }
+        for row in rows
+    ]
+    return results, next_cursor
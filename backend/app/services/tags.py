@@ -0,0 +1,134 @@
+from collections import Counter
+from typing import Iterable, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.core.database import ErrorLog, ErrorTag, TagCount
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """
+    태그 목록을 정리함 (공백 제거, 빈 값 제거, 대소문자 무시 중복 제거)
+
+    Returns:
+        입력 순서를 유지한 태그 리스트
+    """
+    result = []
+    seen = set()
+    for tag in tags or []:
+        if not isinstance(tag, str):
+            continue
+        tag = tag.strip()
+        if not tag or tag.lower() in seen:
+            continue
+        seen.add(tag.lower())
+        result.append(tag)
+    return result
+
+
+def add_error_tags(db: Session, error_id: str, tags: Iterable[str]) -> List[str]:
+    """
+    에러의 태그 연관 행을 추가하고 태그 카운트를 올림
+    커밋은 호출하는 쪽에서 에러 insert와 같은 트랜잭션으로 처리함
+
+    Returns:
+        저장된 태그 리스트
+    """
+    tags = normalize_tags(tags)
+    if not tags:
+        return tags
+
+    db.execute(
+        insert(ErrorTag).on_conflict_do_nothing(),
+        [{"error_id": error_id, "tag": tag} for tag in tags]
+    )
+    _increment_tag_counts(db, tags)
+    return tags
+
+
+def remove_error_tags(db: Session, error_ids: List[str]) -> None:
+    """에러들의 태그 연관 행을 지우고 태그 카운트를 내림"""
+    if not error_ids:
+        return
+
+    rows = db.execute(
+        select(ErrorTag.tag).where(ErrorTag.error_id.in_(error_ids))
+    ).scalars().all()
+
+    db.query(ErrorTag).filter(ErrorTag.error_id.in_(error_ids)).delete(
+        synchronize_session=False
+    )
+    for tag, n in Counter(rows).items():
+        db.query(TagCount).filter(TagCount.tag == tag).update(
+            {TagCount.count: TagCount.count - n}, synchronize_session=False
+        )
+    db.query(TagCount).filter(TagCount.count <= 0).delete(synchronize_session=False)
+
+
+def tagged_error_ids(tags: List[str], match: str = "all"):
+    """
+    태그 조건에 맞는 에러 id를 고르는 select를 만듦 (error_tags 인덱스만 사용)
+
+    Args:
+        tags: 정리된 태그 리스트
+        match: "all"이면 모든 태그를 가진 에러, "any"면 하나라도 가진 에러
+    """
+    tagged = select(ErrorTag.error_id).where(ErrorTag.tag.in_(tags))
+    if match == "all" and len(tags) > 1:
+        tagged = tagged.group_by(ErrorTag.error_id).having(
+            func.count(ErrorTag.tag) == len(tags)
+        )
+    elif len(tags) > 1:
+        tagged = tagged.distinct()
+    return tagged
+
+
+def filter_by_tags(query, tags: List[str], match: str = "all"):
+    """
+    태그 연관 테이블로 쿼리를 필터링함
+
+    Args:
+        query: ErrorLog를 조회하는 쿼리
+        tags: 필터링할 태그 리스트
+        match: "all"이면 모든 태그를 가진 에러, "any"면 하나라도 가진 에러
+    """
+    tags = normalize_tags(tags)
+    if not tags:
+        return query
+    return query.filter(ErrorLog.id.in_(tagged_error_ids(tags, match)))
+
+
+def get_tag_counts(db: Session, limit: int = 50, prefix: Optional[str] = None) -> List[dict]:
+    """
+    유지되는 태그 카운트를 많은 순으로 가져옴
+
+    Returns:
+        tag, count를 담은 dict 리스트
+    """
+    query = db.query(TagCount).filter(TagCount.count > 0)
+    if prefix:
+        query = query.filter(TagCount.tag.startswith(prefix, autoescape=True))
+
+    rows = query.order_by(TagCount.count.desc(), TagCount.tag).limit(limit).all()
+    return [{"tag": row.tag, "count": row.count} for row in rows]
+
+
+def rebuild_tag_counts(db: Session) -> None:
+    """연관 테이블에서 태그 카운트를 다시 계산함 (마이그레이션용)"""
+    db.query(TagCount).delete(synchronize_session=False)
+    db.execute(
+        insert(TagCount).from_select(
+            ["tag", "count"],
+            select(ErrorTag.tag, func.count()).group_by(ErrorTag.tag)
+        )
+    )
+
+
+def _increment_tag_counts(db: Session, tags: List[str]) -> None:
+    """태그 카운트를 1씩 올림 (없으면 생성)"""
+    stmt = insert(TagCount).values([{"tag": tag, "count": 1} for tag in tags])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TagCount.tag],
+        set_={"count": TagCount.count + 1}
+    )
+    db.execute(stmt)
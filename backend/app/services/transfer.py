@@ -0,0 +1,229 @@
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+from app.core.config import settings
+from app.core.database import SessionLocal, ErrorLog
+from app.core.writer import write_session
+from app.services.records import save_error_records, serialize_record
+from app.services.tags import filter_by_tags, normalize_tags
+from app.services.rag import get_vector_store
+import asyncio
+import json
+
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+# 응답에 담을 잘못된 줄 번호 최대 개수
+MAX_REPORTED_INVALID = 20
+
+
+class ImportRecord(BaseModel):
+    """가져오는 NDJSON 한 줄 (/api/export 형식, archive_reason 같은 다른 필드는 무시함)"""
+    id: str = Field(min_length=1)
+    case_name: str = Field(min_length=1)
+    command: str = Field(min_length=1)
+    # 보존 정책으로 로그만 비운 레코드는 error_log가 빈 문자열임
+    error_log: str
+    code_snippet: Optional[str] = None
+    file_path: Optional[str] = None
+    line_number: Optional[int] = None
+    ai_solution: Optional[str] = None
+    root_cause: Optional[str] = None
+    tags: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    vector_id: Optional[str] = None
+    vector: Optional[List[float]] = None
+
+
+def iter_export_lines(
+    since: Optional[datetime] = None,
+    tags: Optional[List[str]] = None,
+    match: str = "all",
+    include_vectors: bool = False
+) -> Iterator[bytes]:
+    """
+    에러 레코드를 오래된 순으로 한 줄씩 NDJSON으로 내보냄
+    서버 측 커서(yield_per)로 배치만큼만 메모리에 올림
+
+    StreamingResponse가 응답을 다 보낼 때까지 세션을 써야 하므로
+    요청 의존성 대신 자체 세션을 열고 닫음
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(ErrorLog).options(
+            undefer(ErrorLog.error_log),
+            undefer(ErrorLog.code_snippet),
+            undefer(ErrorLog.ai_solution),
+            undefer(ErrorLog.root_cause)
+        )
+        if since:
+            query = query.filter(ErrorLog.created_at >= since)
+        if tags:
+            query = filter_by_tags(query, tags, match)
+
+        stmt = query.order_by(ErrorLog.created_at, ErrorLog.id).statement
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        for batch in result.scalars().partitions():
+            embeddings = {}
+            if include_vectors:
+                embeddings = get_vector_store().get_embeddings(
+                    [record.vector_id for record in batch]
+                )
+
+            lines = []
+            for record in batch:
+                item = serialize_record(record)
+                if include_vectors:
+                    item["vector"] = embeddings.get(record.vector_id)
+                lines.append(json.dumps(item, ensure_ascii=False))
+
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    finally:
+        db.close()
+
+
+def import_records(items: List[Dict]) -> Dict[str, int]:
+    """
+    한 배치의 레코드를 저장함 (이미 있는 id는 건너뜀)
+
+    Returns:
+        imported, skipped 수를 담은 dict
+    """
+    ids = [item["id"] for item in items]
+
+    with write_session() as db:
+        existing = set(
+            db.execute(select(ErrorLog.id).where(ErrorLog.id.in_(ids))).scalars()
+        )
+
+        new_items = []
+        vectors = []
+        seen = set()
+        for item in items:
+            if item["id"] in existing or item["id"] in seen:
+                continue
+            seen.add(item["id"])
+
+            tags = normalize_tags(item.get("tags"))
+            record = ErrorLog(
+                id=item["id"],
+                case_name=item["case_name"],
+                command=item["command"],
+                error_log=item["error_log"],
+                code_snippet=item.get("code_snippet"),
+                file_path=item.get("file_path"),
+                line_number=item.get("line_number"),
+                ai_solution=item.get("ai_solution"),
+                root_cause=item.get("root_cause"),
+                tags=json.dumps(tags),
+                created_at=item["created_at"],
+                vector_id=item.get("vector_id")
+            )
+            new_items.append((record, tags))
+
+            if item.get("vector") and item.get("vector_id"):
+                vectors.append((item, tags))
+
+        save_error_records(db, new_items)
+
+    if vectors:
+        get_vector_store().upsert_embeddings(
+            vector_ids=[item["vector_id"] for item, _ in vectors],
+            embeddings=[item["vector"] for item, _ in vectors],
+            metadatas=[
+                {"case_name": item["case_name"], "tags": ", ".join(tags)}
+                for item, tags in vectors
+            ],
+            documents=[item["error_log"][:1000] for item, _ in vectors]
+        )
+
+    return {"imported": len(new_items), "skipped": len(items) - len(new_items)}
+
+
+async def import_stream(chunks: AsyncIterator[bytes]) -> Dict:
+    """
+    업로드 스트림을 줄 단위로 읽어서 배치마다 저장함
+    전체 본문을 메모리에 올리지 않고, DB 작업은 스레드에서 실행함
+
+    Returns:
+        imported, skipped, invalid 수와 잘못된 줄 번호(invalid_lines)를 담은 dict
+    """
+    stats = {"imported": 0, "skipped": 0, "invalid": 0, "invalid_lines": []}
+    batch: List[Dict] = []
+    buffer = bytearray()
+    line_number = 0
+    # max_import_line_bytes를 넘은 줄의 나머지를 다음 줄바꿈까지 버리는 중인지
+    skipping = False
+
+    async def flush():
+        if batch:
+            result = await asyncio.to_thread(import_records, list(batch))
+            stats["imported"] += result["imported"]
+            stats["skipped"] += result["skipped"]
+            batch.clear()
+
+    def reject():
+        stats["invalid"] += 1
+        if len(stats["invalid_lines"]) < MAX_REPORTED_INVALID:
+            stats["invalid_lines"].append(line_number)
+
+    def collect(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return
+        if len(line) > settings.max_import_line_bytes:
+            reject()
+            return
+        try:
+            batch.append(parse_import_line(line))
+        except ValueError:
+            reject()
+
+    async for chunk in chunks:
+        # 새로 받은 부분에서만 줄바꿈을 찾음 (긴 줄이 여러 조각에 걸쳐도 앞부분을 다시 훑지 않음)
+        start = 0
+        scan = len(buffer)
+        buffer += chunk
+        while True:
+            end = buffer.find(b"\n", scan)
+            if end < 0:
+                break
+            if skipping:
+                skipping = False
+            else:
+                collect(bytes(buffer[start:end]))
+            start = scan = end + 1
+        del buffer[:start]
+
+        if len(buffer) > settings.max_import_line_bytes:
+            # 줄바꿈 없이 너무 길어지면 그 줄은 거절하고 다음 줄바꿈까지 버림 (메모리에 쌓지 않음)
+            if not skipping:
+                line_number += 1
+                reject()
+                skipping = True
+            buffer.clear()
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+
+    if not skipping:
+        collect(bytes(buffer))
+    await flush()
+    return stats
+
+
+def parse_import_line(line: bytes) -> Dict:
+    """
+    NDJSON 한 줄을 ImportRecord로 검증해서 dict로 만듦
+
+    Raises:
+        ValueError: JSON 객체가 아니거나 필수 필드가 없거나 필드 타입이 틀렸을 때
+                    (pydantic의 ValidationError도 ValueError임)
+    """
+    item = ImportRecord.model_validate_json(line).model_dump()
+    item["created_at"] = item["created_at"] or datetime.utcnow()
+    return item
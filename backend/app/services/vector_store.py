@@ -8,19 +8,27 @@ import os
 
 
 class VectorStore:
-    def __init__(self):
-        # chroma 디렉토리 존재하는지 확인
-        os.makedirs(app_settings.chroma_persist_directory, exist_ok=True)
+    def __init__(self, ai_service: Optional[AIService] = None):
+        if app_settings.chroma_host:
+            # 별도 Chroma 서버 사용 (클라이언트가 requests 세션으로 연결을 재사용함)
+            self.client = chromadb.HttpClient(
+                host=app_settings.chroma_host,
+                port=app_settings.chroma_port,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        else:
+            # chroma 디렉토리 존재하는지 확인
+            os.makedirs(app_settings.chroma_persist_directory, exist_ok=True)
 
-        self.client = chromadb.PersistentClient(
-            path=app_settings.chroma_persist_directory,
-            settings=Settings(anonymized_telemetry=False)
-        )
+            self.client = chromadb.PersistentClient(
+                path=app_settings.chroma_persist_directory,
+                settings=Settings(anonymized_telemetry=False)
+            )
         self.collection = self.client.get_or_create_collection(
             name="error_embeddings",
             metadata={"hnsw:space": "cosine"}
         )
-        self.ai_service = AIService()
+        self.ai_service = ai_service or AIService()
 
     async def add_error(
         self,
@@ -54,6 +62,59 @@ class VectorStore:
             print(f"벡터 스토어 추가 실패: {e}")
             return None
 
+    def get_embeddings(self, vector_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        벡터 id들의 임베딩을 한 번에 가져옴
+
+        Returns:
+            vector_id -> 임베딩 dict (없는 id는 빠짐)
+        """
+        vector_ids = [vector_id for vector_id in vector_ids if vector_id]
+        if not vector_ids:
+            return {}
+
+        results = self.collection.get(ids=vector_ids, include=["embeddings"])
+        return {
+            vector_id: [float(value) for value in embedding]
+            for vector_id, embedding in zip(results["ids"], results["embeddings"])
+        }
+
+    def upsert_embeddings(
+        self,
+        vector_ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        documents: List[str]
+    ) -> None:
+        """이미 계산된 임베딩을 한 번에 저장함 (가져오기용)"""
+        if not vector_ids:
+            return
+
+        self.collection.upsert(
+            ids=vector_ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=documents
+        )
+
+    def delete_errors(self, vector_ids: List[str]) -> int:
+        """
+        벡터들을 한 번에 삭제함
+
+        Returns:
+            삭제 요청한 벡터 수
+        """
+        vector_ids = [vector_id for vector_id in vector_ids if vector_id]
+        if not vector_ids:
+            return 0
+
+        try:
+            self.collection.delete(ids=vector_ids)
+            return len(vector_ids)
+        except Exception as e:
+            print(f"벡터 삭제 실패: {e}")
+            return 0
+
     async def search_similar(
         self,
         error_log: str,
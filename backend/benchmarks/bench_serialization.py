@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+/api/analyze 직렬화 경로의 요청당 CPU 시간 비교
+
+같은 분석 결과를 돌려주는 두 라우트를 만들어서 TestClient로 호출함
+  - before: JSON 본문을 Pydantic 본문 파라미터로 받고, response_model 재검증 + 표준 json 응답
+  - after:  read_model(JSON/msgpack, gzip)로 받고, encode_response(orjson/msgpack)로 바로 응답
+
+OpenAI/Chroma 호출은 빼고 본문 디코딩/검증/인코딩 비용만 잼
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_serialization.py --requests 2000 --log-kb 64
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from app.api.analyze import AnalyzeRequest, AnalyzeResponse
+from app.core.wire import MSGPACK_MEDIA_TYPE, encode_response, msgpack, read_model
+
+ANALYSIS = {
+    "id": "3f2b8c1e-0000-4000-8000-000000000000",
+    "case_name": "ModuleNotFoundError: No module named 'requests'",
+    "root_cause": "가상환경에 requests 패키지가 설치되어 있지 않음. " * 8,
+    "solution": "pip install requests 로 설치한 뒤 다시 실행. " * 8,
+    "tags": ["python", "ModuleNotFoundError", "dependencies", "pip"],
+    "similar_cases": [
+        {"id": f"case-{i}", "case_name": "ModuleNotFoundError", "similarity": 0.9 - i / 10}
+        for i in range(3)
+    ],
+}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/before", response_model=AnalyzeResponse, response_class=JSONResponse)
+    async def before(request: AnalyzeRequest):
+        return AnalyzeResponse(**ANALYSIS)
+
+    @app.post("/after", response_model=AnalyzeResponse)
+    async def after(http_request: Request):
+        await read_model(http_request, AnalyzeRequest)
+        return encode_response(http_request, ANALYSIS)
+
+    return app
+
+
+def make_payload(log_kb: int) -> dict:
+    line = 'File "/home/user/project/app/service.py", line 42, in handler\n'
+    return {
+        "command": "python app.py",
+        "error_log": line * (log_kb * 1024 // len(line)),
+        "code_context": {
+            "file_path": "/home/user/project/app/service.py",
+            "line_number": 42,
+            "code_snippet": "    result = handler(request)\n" * 20,
+            "language": "python",
+        },
+    }
+
+
+def measure(client: TestClient, path: str, body: bytes, headers: dict, n: int) -> float:
+    """요청 n번의 프로세스 CPU 시간(초)을 잼"""
+    for _ in range(20):
+        client.post(path, content=body, headers=headers)
+
+    started = time.process_time()
+    for _ in range(n):
+        response = client.post(path, content=body, headers=headers)
+        assert response.status_code == 200, response.text
+    return time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/analyze 직렬화 CPU 시간 비교")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--log-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    client = TestClient(build_app())
+    payload = make_payload(args.log_kb)
+    json_body = json.dumps(payload).encode("utf-8")
+    json_headers = {"Content-Type": "application/json"}
+
+    cases = [
+        ("before: json", "/before", json_body, json_headers),
+        ("after:  json (orjson)", "/after", json_body, json_headers),
+        ("after:  json + gzip", "/after", gzip.compress(json_body, 6),
+         {**json_headers, "Content-Encoding": "gzip"}),
+    ]
+    if msgpack is not None:
+        packed = msgpack.packb(payload, use_bin_type=True)
+        msgpack_headers = {"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+        cases += [
+            ("after:  msgpack", "/after", packed, msgpack_headers),
+            ("after:  msgpack + gzip", "/after", gzip.compress(packed, 6),
+             {**msgpack_headers, "Content-Encoding": "gzip"}),
+        ]
+
+    print(f"error_log {args.log_kb}KB, 요청 {args.requests}번 (TestClient 오버헤드 포함)\n")
+    baseline = None
+    for name, path, body, headers in cases:
+        cpu = measure(client, path, body, headers, args.requests)
+        per_request = cpu / args.requests * 1e6
+        baseline = baseline or per_request
+        print(
+            f"{name:<24} {per_request:8.1f} µs/req  "
+            f"(절약 {baseline - per_request:7.1f} µs, 본문 {len(body) / 1024:7.1f} KB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+백엔드 cold start 측정
+
+uvicorn을 새로 띄워서 /health가 처음 응답할 때까지(프로세스가 요청을 받기 시작)와
+/ready가 200을 줄 때까지(DB 마이그레이션과 Chroma 연결 완료) 걸린 시간을 잼
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    """url이 200을 줄 때까지 기다리고 시작부터 걸린 시간(초)을 돌려줌"""
+    while time.monotonic() - started < timeout:
+        try:
+            if httpx.get(url, timeout=0.5).status_code == 200:
+                return time.monotonic() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{url} 응답 없음")
+
+
+def run_once(port: int, timeout: float, keep_data: str = None) -> tuple:
+    data_dir = keep_data or tempfile.mkdtemp(prefix="wtf-startup-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{data_dir}/errors.db",
+        "CHROMA_PERSIST_DIRECTORY": f"{data_dir}/chroma",
+        "ARCHIVE_DIRECTORY": f"{data_dir}/archive",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"),
+    }
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        health = wait_for(f"{base_url}/health", started, timeout)
+        ready = wait_for(f"{base_url}/ready", started, timeout)
+        return health, ready, data_dir
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="백엔드 cold start 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    # 첫 실행은 빈 DB (마이그레이션 포함), 나머지는 같은 DB로 재시작
+    results = []
+    data_dir = None
+    for _ in range(args.runs):
+        health, ready, data_dir = run_once(args.port, args.timeout, data_dir)
+        results.append((health, ready))
+        print(f"/health {health * 1000:7.0f} ms   /ready {ready * 1000:7.0f} ms")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    if len(results) > 1:
+        restarts = results[1:]
+        print(
+            f"\n재시작 중앙값: /health {statistics.median(h for h, _ in restarts) * 1000:.0f} ms, "
+            f"/ready {statistics.median(r for _, r in restarts) * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+worker 수에 따른 조회 처리량 측정
+
+임시 DB로 uvicorn을 worker 수별로 띄우고, /api/import로 레코드를 채운 뒤
+목록/상세/통계 API를 여러 스레드에서 동시에 호출해서 초당 요청 수를 비교함
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_workers.py --workers 1 2 4 --records 2000 --concurrency 32
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_records(count: int) -> bytes:
+    """가짜 에러 레코드를 NDJSON으로 만듦"""
+    names = ["NameError", "TypeError", "KeyError", "ImportError", "ValueError"]
+    commands = ["python app.py", "npm run build", "go test ./...", "cargo build"]
+    now = datetime.utcnow()
+    lines = []
+    for i in range(count):
+        name = random.choice(names)
+        lines.append(json.dumps({
+            "id": str(uuid.uuid4()),
+            "case_name": f"{name}: case {i % 50}",
+            "command": random.choice(commands),
+            "error_log": f"Traceback (most recent call last):\n  line {i}\n{name}: bench {i}\n" * 5,
+            "ai_solution": "solution " * 20,
+            "root_cause": "root cause " * 10,
+            "tags": ["python", name],
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+            "vector_id": None
+        }))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("서버가 시작되지 않음")
+
+
+def hammer(base_url: str, ids: list, concurrency: int, duration: float) -> dict:
+    """여러 스레드에서 조회 API를 duration초 동안 호출함"""
+    paths = ["/api/errors?limit=20", "/api/stats/top", "/api/tags"]
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    stop = time.time() + duration
+
+    def worker(n: int):
+        with httpx.Client(base_url=base_url, timeout=10.0) as client:
+            while time.time() < stop:
+                if random.random() < 0.5:
+                    path = f"/api/errors/{random.choice(ids)}"
+                else:
+                    path = random.choice(paths)
+                try:
+                    response = client.get(path)
+                    if response.status_code == 200:
+                        counts[n] += 1
+                    else:
+                        errors[n] += 1
+                except httpx.HTTPError:
+                    errors[n] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    return {"requests": sum(counts), "errors": sum(errors), "rps": sum(counts) / elapsed}
+
+
+def run(workers: int, args, port: int) -> dict:
+    data_dir = tempfile.mkdtemp(prefix="wtf-bench-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{data_dir}/errors.db",
+        "CHROMA_PERSIST_DIRECTORY": f"{data_dir}/chroma",
+        "ARCHIVE_DIRECTORY": f"{data_dir}/archive",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url)
+        body = make_records(args.records)
+        httpx.post(f"{base_url}/api/import", content=body, timeout=120.0).raise_for_status()
+        ids = [json.loads(line)["id"] for line in body.splitlines()]
+        return hammer(base_url, ids, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="worker 수별 조회 처리량 측정")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"레코드 {args.records}개, 동시 클라이언트 {args.concurrency}개, {args.duration}초씩\n")
+    baseline = None
+    for workers in args.workers:
+        result = run(workers, args, args.port)
+        baseline = baseline or result["rps"]
+        print(
+            f"workers={workers:<3} {result['rps']:8.1f} req/s "
+            f"(x{result['rps'] / baseline:.2f}, 요청 {result['requests']}, 실패 {result['errors']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# app.core.config의 settings는 import할 때 환경 변수를 읽으므로 app을 import하기 전에 설정함
+_data_dir = tempfile.mkdtemp(prefix="wtf-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite:///{_data_dir}/errors.db"
+os.environ["ARCHIVE_DIRECTORY"] = os.path.join(_data_dir, "archive")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api import analyze  # noqa: E402
+from app.main import _prepare_database  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    _prepare_database()
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(analyze.router, prefix="/api")
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """
+    RAG 분석/저장 대신 호출 횟수를 세는 가짜 파이프라인을 씀 (OpenAI/Chroma 없이 테스트)
+    delay초 동안 기다렸다가 결과를 돌려줌 (error가 있으면 그 예외를 냄)
+    """
+    class Pipeline:
+        def __init__(self):
+            self.calls = 0
+            self.delay = 0.0
+            self.error = None
+
+        async def __call__(self, request):
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            return {
+                "id": f"analysis-{self.calls}",
+                "case_name": request.error_log.splitlines()[-1],
+                "root_cause": "테스트",
+                "solution": "테스트",
+                "tags": [],
+                "similar_cases": []
+            }
+
+    fake = Pipeline()
+    monkeypatch.setattr(analyze, "_analyze_and_store", fake)
+    return fake
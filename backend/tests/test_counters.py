@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.core.database import ErrorLog, ErrorTag, TagCount
+from app.core.writer import write_session
+from app.services import counters
+from app.services.records import delete_error_records, save_error_records
+from app.services.retention import drop_single_occurrences
+
+TAGS = ["countertest-a", "countertest-b"]
+
+
+def snapshot():
+    """(카운터 total, 실제 행 수, 태그별 (tag_counts 값, error_tags 행 수))"""
+    with write_session() as db:
+        tags = {
+            tag: (
+                db.scalar(select(TagCount.count).where(TagCount.tag == tag)) or 0,
+                db.scalar(select(func.count()).where(ErrorTag.tag == tag))
+            )
+            for tag in TAGS
+        }
+        return counters.get_value(db, counters.ERRORS_TOTAL), db.scalar(select(func.count(ErrorLog.id))), tags
+
+
+def assert_consistent(before, after, added):
+    # 다른 테스트가 카운터를 거치지 않고 지운 행이 있을 수 있으므로 total은 차이로 비교함
+    assert after[0] - before[0] == after[1] - before[1] == added
+    for tag, (count, actual) in after[2].items():
+        assert count == actual, tag
+
+
+def save(items):
+    with write_session() as db:
+        save_error_records(db, [
+            (ErrorLog(id=error_id, case_name=case_name, command="pytest", error_log="log",
+                      tags=json.dumps(tags), created_at=created_at), tags)
+            for error_id, case_name, tags, created_at in items
+        ])
+
+
+def test_counters_follow_insert_and_delete(client):
+    now = datetime.utcnow()
+    start = snapshot()
+
+    save([
+        ("counter-1", "CounterError", TAGS, now),
+        ("counter-2", "CounterError", TAGS[:1], now),
+        ("counter-3", "CounterError", [], now),
+    ])
+    inserted = snapshot()
+    assert_consistent(start, inserted, 3)
+    assert inserted[2] == {"countertest-a": (2, 2), "countertest-b": (1, 1)}
+
+    with write_session() as db:
+        assert delete_error_records(db, ["counter-1", "counter-3", "counter-missing"]) == 2
+    deleted = snapshot()
+    assert_consistent(inserted, deleted, -2)
+    assert deleted[2] == {"countertest-a": (1, 1), "countertest-b": (0, 0)}
+
+    body = client.get("/api/errors?tag=countertest-a").json()
+    assert body["total"] == len(body["errors"]) == 1
+    assert client.get("/api/errors?total=exact").json()["total"] == deleted[0]
+
+    with write_session() as db:
+        delete_error_records(db, ["counter-2"])
+
+
+def test_counters_follow_retention():
+    # 다른 테스트의 레코드가 지워지지 않도록 그보다 훨씬 오래된 레코드로 확인함
+    old = datetime.utcnow() - timedelta(days=1000)
+    start = snapshot()
+
+    save([
+        ("retention-single", "SingleCounterError", TAGS, old),
+        ("retention-recurring-1", "RecurringCounterError", TAGS[:1], old),
+        ("retention-recurring-2", "RecurringCounterError", [], old),
+    ])
+    inserted = snapshot()
+    assert_consistent(start, inserted, 3)
+
+    with write_session() as db:
+        drop_single_occurrences(db, old + timedelta(days=1), 100)
+        remaining = set(db.scalars(select(ErrorLog.id).where(ErrorLog.id.like("retention-%"))))
+    assert remaining == {"retention-recurring-1", "retention-recurring-2"}
+
+    dropped = snapshot()
+    assert_consistent(inserted, dropped, -1)
+    assert dropped[2] == {"countertest-a": (1, 1), "countertest-b": (0, 0)}
+
+    with write_session() as db:
+        delete_error_records(db, ["retention-recurring-1", "retention-recurring-2"])
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import ErrorLog
+from app.core.writer import write_session
+from app.services.records import save_error_records
+
+
+@pytest.fixture(scope="module", autouse=True)
+def records():
+    now = datetime.utcnow()
+    with write_session() as db:
+        save_error_records(db, [
+            (ErrorLog(id=f"page-{i}", case_name="PageError", command="pytest", error_log="log",
+                      tags="[]", created_at=now - timedelta(minutes=i)), [])
+            for i in range(3)
+        ])
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1", "cursor=&limit=0", "limit=101", "page=0"])
+def test_out_of_range_paging_is_rejected(client, query):
+    assert client.get(f"/api/errors?{query}").status_code == 422
+
+
+def test_keyset_pages_walk_forward_and_back(client):
+    first = client.get("/api/errors?cursor=&limit=2").json()
+    second = client.get(f"/api/errors?cursor={first['next_cursor']}&limit=2").json()
+    back = client.get(f"/api/errors?cursor={second['prev_cursor']}&limit=2").json()
+
+    assert [e["id"] for e in first["errors"]] == [e["id"] for e in back["errors"]]
+    assert not {e["id"] for e in first["errors"]} & {e["id"] for e in second["errors"]}
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+
+BODY = {"command": "pytest", "error_log": "E   AssertionError: 1 != 2"}
+
+
+def test_same_key_replays_the_stored_result(client, pipeline):
+    headers = {"Idempotency-Key": "replay-key"}
+
+    first = client.post("/api/analyze", json=BODY, headers=headers)
+    second = client.post("/api/analyze", json=BODY, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert pipeline.calls == 1
+    assert second.json()["id"] == first.json()["id"]
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+def test_concurrent_requests_with_the_same_key_wait_for_one_analysis(app, pipeline):
+    pipeline.delay = 0.3
+
+    async def post_concurrently():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[
+                client.post("/api/analyze", json=BODY, headers={"Idempotency-Key": "concurrent-key"})
+                for _ in range(3)
+            ])
+
+    responses = asyncio.run(post_concurrently())
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert pipeline.calls == 1
+    assert len({response.json()["id"] for response in responses}) == 1
+
+
+def test_same_key_with_a_different_body_is_rejected(client, pipeline):
+    headers = {"Idempotency-Key": "reused-key"}
+    assert client.post("/api/analyze", json=BODY, headers=headers).status_code == 200
+
+    reused = client.post("/api/analyze", json={**BODY, "command": "pytest -x"}, headers=headers)
+
+    assert reused.status_code == 422
+    assert pipeline.calls == 1
+
+
+def test_failed_analysis_releases_the_key(client, pipeline):
+    headers = {"Idempotency-Key": "failing-key"}
+
+    pipeline.error = RuntimeError("OpenAI 응답 없음")
+    assert client.post("/api/analyze", json=BODY, headers=headers).status_code == 500
+
+    pipeline.error = None
+    retried = client.post("/api/analyze", json=BODY, headers=headers)
+    assert retried.status_code == 200
+    assert "idempotent-replayed" not in retried.headers
+    assert pipeline.calls == 2
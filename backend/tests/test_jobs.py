@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.database import AnalysisJob
+from app.core.writer import write_session
+from app.services import jobs
+
+
+@pytest.fixture(autouse=True)
+def empty_queue():
+    with write_session() as db:
+        db.execute(delete(AnalysisJob))
+
+
+def enqueue(name, peer="10.0.0.1", client_id="default"):
+    job, _ = asyncio.run(jobs.enqueue({"name": name}, peer, client_id, name))
+    return job["job_id"]
+
+
+def claim_and_finish():
+    job_id, request, _ = jobs._claim_next()
+    jobs._finish(job_id, result={"id": request["name"]})
+    return request["name"]
+
+
+def update(job_id, **values):
+    with write_session() as db:
+        job = db.get(AnalysisJob, job_id)
+        for name, value in values.items():
+            setattr(job, name, value)
+
+
+def test_peers_take_turns_even_if_one_enqueued_first():
+    for name in ("a1", "a2", "a3"):
+        enqueue(name, peer="10.0.0.1")
+    for name in ("b1", "b2"):
+        enqueue(name, peer="10.0.0.2")
+
+    assert [claim_and_finish() for _ in range(5)] == ["a1", "b1", "a2", "b2", "a3"]
+    assert jobs._claim_next() is None
+
+
+def test_peer_with_fewer_running_jobs_goes_first():
+    enqueue("a1", peer="10.0.0.1")
+    enqueue("a2", peer="10.0.0.1")
+    enqueue("b1", peer="10.0.0.2")
+
+    first = jobs._claim_next()
+    second = jobs._claim_next()
+
+    assert first[1]["name"] == "a1"
+    assert second[1]["name"] == "b1"
+
+
+def test_clients_take_turns_within_a_peer():
+    enqueue("x1", client_id="x")
+    enqueue("x2", client_id="x")
+    enqueue("y1", client_id="y")
+
+    assert [claim_and_finish() for _ in range(3)] == ["x1", "y1", "x2"]
+
+
+def test_per_peer_quota_returns_429(client, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_queue_max_per_client", 2)
+    headers = {"Prefer": "respond-async"}
+
+    statuses = [
+        client.post("/api/analyze", json={"command": "pytest", "error_log": f"E   {i}"}, headers=headers)
+        for i in range(3)
+    ]
+
+    assert [response.status_code for response in statuses] == [202, 202, 429]
+    assert int(statuses[-1].headers["retry-after"]) >= 1
+
+
+def test_running_job_is_claimed_again_after_its_lease_expires():
+    job_id = enqueue("a1")
+    assert jobs._claim_next()[0] == job_id
+    assert jobs._claim_next() is None
+
+    update(job_id, lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+
+    reclaimed_id, _, attempts = jobs._claim_next()
+    assert reclaimed_id == job_id
+    assert attempts == 2
+
+
+def test_retry_waits_longer_after_each_attempt(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_max_attempts", 3)
+    job_id = enqueue("a1")
+    delays = []
+
+    for _ in range(2):
+        jobs._claim_next()
+        before = datetime.utcnow()
+        jobs._finish(job_id, error="OpenAI 응답 없음", retry=True)
+
+        job = jobs._load(job_id)
+        assert job["status"] == "queued"
+        assert jobs._claim_next() is None
+
+        with write_session() as db:
+            not_before = db.get(AnalysisJob, job_id).not_before
+        delays.append(round((not_before - before).total_seconds()))
+        update(job_id, not_before=datetime.utcnow() - timedelta(seconds=1))
+
+    assert delays == [jobs.RETRY_BACKOFF, jobs.RETRY_BACKOFF * 2]
+
+    # 마지막 시도까지 실패하면 다시 잡지 않고 failed로 끝냄
+    jobs._claim_next()
+    jobs._finish(job_id, error="OpenAI 응답 없음")
+    assert jobs._load(job_id)["status"] == "failed"
+    assert jobs._claim_next() is None
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import ErrorLog
+from app.core.writer import write_session
+from app.services.records import delete_error_records, save_error_record
+from app.services.retention import drop_single_occurrences, strip_full_logs
+
+
+def test_strip_full_logs_changes_detail_etag(client):
+    created_at = datetime.utcnow() - timedelta(days=100)
+    with write_session() as db:
+        save_error_record(db, ErrorLog(
+            id="strip-me",
+            case_name="ValueError: bad value",
+            command="python app.py",
+            error_log="Traceback (most recent call last):\nValueError: bad value",
+            code_snippet="raise ValueError('bad value')",
+            root_cause="잘못된 값",
+            tags="[]",
+            created_at=created_at
+        ), [])
+
+    before = client.get("/api/errors/strip-me")
+    assert before.status_code == 200
+    etag = before.headers["etag"]
+    assert client.get("/api/errors/strip-me", headers={"If-None-Match": etag}).status_code == 304
+
+    with write_session() as db:
+        assert strip_full_logs(db, datetime.utcnow() - timedelta(days=90), 100) == 1
+
+    after = client.get("/api/errors/strip-me", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert after.json()["error_log"] == ""
+    assert after.json()["root_cause"] == "잘못된 값"
+
+
+def test_detail_cache_notices_changes_from_other_processes(client):
+    created_at = datetime.utcnow() - timedelta(days=100)
+    with write_session() as db:
+        save_error_record(db, ErrorLog(
+            id="other-process",
+            case_name="KeyError: 'name'",
+            command="python app.py",
+            error_log="Traceback (most recent call last):\nKeyError: 'name'",
+            tags="[]",
+            created_at=created_at
+        ), [])
+
+    etag = client.get("/api/errors/other-process").headers["etag"]
+
+    # 다른 worker 프로세스가 바꾼 것처럼 이 프로세스의 캐시를 지우지 않고 DB만 바꿈
+    with write_session() as db:
+        record = db.get(ErrorLog, "other-process")
+        record.error_log = ""
+        record.log_archived_at = datetime.utcnow()
+
+    after = client.get("/api/errors/other-process")
+    assert after.headers["etag"] != etag
+    assert after.json()["error_log"] == ""
+
+    with write_session() as db:
+        db.delete(db.get(ErrorLog, "other-process"))
+
+    # 아카이브한 레코드는 바뀌지 않으므로 304는 캐시로 답하지만, 본문은 레코드가 있는지 확인한 뒤에 보냄
+    assert client.get("/api/errors/other-process").status_code == 404
+
+
+def test_detail_is_immutable_unless_retention_can_still_strip_it(client, monkeypatch):
+    monkeypatch.setattr(settings, "retention_full_log_days", 90)
+    with write_session() as db:
+        save_error_record(db, ErrorLog(
+            id="cache-control", case_name="OSError", command="make",
+            error_log="No space left on device", tags="[]", created_at=datetime.utcnow() - timedelta(days=89)
+        ), [])
+
+    full = client.get("/api/errors/cache-control")
+    assert "immutable" not in full.headers["cache-control"]
+    max_age = int(full.headers["cache-control"].split("max-age=")[1])
+    assert 0 < max_age <= 86400
+
+    # 지우는 필드를 고르지 않으면 바뀔 일이 없음
+    summary = client.get("/api/errors/cache-control?fields=case_name,root_cause")
+    assert "immutable" in summary.headers["cache-control"]
+
+    # 바뀔 수 없는 응답의 304는 DB를 보지 않음 (다른 프로세스가 지워도 이 프로세스의 캐시로 답함)
+    with write_session() as db:
+        db.delete(db.get(ErrorLog, "cache-control"))
+    assert client.get(
+        "/api/errors/cache-control?fields=case_name,root_cause",
+        headers={"If-None-Match": summary.headers["etag"]}
+    ).status_code == 304
+    assert client.get("/api/errors/cache-control", headers={"If-None-Match": full.headers["etag"]}).status_code == 404
+
+
+def test_single_occurrences_are_decided_by_normalized_case_name():
+    # 다른 테스트의 레코드가 지워지지 않도록 그보다 훨씬 오래된 레코드로 확인함
+    old = datetime.utcnow() - timedelta(days=2000)
+    with write_session() as db:
+        for i, case_name in enumerate([
+            "RetentionLookupError: key 'alpha' at line 3",
+            "RetentionLookupError: key 'beta' at line 17",
+            "RetentionOnceError: happened once",
+        ]):
+            save_error_record(db, ErrorLog(
+                id=f"normalized-{i}", case_name=case_name, command="python app.py",
+                error_log="log", tags="[]", created_at=old + timedelta(seconds=i)
+            ), [])
+
+    # 배치 크기 1로 다음 위치를 넘겨 가며 끝까지 훑음 (남기는 레코드가 앞에 있어도 멈추지 않음)
+    dropped, after = [], None
+    while True:
+        with write_session() as db:
+            vector_ids, after = drop_single_occurrences(db, old + timedelta(days=1), 1, after)
+        dropped += vector_ids
+        if after is None:
+            break
+
+    with write_session() as db:
+        remaining = {record.id for record in db.query(ErrorLog).filter(ErrorLog.id.like("normalized-%"))}
+        assert remaining == {"normalized-0", "normalized-1"}
+        delete_error_records(db, sorted(remaining))
+    assert len(dropped) == 1
@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from app.core.database import ErrorLog, db_path
+from app.core.writer import write_session
+from app.services.records import delete_error_records, save_error_record
+from app.services.retention import strip_full_logs
+from app.services.search import search_errors, sync_search_index
+
+LONG_LOG = "Traceback (most recent call last):\n" + "  File \"worker.py\", line 12\n" * 200 + "FrobnicatorError: quux"
+
+
+def _ids(db, q):
+    results, _ = search_errors(db, q)
+    return {result["id"] for result in results}
+
+
+def test_compressed_logs_are_indexed_and_removed():
+    with write_session() as db:
+        save_error_record(db, ErrorLog(
+            id="fts-app", case_name="FrobnicatorError", command="python worker.py",
+            error_log=LONG_LOG, tags="[]", created_at=datetime.utcnow() - timedelta(days=100)
+        ), [])
+        assert _ids(db, "quux") == {"fts-app"}
+
+    with write_session() as db:
+        strip_full_logs(db, datetime.utcnow() - timedelta(days=90), 100)
+        assert _ids(db, "quux") == set()
+        assert _ids(db, "FrobnicatorError") == {"fts-app"}
+
+        delete_error_records(db, ["fts-app"])
+        assert _ids(db, "FrobnicatorError") == set()
+
+
+def test_other_tools_can_write_without_the_decompress_function():
+    # 앱이 등록하는 wtf_decompress() 없이 연결해도 트리거 때문에 쓰기가 실패하지 않아야 함
+    connection = sqlite3.connect(db_path)
+    with connection:
+        connection.execute(
+            "INSERT INTO errors (id, case_name, command, error_log, tags, created_at) "
+            "VALUES ('fts-shell', 'ShellError', 'sqlite3', 'written by plugh', '[]', '2026-01-01 00:00:00')"
+        )
+        connection.execute("UPDATE errors SET error_log = 'rewritten by xyzzy' WHERE id = 'fts-shell'")
+    connection.close()
+
+    with write_session() as db:
+        sync_search_index(db)
+        assert _ids(db, "xyzzy") == {"fts-shell"}
+        assert _ids(db, "plugh") == set()
+
+    connection = sqlite3.connect(db_path)
+    with connection:
+        connection.execute("DELETE FROM errors WHERE id = 'fts-shell'")
+    connection.close()
+
+    with write_session() as db:
+        sync_search_index(db)
+        assert _ids(db, "xyzzy") == set()
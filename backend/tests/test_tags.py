@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.database import ErrorLog
+from app.core.writer import write_session
+from app.services.records import save_error_records
+
+RECORDS = {
+    "tagged-ab": ["tagtest-a", "tagtest-b"],
+    "tagged-a": ["tagtest-a"],
+    "tagged-bc": ["tagtest-b", "tagtest-c"],
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def records():
+    now = datetime.utcnow()
+    with write_session() as db:
+        save_error_records(db, [
+            (ErrorLog(id=error_id, case_name="TagError", command="pytest", error_log="log",
+                      tags=json.dumps(tags), created_at=now), tags)
+            for error_id, tags in RECORDS.items()
+        ] + [
+            # JSON 컬럼에만 태그가 있고 error_tags에는 없는 레코드 (필터는 error_tags만 봄)
+            (ErrorLog(id="tagged-json-only", case_name="TagError", command="pytest", error_log="log",
+                      tags=json.dumps(["tagtest-a"]), created_at=now), [])
+        ])
+
+
+def list_errors(client, query):
+    body = client.get(f"/api/errors?limit=100&{query}").json()
+    return {error["id"] for error in body["errors"]}, body["total"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("tag=tagtest-c", {"tagged-bc"}),
+    ("tags=tagtest-a", {"tagged-ab", "tagged-a"}),
+    ("tags=tagtest-a&tags=tagtest-b", {"tagged-ab"}),
+    ("tags=tagtest-a&tags=tagtest-b&match=all", {"tagged-ab"}),
+    ("tags=tagtest-a&tags=tagtest-b&match=any", {"tagged-ab", "tagged-a", "tagged-bc"}),
+    ("tag=tagtest-a&tags=tagtest-c&match=all", set()),
+    ("tags=tagtest-a&tags=TAGTEST-A&tags=tagtest-c&match=any", {"tagged-ab", "tagged-a", "tagged-bc"}),
+    ("tags=tagtest-missing&match=any", set()),
+])
+def test_tag_filters_use_error_tags(client, query, expected):
+    ids, total = list_errors(client, query)
+
+    assert ids == expected
+    assert total == len(expected)
+
+
+def test_tag_facets_count_error_tags(client):
+    counts = client.get("/api/tags?prefix=tagtest-").json()["tags"]
+
+    assert counts == [
+        {"tag": "tagtest-a", "count": 2},
+        {"tag": "tagtest-b", "count": 2},
+        {"tag": "tagtest-c", "count": 1},
+    ]
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from app.core.config import settings
+from app.services.transfer import import_stream
+
+
+def _line(record_id, **fields):
+    record = {"id": record_id, "case_name": "ImportError", "command": "python app.py", "error_log": "log"}
+    record.update(fields)
+    return json.dumps(record).encode() + b"\n"
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def test_import_rejects_bad_and_overlong_lines_and_keeps_going(monkeypatch):
+    monkeypatch.setattr(settings, "max_import_line_bytes", 200)
+    body = b"".join([
+        _line("import-1"),
+        b"not json\n",
+        _line("import-2", line_number="twelve"),
+        _line("import-3", tags=5),
+        _line("import-4", error_log="x" * 500),
+        b"[1, 2]\n",
+        _line("import-5", case_name=""),
+        _line("import-6", created_at="2026-01-02T03:04:05"),
+    ])
+
+    stats = asyncio.run(import_stream(_chunks(body, 7)))
+
+    assert stats["imported"] == 2
+    assert stats["invalid"] == 6
+    assert stats["invalid_lines"] == [2, 3, 4, 5, 6, 7]
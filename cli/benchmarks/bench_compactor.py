@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+에러 로그 압축량/속도 측정
+
+npm/gradle/cargo처럼 진행 표시줄과 반복되는 줄이 많은 빌드 로그 끝에 traceback을 붙여서
+LogCompactor.compact()가 얼마나 줄이는지와 처리 시간을 잼 (traceback이 남는지도 확인함)
+
+사용법 (cli 디렉토리에서):
+    python benchmarks/bench_compactor.py --sizes 0.25 1 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from wtf.compactor import LogCompactor  # noqa: E402
+
+FIXTURE = os.path.join(BENCH_DIR, "tracebacks", "python_site_packages.txt")
+
+
+def make_log(size_mb: float) -> str:
+    rng = random.Random(0)
+    target = int(size_mb * 1024 * 1024)
+    parts, size, step = [], 0, 0
+    while size < target:
+        step += 1
+        choice = rng.random()
+        if choice < 0.4:
+            line = f"\x1b[36m[{'=' * (step % 30)}>{' ' * (30 - step % 30)}]\x1b[0m {step % 100}% 1.{step % 9}MB/s\r"
+        elif choice < 0.7:
+            line = f"> Task :module{step % 40}:compileJava UP-TO-DATE\n"
+        elif choice < 0.85:
+            line = "npm WARN deprecated uuid@3.4.0: Please upgrade to version 7 or higher.\n"
+        else:
+            line = f"   Compiling crate-{rng.randrange(10**6):06x} v0.{step % 20}.0\n"
+        parts.append(line)
+        size += len(line)
+    with open(FIXTURE, encoding="utf-8") as f:
+        parts.append("\n" + f.read())
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="에러 로그 압축량/속도 측정")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.25, 1, 4], help="로그 크기 (MB)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    compactor = LogCompactor()
+    with open(FIXTURE, encoding="utf-8") as f:
+        last_line = f.read().strip().splitlines()[-1]
+
+    print(f"{'size':>8} {'compacted':>12} {'ratio':>8} {'time':>10}")
+    for size_mb in args.sizes:
+        log = make_log(size_mb)
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            compacted, stats = compactor.compact(log)
+            best = min(best, time.perf_counter() - started)
+        assert last_line in compacted
+        print(
+            f"{stats['original_bytes'] / 1024:>6.0f}KB "
+            f"{stats['compacted_bytes'] / 1024:>10.1f}KB "
+            f"{stats['original_bytes'] / stats['compacted_bytes']:>7.0f}x "
+            f"{best * 1000:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+traceback 파서 정확도/속도 측정
+
+1. benchmarks/tracebacks/의 실제 traceback 모음을 파싱해서 expected.json과 비교함
+   (언어, 실패한 위치, 마지막 traceback의 프레임 수, traceback 수)
+2. traceback 하나당 파싱 시간
+3. 수 MB의 빌드 로그 끝에 traceback이 있는 경우, 끝부분만 보는 기본 설정과 전체를 훑는 경우를 비교함
+
+사용법 (cli 디렉토리에서):
+    python benchmarks/bench_parser.py --log-mb 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from wtf.parser import TracebackParser  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "tracebacks")
+
+NOISE = [
+    "[INFO] Compiling module 214 of 980 (core/services/payment)",
+    "  downloading https://registry.example.com/pkg/left-pad-1.3.0.tgz",
+    "npm WARN deprecated uuid@3.4.0: Please upgrade to version 7 or higher.",
+    "test_utils.py::test_slugify PASSED                                   [ 42%]",
+    "    at step 12/40: linking target libcore.a",
+]
+
+
+def load_fixtures() -> dict:
+    with open(os.path.join(FIXTURE_DIR, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    fixtures = {}
+    for name in expected:
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures[name] = f.read()
+    return fixtures, expected
+
+
+def check(parser: TracebackParser, fixtures: dict, expected: dict) -> bool:
+    ok = True
+    for name, text in fixtures.items():
+        result = parser.parse(text)
+        want = expected[name]
+        got = {
+            "language": result["language"],
+            "file_path": result["file_path"],
+            "line_number": result["line_number"],
+            "frames": len(result["frames"]),
+        }
+        if "tracebacks" in want:
+            got["tracebacks"] = len(result["tracebacks"])
+        status = "ok" if got == want else "MISMATCH"
+        ok = ok and got == want
+        print(f"  {status:8} {name:28} {got['language']:10} {got['file_path']}:{got['line_number']}")
+        if got != want:
+            print(f"           want {want}\n           got  {got}")
+    return ok
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="traceback 파서 정확도/속도 측정")
+    parser.add_argument("--log-mb", type=float, default=4.0, help="큰 로그 크기 (MB)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures, expected = load_fixtures()
+    tail_parser = TracebackParser()
+    full_parser = TracebackParser(max_scan_chars=0)
+
+    print("정확도:")
+    ok = check(tail_parser, fixtures, expected)
+
+    per_fixture = timed(lambda: [tail_parser.parse(text) for text in fixtures.values()], args.repeat)
+    print(f"\ntraceback 하나당: {per_fixture / len(fixtures) * 1e6:.0f} µs")
+
+    noise = "\n".join(NOISE) + "\n"
+    big_log = noise * int(args.log_mb * 1024 * 1024 / len(noise)) + fixtures["python_site_packages.txt"]
+    assert tail_parser.parse(big_log)["file_path"] == expected["python_site_packages.txt"]["file_path"]
+    tail = timed(lambda: tail_parser.parse(big_log), args.repeat)
+    full = timed(lambda: full_parser.parse(big_log), args.repeat)
+    print(
+        f"{len(big_log) / 1024 / 1024:.1f}MB 로그: 끝부분만 {tail * 1000:.1f} ms, "
+        f"전체 {full * 1000:.1f} ms ({len(big_log) / 1024 / 1024 / full:.1f} MB/s)"
+    )
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+민감정보 마스킹 처리량 측정 (MB/s)
+
+traceback, 환경 변수 할당, IP, 홈 경로, 실제 비밀 값이 섞인 로그를 만들어서
+Sanitizer.sanitize()와 sanitize_stream()의 처리량을 잼.
+비교용으로 규칙마다 re.sub을 한 번씩 돌리던 예전 방식도 함께 잼
+
+사용법 (cli 디렉토리에서):
+    python benchmarks/bench_sanitizer.py --sizes 1 8 32
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wtf.sanitizer import Sanitizer  # noqa: E402
+
+HOME = os.path.expanduser("~")
+SECRET = "sk-bench-0123456789abcdefghijklmnop"
+
+LINES = [
+    'Traceback (most recent call last):',
+    f'  File "{HOME}/project/app/service.py", line 128, in handle',
+    '    result = client.fetch(url, timeout=30)',
+    'requests.exceptions.ConnectionError: HTTPConnectionPool(host=10.2.33.4, port=5432)',
+    'INFO 2026-10-19 12:00:01 worker-3 processed batch 4812 in 0.42s',
+    f'DEBUG using Authorization: Bearer {SECRET}',
+    'export PATH=/usr/local/bin:/usr/bin api_key=abcd1234 token: xyz',
+    '[=====>                        ] 21% 1.2MB/s eta 00:32',
+    'npm ERR! code ELIFECYCLE',
+    '    at Object.<anonymous> (/srv/app/node_modules/lib/index.js:42:13)',
+]
+
+
+def make_log(size_mb: float) -> str:
+    rng = random.Random(0)
+    target = int(size_mb * 1024 * 1024)
+    lines, size = [], 0
+    while size < target:
+        line = rng.choice(LINES)
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def legacy_sanitize(text: str) -> str:
+    """예전 방식: 규칙마다 전체 텍스트를 다시 훑고, NAME=value마다 os.getenv를 부름"""
+    def mask_env_var(match):
+        if os.getenv(match.group(1)):
+            return f'{match.group(1)}=***'
+        return match.group(0)
+
+    patterns = [
+        (r'(api[_-]?key|token|password|secret)["\s]*[=:]["\s]*([^\s"\']+)', r'\1=***'),
+        (r'([A-Z_]+)["\s]*=["\s]*([^\s"\']+)', mask_env_var),
+        (r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'xxx.xxx.xxx.xxx'),
+        (re.escape(HOME), '~'),
+    ]
+    for pattern, replacement in patterns:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+def throughput(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return len(text.encode("utf-8")) / 1024 / 1024 / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="민감정보 마스킹 처리량 측정")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 8, 32], help="로그 크기 (MB)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-kb", type=int, default=64, help="sanitize_stream 조각 크기")
+    args = parser.parse_args()
+
+    os.environ["BENCH_API_KEY"] = SECRET
+    sanitizer = Sanitizer()
+    chunk = args.chunk_kb * 1024
+
+    def stream(text):
+        for _ in sanitizer.sanitize_stream(text[i:i + chunk] for i in range(0, len(text), chunk)):
+            pass
+
+    print(f"{'size':>8} {'legacy':>12} {'sanitize':>12} {'stream':>12}")
+    for size_mb in args.sizes:
+        text = make_log(size_mb)
+        assert SECRET not in sanitizer.sanitize(text)
+        print(
+            f"{size_mb:>6.0f}MB "
+            f"{throughput(legacy_sanitize, text, args.repeat):>8.1f} MB/s "
+            f"{throughput(sanitizer.sanitize, text, args.repeat):>8.1f} MB/s "
+            f"{throughput(stream, text, args.repeat):>8.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
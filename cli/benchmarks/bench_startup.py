@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+wtf 래퍼 오버헤드 측정
+
+성공하는 명령어(기본 `true`)를 그대로 실행했을 때와 `wtf`로 감싸서 실행했을 때의
+시간 차이를 잼. 인터프리터 시작 시간(`python -c pass`)은 환경마다 크게 다르므로
+그것을 뺀 wtf 자체 오버헤드(import, 실행기)의 중앙값이 --budget-ms를 넘으면 exit code 1로 끝남
+
+사용법 (cli 디렉토리에서):
+    python benchmarks/bench_startup.py --runs 30
+    python benchmarks/bench_startup.py --wtf wtf      # 설치된 콘솔 스크립트로 측정
+"""
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(argv: list, runs: int, env: dict) -> list:
+    """argv를 runs번 실행하고 각 실행 시간(초)을 돌려줌 (첫 실행은 디스크 캐시 준비용으로 버림)"""
+    timings = []
+    for i in range(runs + 1):
+        started = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        if i:
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wtf 래퍼 오버헤드 측정")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--command", default="true", help="감쌀 명령어 (성공하는 명령어)")
+    parser.add_argument("--wtf", default=f"{shlex.quote(sys.executable)} -m wtf.main",
+                        help="wtf 실행 방법 (기본: 현재 인터프리터로 python -m wtf.main)")
+    parser.add_argument("--budget-ms", type=float, default=30.0,
+                        help="인터프리터 시작을 뺀 wtf 오버헤드 중앙값 허용치 (ms)")
+    args = parser.parse_args()
+
+    # 터미널에서 실행해도 출력을 DEVNULL로 보내므로 PTY 없이 측정됨
+    env = {**os.environ, "PYTHONPATH": CLI_DIR, "WTF_PTY": "never"}
+    command = shlex.split(args.command)
+
+    bare = measure(command, args.runs, env)
+    python = measure([sys.executable, "-c", "pass"], args.runs, env)
+    wrapped = measure(shlex.split(args.wtf) + command, args.runs, env)
+
+    for name, timings in (("bare", bare), ("python -c pass", python), ("wtf", wrapped)):
+        print(
+            f"{name:>15}: median {statistics.median(timings) * 1000:6.1f} ms   "
+            f"p90 {sorted(timings)[int(len(timings) * 0.9) - 1] * 1000:6.1f} ms"
+        )
+
+    overhead = (statistics.median(wrapped) - statistics.median(bare)) * 1000
+    interpreter = (statistics.median(python) - statistics.median(bare)) * 1000
+    print(
+        f"\nwtf 오버헤드: {overhead:.1f} ms = 인터프리터 시작 {interpreter:.1f} ms "
+        f"+ wtf {overhead - interpreter:.1f} ms (예산 {args.budget_ms:.0f} ms)"
+    )
+
+    if overhead - interpreter > args.budget_ms:
+        print("예산 초과")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,13 @@ setup(
         "python-dotenv>=1.0.0",
         "click>=8.1.7",
     ],
+    extras_require={
+        # 설치하면 백엔드와 msgpack으로 주고받음 (없으면 JSON)
+        "msgpack": ["msgpack>=1.0.7"],
+    },
     entry_points={
         "console_scripts": [
-            "wtf=wtf.main:cli",
+            "wtf=wtf.main:main",
         ],
     },
     python_requires=">=3.10",
@@ -0,0 +1,57 @@
+from wtf.capture import BoundedCapture
+
+
+def test_short_output_is_kept_whole():
+    capture = BoundedCapture(head_bytes=8, tail_bytes=16)
+    capture.write(b'hello ')
+    capture.write(b'world\n')
+
+    assert capture.text() == 'hello world\n'
+    assert capture.total_bytes == 12
+
+
+def test_keeps_head_and_tail_and_marks_the_omitted_middle():
+    capture = BoundedCapture(head_bytes=6, tail_bytes=10)
+    capture.write(b'start\n')
+    for i in range(100):
+        capture.write(f'middle {i}\n'.encode())
+    capture.write(b'Error: x\n')
+
+    text = capture.text()
+
+    assert text.startswith('start\n')
+    assert text.endswith('Error: x\n')
+    assert 'middle 50' not in text
+    dropped = capture.total_bytes - len('start\n') - 10
+    assert f'... [{dropped} bytes omitted] ...\n' in text
+
+
+def test_tail_is_bounded_even_for_large_chunks():
+    capture = BoundedCapture(head_bytes=0, tail_bytes=1024)
+    for _ in range(64):
+        capture.write(b'x' * 4096)
+
+    assert capture.tail_size < 1024 + 4096
+    assert capture.text().endswith('x' * 1024)
+    assert f'[{64 * 4096 - 1024} bytes omitted]' in capture.text()
+
+
+def test_tail_lines_limit_drops_older_lines():
+    capture = BoundedCapture(head_bytes=0, tail_bytes=1024, tail_lines=2)
+    capture.write(b'one\ntwo\nthree\n')
+
+    assert capture.text() == '... [4 bytes omitted] ...\ntwo\nthree\n'
+
+
+def test_head_that_ends_mid_line_gets_a_newline_before_the_marker():
+    capture = BoundedCapture(head_bytes=3, tail_bytes=3)
+    capture.write(b'abcdefghi')
+
+    assert capture.text() == 'abc\n... [3 bytes omitted] ...\nghi'
+
+
+def test_strip_ansi_removes_terminal_control_sequences():
+    capture = BoundedCapture()
+    capture.write(b'\x1b[31mTypeError\x1b[0m: bad\r\n\x1b]0;title\x07done')
+
+    assert capture.text(strip_ansi=True) == 'TypeError: bad\r\ndone'
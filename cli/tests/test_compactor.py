@@ -0,0 +1,34 @@
+from wtf.compactor import LogCompactor, _is_error
+
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel']
+
+
+def _build_log(total=200, marks=None):
+    lines = [f'   Compiling {WORDS[i % 8]}-{WORDS[i // 8 % 8]}-{WORDS[i // 64 % 8]} v0.1.0' for i in range(total)]
+    for index, line in (marks or {}).items():
+        lines[index] = line
+    return '\n'.join(lines) + '\n'
+
+
+def test_keeps_exception_lines_in_the_middle_of_a_long_log():
+    marks = {
+        80: "ModuleNotFoundError: No module named 'requests'",
+        120: 'npm ERR! code ELIFECYCLE',
+        150: 'Exception in thread "main" java.lang.NullPointerException',
+    }
+    compactor = LogCompactor(window=2, max_lines=50, tail_lines=10)
+
+    compacted, stats = compactor.compact(_build_log(marks=marks))
+
+    for line in marks.values():
+        assert line in compacted
+    assert stats['omitted_lines'] > 0
+    assert '   Compiling alpha-alpha-charlie v0.1.0' not in compacted  # 128번째 줄 (에러 줄에서 먼 곳)
+
+
+def test_error_names_are_case_sensitive_and_need_a_suffix():
+    for line in ('TypeError: unsupported operand', 'KeyError', 'AssertionError',
+                 'raise MyCustomException()', 'npm ERR! code ELIFECYCLE', 'error: linking failed'):
+        assert _is_error(line), line
+    for line in ('terrorist', 'mirrors', 'ERRATA', 'Errorless'):
+        assert not _is_error(line), line
@@ -0,0 +1,91 @@
+import io
+import os
+import shlex
+import sys
+import threading
+
+import pytest
+
+from wtf.executor import CommandExecutor
+
+
+def _python(script):
+    return f'{shlex.quote(sys.executable)} -c {shlex.quote(script)}'
+
+
+def _fake_terminal(monkeypatch):
+    """
+    executor가 내보내는 출력을 받는 가짜 stdout/stderr
+    (pytest가 테스트 실행 직전에 sys.stdout/stderr를 다시 바꾸므로 fixture가 아니라 테스트 안에서 부름)
+    """
+    stdout = io.TextIOWrapper(io.BytesIO())
+    stderr = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(sys, 'stdout', stdout)
+    monkeypatch.setattr(sys, 'stderr', stderr)
+    return stdout, stderr
+
+
+def _run(command, timeout=30):
+    """다른 스레드에서 실행하고 timeout초 안에 끝나지 않으면 실패함 (멈춘 테스트가 남지 않게)"""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(CommandExecutor().run(command)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'executor hung'
+    return results[0]
+
+
+def test_child_filling_stderr_while_stdout_is_read_does_not_deadlock(monkeypatch):
+    terminal = _fake_terminal(monkeypatch)
+    monkeypatch.setenv('WTF_PTY', 'never')
+    monkeypatch.setenv('WTF_CAPTURE_HEAD_KB', '1')
+    monkeypatch.setenv('WTF_CAPTURE_TAIL_KB', '4')
+    # 파이프 버퍼(보통 64KB)보다 훨씬 많이 stderr에 쓴 다음에야 stdout에 씀
+    script = (
+        'import sys\n'
+        'sys.stderr.write("e" * 1024 * 1024)\n'
+        'sys.stderr.write("\\nValueError: boom\\n")\n'
+        'sys.stdout.write("o" * 1024 * 1024)\n'
+        'sys.exit(2)\n'
+    )
+
+    result = _run(_python(script))
+
+    assert result['exit_code'] == 2
+    assert result['stderr_bytes'] == 1024 * 1024 + len('\nValueError: boom\n')
+    assert result['stdout_bytes'] == 1024 * 1024
+    assert result['stderr'].endswith('ValueError: boom\n')
+    assert 'bytes omitted' in result['stderr']
+    assert len(result['stderr']) < 8 * 1024
+
+    # 캡처는 줄여도 터미널에는 전부 그대로 내보냄
+    stdout, stderr = terminal
+    assert len(stdout.buffer.getvalue()) == 1024 * 1024
+    assert stderr.buffer.getvalue().endswith(b'ValueError: boom\n')
+
+
+def test_pty_mode_runs_the_command_on_a_terminal(monkeypatch):
+    terminal = _fake_terminal(monkeypatch)
+    pty = pytest.importorskip('pty')
+    try:
+        master, slave = pty.openpty()
+    except OSError:
+        pytest.skip('PTY를 열 수 없음')
+    os.close(master)
+    os.close(slave)
+    monkeypatch.setenv('WTF_PTY', 'always')
+    script = (
+        'import sys\n'
+        'print(sys.stdout.isatty(), sys.stderr.isatty())\n'
+        'sys.stderr.write("\\x1b[31mTypeError\\x1b[0m: bad\\n")\n'
+        'sys.exit(3)\n'
+    )
+
+    result = _run(_python(script))
+
+    assert result['pty'] is True
+    assert result['exit_code'] == 3
+    assert result['stdout'] == 'True True\n'
+    assert result['stderr'] == 'TypeError: bad\n'
+    # 터미널로 내보내는 출력은 색상을 그대로 둠
+    assert b'\x1b[31m' in terminal[1].buffer.getvalue()
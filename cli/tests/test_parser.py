@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from wtf.parser import TracebackParser
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'tracebacks')
+
+with open(os.path.join(FIXTURE_DIR, 'expected.json'), encoding='utf-8') as f:
+    EXPECTED = json.load(f)
+
+
+def _read(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _summary(result, want):
+    got = {
+        'language': result['language'],
+        'file_path': result['file_path'],
+        'line_number': result['line_number'],
+        'frames': len(result['frames']),
+    }
+    if 'tracebacks' in want:
+        got['tracebacks'] = len(result['tracebacks'])
+    return got
+
+
+def test_every_fixture_has_an_expectation():
+    fixtures = {name for name in os.listdir(FIXTURE_DIR) if name.endswith('.txt')}
+    assert fixtures == set(EXPECTED)
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED))
+def test_parses_fixture(name):
+    want = EXPECTED[name]
+
+    assert _summary(TracebackParser().parse(_read(name)), want) == want
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED))
+def test_traceback_at_the_end_of_a_long_log_is_found(name):
+    # 끝부분만 훑는 기본 설정에서도 긴 빌드 로그 뒤의 traceback을 그대로 찾음
+    noise = '[INFO] Compiling module 214 of 980 (core/services/payment)\n' * 20000
+    want = EXPECTED[name]
+
+    assert _summary(TracebackParser().parse(noise + _read(name)), want) == want
+
+
+def test_unknown_log_has_no_location():
+    result = TracebackParser().parse('make: *** [all] Error 2\n')
+
+    assert result['language'] == 'unknown'
+    assert result['file_path'] is None
+    assert result['frames'] == []
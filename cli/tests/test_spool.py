@@ -0,0 +1,49 @@
+import pytest
+
+from wtf import main, spool
+from wtf.api_client import APIError
+
+
+class FakeClient:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.keys = []
+
+    def analyze_error(self, idempotency_key=None, **payload):
+        self.keys.append(idempotency_key)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeCache:
+    def put(self, fingerprint, analysis):
+        pass
+
+
+PAYLOAD = {'command': 'pytest', 'error_log': 'E   AssertionError', 'code_context': None, 'code_frames': []}
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('WTF_SPOOL_DIR', str(tmp_path))
+    monkeypatch.setattr(spool, 'spawn_sender', lambda: None)
+
+
+@pytest.mark.parametrize('outcome', [
+    APIError('Request timed out', retryable=True),
+    {'case_name': 'AssertionError'},  # 출력하다 KeyError가 나는 예상 밖의 응답
+])
+def test_failed_request_is_spooled_under_the_key_already_sent(outcome):
+    client = FakeClient(outcome)
+
+    main._analyze_now(client, FakeCache(), 'fingerprint', PAYLOAD)
+
+    pending = spool._read(spool.PENDING, client.keys[0])
+    assert pending is not None and pending['payload'] == PAYLOAD
+
+
+def test_non_retryable_error_is_not_spooled():
+    main._analyze_now(FakeClient(APIError('Bad request')), FakeCache(), 'fingerprint', PAYLOAD)
+
+    assert spool.find() is None
@@ -4,35 +4,101 @@ API 클라이언트 모듈
 """
 
 import requests
+import json
 import os
-from typing import Optional
+import time
+import zlib
+from typing import Iterator, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msgpack
+except ImportError:  # msgpack이 없으면 JSON으로만 주고받음
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPE = "application/json"
+
+# gzip 스트리밍에서 한 번에 압축해서 보내는 크기
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class APIError(Exception):
+    """
+    API 요청 실패
+
+    retryable: 나중에 다시 보내면 성공할 수 있는지 (연결 실패, 시간 초과, 5xx, 409, 429)
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
 
 
 class APIClient:
     def __init__(self):
-        """API 클라이언트 초기화"""
+        """
+        API 클라이언트 초기화
+
+        환경 변수:
+            WTF_CONNECT_TIMEOUT: 연결 시간 제한 (초, 기본 3)
+            WTF_READ_TIMEOUT: 응답 시간 제한 (초, 기본 30, 분석은 LLM 호출이라 오래 걸림)
+            WTF_CONNECT_RETRIES: 연결 실패 시 다시 시도하는 횟수 (기본 1, 요청을 보내기 전이라 항상 안전함)
+            WTF_RETRY_BACKOFF: 연결 재시도 간격 계수 (초, 기본 0.5)
+        """
         self.base_url = os.getenv('WTF_API_URL', 'http://localhost:8000')
-        self.timeout = 30
+        self.timeout = (
+            float(os.getenv('WTF_CONNECT_TIMEOUT', '3')),
+            float(os.getenv('WTF_READ_TIMEOUT', '30'))
+        )
+        # 본문이 이 크기(bytes) 이상이면 gzip으로 압축하면서 스트리밍으로 보냄 (0이면 압축 안 함)
+        self.gzip_threshold = int(os.getenv('WTF_GZIP_THRESHOLD', '65536'))
+        # 백엔드가 msgpack을 거절하면(415) 이 클라이언트에서는 JSON만 씀
+        self.use_msgpack = msgpack is not None and os.getenv('WTF_WIRE_FORMAT', 'msgpack') == 'msgpack'
+        # Idempotency-Key가 있을 때 시간 초과/처리 중(409)이면 같은 키로 다시 보내는 횟수
+        self.idempotent_retries = int(os.getenv('WTF_IDEMPOTENT_RETRIES', '2'))
+
+        # 연결을 재사용해서 (keep-alive) spool의 배치 전송이나 재시도 때 TCP 연결을 다시 맺지 않음
+        # 응답을 받지 못한 요청(시간 초과, 5xx)은 Idempotency-Key로 analyze_error에서 다시 보냄
+        retry = Retry(
+            total=None,
+            connect=int(os.getenv('WTF_CONNECT_RETRIES', '1')),
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=float(os.getenv('WTF_RETRY_BACKOFF', '0.5'))
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(max_retries=retry))
+        self.session.mount('https://', HTTPAdapter(max_retries=retry))
 
     def analyze_error(
         self,
         command: str,
         error_log: str,
-        code_context: Optional[dict] = None
+        code_context: Optional[dict] = None,
+        code_frames: Optional[list] = None,
+        idempotency_key: Optional[str] = None
     ) -> dict:
         """
         에러를 백엔드로 전송해서 분석함
 
+        idempotency_key를 주면 시간 초과 후 같은 키로 다시 보내도 백엔드가 분석을
+        다시 하지 않고 진행 중이거나 끝난 결과를 돌려줌
+
         Args:
             command: 실행된 명령어
             error_log: 에러 로그 출력
-            code_context: 선택적 코드 컨텍스트 dict
+            code_context: 선택적 코드 컨텍스트 dict (에러 위치)
+            code_frames: 에러 위치부터 호출한 쪽 순서의 코드 컨텍스트 목록
+            idempotency_key: 이번 실패 실행을 구분하는 키 (실행마다 새로 만듦)
 
         Returns:
             백엔드의 분석 결과
 
         Raises:
-            API 요청 실패 시 Exception
+            APIError: API 요청 실패 시
         """
         url = f"{self.base_url}/api/analyze"
 
@@ -43,21 +109,112 @@ class APIClient:
 
         if code_context:
             payload["code_context"] = code_context
+        if code_frames:
+            payload["code_frames"] = code_frames
+
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+        attempts = 1 + (self.idempotent_retries if idempotency_key else 0)
 
         try:
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response.json()
+            for attempt in range(attempts):
+                last_attempt = attempt == attempts - 1
+                try:
+                    response = self._post(url, payload, headers)
+                except requests.exceptions.Timeout:
+                    if last_attempt:
+                        raise
+                    continue
+
+                if response.status_code == 415 and self.use_msgpack:
+                    # msgpack을 모르는 백엔드면 JSON으로 다시 보냄
+                    self.use_msgpack = False
+                    response = self._post(url, payload, headers)
+                if response.status_code == 409 and not last_attempt:
+                    # 같은 키의 분석이 아직 진행 중이면 조금 기다렸다가 다시 물어봄
+                    time.sleep(float(response.headers.get("Retry-After", "1")))
+                    continue
+                response.raise_for_status()
+                return self._decode(response)
 
         except requests.exceptions.ConnectionError:
-            raise Exception("백엔드에 연결할 수 없음. 실행 중인지 확인해봐")
+            raise APIError("백엔드에 연결할 수 없음. 실행 중인지 확인해봐", retryable=True)
         except requests.exceptions.Timeout:
-            raise Exception("요청 시간 초과")
+            raise APIError("요청 시간 초과", retryable=True)
         except requests.exceptions.HTTPError as e:
-            raise Exception(f"HTTP 에러: {e.response.status_code}")
+            status = e.response.status_code
+            raise APIError(f"HTTP 에러: {status}", retryable=status >= 500 or status in (409, 429))
         except Exception as e:
-            raise Exception(f"예상치 못한 에러: {str(e)}")
+            raise APIError(f"예상치 못한 에러: {str(e)}")
+
+    def _post(self, url: str, payload: dict, extra_headers: Optional[dict] = None) -> requests.Response:
+        """
+        payload를 msgpack(가능하면) 또는 JSON으로 인코딩해서 보냄
+
+        크기가 gzip_threshold 이상이면 인코딩한 본문을 조각마다 gzip으로 압축하면서
+        chunked로 보내서, 인코딩한 본문과 압축한 본문을 둘 다 메모리에 만들지 않음
+        (JSON은 인코딩도 조각 단위로 함)
+        """
+        if self.use_msgpack:
+            headers = {"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": f"{MSGPACK_MEDIA_TYPE}, {JSON_MEDIA_TYPE};q=0.5"}
+        else:
+            headers = {"Content-Type": JSON_MEDIA_TYPE, "Accept": JSON_MEDIA_TYPE}
+
+        if extra_headers:
+            headers.update(extra_headers)
+
+        if self.gzip_threshold and _approx_size(payload) >= self.gzip_threshold:
+            headers["Content-Encoding"] = "gzip"
+            body = self._gzip_stream(self._encode_chunks(payload))
+        elif self.use_msgpack:
+            body = msgpack.packb(payload, use_bin_type=True)
+        else:
+            body = json.dumps(payload).encode("utf-8")
+
+        return self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+
+    def _encode_chunks(self, payload: dict) -> Iterator[bytes]:
+        """payload를 인코딩한 본문을 STREAM_CHUNK_SIZE 정도의 조각으로 돌려줌"""
+        if self.use_msgpack:
+            # msgpack은 조각 단위로 인코딩할 수 없으므로 한 번만 만들고 복사 없이 잘라서 보냄
+            body = memoryview(msgpack.packb(payload, use_bin_type=True))
+            for start in range(0, len(body), STREAM_CHUNK_SIZE):
+                yield body[start:start + STREAM_CHUNK_SIZE]
+            return
+
+        pending, size = [], 0
+        for piece in json.JSONEncoder().iterencode(payload):
+            pending.append(piece)
+            size += len(piece)
+            if size >= STREAM_CHUNK_SIZE:
+                yield "".join(pending).encode("utf-8")
+                pending, size = [], 0
+        if pending:
+            yield "".join(pending).encode("utf-8")
+
+    @staticmethod
+    def _gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """조각마다 gzip으로 압축해서 돌려줌 (requests가 chunked로 보냄)"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def _decode(self, response: requests.Response) -> dict:
+        """응답의 Content-Type에 맞게 본문을 dict로 바꿈"""
+        content_type = response.headers.get("Content-Type", "")
+        if msgpack is not None and content_type.startswith(MSGPACK_MEDIA_TYPE):
+            return msgpack.unpackb(response.content, raw=False)
+        return response.json()
+
+
+def _approx_size(value) -> int:
+    """인코딩하지 않고 본문 크기를 어림함 (문자열 길이의 합, 대부분 error_log와 code_snippet)"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + _approx_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_approx_size(item) for item in value)
+    return 8
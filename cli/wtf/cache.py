@@ -0,0 +1,148 @@
+"""
+분석 결과 캐시 모듈
+정규화한 에러 fingerprint별로 마지막 분석 결과를 사용자 캐시 디렉토리에 보관함
+(같은 에러가 반복되면 백엔드 없이 바로 보여주기 위함)
+
+디렉토리: WTF_CACHE_DIR, 기본 ~/.cache/wtf/analyses (파일 하나에 fingerprint 하나)
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Optional
+
+# fingerprint를 만들 때 실행마다 달라지는 부분을 지우는 패턴
+_NORMALIZERS = [
+    (re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]'), ''),                        # 터미널 제어 시퀀스
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<hex>'),                         # 메모리 주소
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'), '<uuid>'),
+    (re.compile(r'/tmp/[^\s:\'"]+'), '<tmp>'),                            # 임시 파일 경로
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),                                # 숫자 (라인 번호, 시간, pid 등)
+    (re.compile(r'[ \t]+'), ' '),
+]
+
+
+class AnalysisCache:
+    def __init__(self):
+        """
+        캐시 초기화
+
+        환경 변수:
+            WTF_CACHE_DIR: 캐시 디렉토리
+            WTF_CACHE_TTL_HOURS: 항목 유효 시간 (기본 168 = 7일, 0이면 캐시 끔)
+            WTF_CACHE_MAX_MB: 전체 최대 크기 (기본 10MB, 넘으면 오래 안 쓴 것부터 지움)
+        """
+        self.directory = os.getenv('WTF_CACHE_DIR') or self._default_dir()
+        self.ttl = float(os.getenv('WTF_CACHE_TTL_HOURS', '168')) * 3600
+        self.max_bytes = int(float(os.getenv('WTF_CACHE_MAX_MB', '10')) * 1024 * 1024)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _default_dir() -> str:
+        if os.name == 'nt':
+            base = os.path.join(os.getenv('LOCALAPPDATA', os.path.expanduser('~')), 'wtf', 'cache')
+        else:
+            base = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'wtf')
+        return os.path.join(base, 'analyses')
+
+    @staticmethod
+    def fingerprint(command: str, error_log: str) -> str:
+        """
+        명령어와 에러 로그로 fingerprint를 만듦
+        라인 번호/주소/시간 같은 값은 지워서 코드를 조금 고치고 다시 실행한 같은 에러가 같은 값이 되게 함
+        """
+        text = error_log.strip()
+        for pattern, replacement in _NORMALIZERS:
+            text = pattern.sub(replacement, text)
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+
+        digest = hashlib.sha256()
+        digest.update(' '.join(command.split()).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update('\n'.join(lines).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """
+        캐시된 분석 결과를 가져옴 (만료됐으면 지우고 None)
+
+        Returns:
+            cached_at, analysis를 담은 dict
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(fingerprint)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('cached_at', 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        # 최근에 쓴 항목이 정리에서 살아남도록 접근 시각을 갱신함
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, fingerprint: str, analysis: dict) -> None:
+        """분석 결과를 저장하고 크기 제한을 넘으면 정리함"""
+        if not self.enabled:
+            return
+
+        path = self._path(fingerprint)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'cached_at': time.time(), 'analysis': analysis}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self.prune()
+
+    def prune(self) -> None:
+        """만료된 항목을 지우고, 전체 크기가 max_bytes를 넘으면 오래 안 쓴 것부터 지움"""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        except FileNotFoundError:
+            return
+
+        now = time.time()
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # 파일 수정 시각은 마지막으로 쓴 시각이므로 만료 판단은 get()에 맡기고 여기서는 넉넉히 봄
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f'{fingerprint}.json')
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
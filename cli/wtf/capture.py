@@ -0,0 +1,76 @@
+"""
+출력 캡처 버퍼 모듈
+긴 출력을 앞부분 일부와 마지막 부분만 일정한 메모리 안에서 보관함
+"""
+
+import re
+from collections import deque
+
+# 색상/커서 이동 등 터미널 제어 시퀀스 (PTY 모드 출력에서 분석용 텍스트만 남길 때 사용)
+ANSI_ESCAPE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])')
+
+
+class BoundedCapture:
+    def __init__(self, head_bytes: int = 16 * 1024, tail_bytes: int = 256 * 1024, tail_lines: int = 2000):
+        """
+        캡처 버퍼 초기화
+
+        Args:
+            head_bytes: 처음부터 그대로 보관할 크기 (어떤 명령어/설정으로 시작했는지 보기 위함)
+            tail_bytes: 마지막으로 보관할 크기 (에러는 보통 끝에 있음)
+            tail_lines: text()에서 돌려줄 마지막 부분의 최대 줄 수
+        """
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.tail_lines = tail_lines
+
+        self.head = bytearray()
+        self.tail = deque()
+        self.tail_size = 0
+        self.total_bytes = 0
+
+    def write(self, data: bytes) -> None:
+        """출력 조각을 추가함 (tail_bytes를 넘는 오래된 조각은 버림)"""
+        self.total_bytes += len(data)
+
+        if len(self.head) < self.head_bytes:
+            room = self.head_bytes - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+            if not data:
+                return
+
+        self.tail.append(data)
+        self.tail_size += len(data)
+
+        while self.tail and self.tail_size - len(self.tail[0]) >= self.tail_bytes:
+            self.tail_size -= len(self.tail.popleft())
+
+    def text(self, strip_ansi: bool = False) -> str:
+        """
+        보관한 출력을 문자열로 돌려줌
+        중간을 버렸으면 그 자리에 생략 표시를 넣음
+
+        Args:
+            strip_ansi: 터미널 제어 시퀀스를 지울지 (PTY로 실행한 출력용)
+        """
+        tail = b"".join(self.tail)[-self.tail_bytes:] if self.tail_bytes else b""
+        dropped = self.total_bytes - len(self.head) - len(tail)
+
+        lines = tail.splitlines(keepends=True)
+        if len(lines) > self.tail_lines:
+            dropped_lines = lines[:-self.tail_lines]
+            dropped += sum(len(line) for line in dropped_lines)
+            tail = b"".join(lines[-self.tail_lines:])
+
+        head = self.head.decode("utf-8", errors="replace")
+        tail = tail.decode("utf-8", errors="replace")
+        if strip_ansi:
+            head = ANSI_ESCAPE.sub("", head)
+            tail = ANSI_ESCAPE.sub("", tail)
+        if dropped <= 0:
+            return head + tail
+
+        if head and not head.endswith("\n"):
+            head += "\n"
+        return f"{head}... [{dropped} bytes omitted] ...\n{tail}"
@@ -0,0 +1,32 @@
+"""
+click 명령어 정의
+wtf 옵션/하위 명령어/--help가 있을 때만 wtf.main.main()이 import함 (click import가 느리기 때문)
+"""
+
+import click
+
+from wtf.main import run
+
+
+# 명령어 뒤의 옵션은 명령어에 넘기도록 wtf 옵션은 명령어 앞에서만 받음
+@click.command(context_settings=dict(ignore_unknown_options=True, allow_interspersed_args=False))
+@click.option('--background', '-b', is_flag=True, envvar='WTF_BACKGROUND',
+              help='분석을 기다리지 않고 보관한 뒤 백그라운드로 보냄 (결과는 wtf last로 확인)')
+@click.option('--fresh', is_flag=True, envvar='WTF_NO_CACHE',
+              help='캐시된 분석을 쓰지 않고 새로 분석함')
+@click.option('--refresh', is_flag=True, envvar='WTF_CACHE_REFRESH',
+              help='캐시된 분석을 보여준 뒤 백그라운드로 다시 분석해서 캐시를 갱신함')
+@click.argument('command', nargs=-1, type=click.UNPROCESSED, required=True)
+def cli(background, fresh, refresh, command):
+    """
+    명령어를 실행하고 발생하는 에러를 분석함
+
+    예시:
+        wtf python test.py
+        wtf npm run build
+        wtf last
+        wtf show 3f2b8c1e
+
+    같은 이름의 명령어(last, show)를 실행하려면: wtf command last
+    """
+    run(command, background=background, fresh=fresh, refresh=refresh)
@@ -0,0 +1,197 @@
+"""
+에러 로그 압축 모듈
+백엔드로 보내기 전에 진행 표시줄, 반복되는 줄, 에러와 먼 부분을 덜어냄
+"""
+
+import os
+import re
+from typing import List, Tuple
+
+from wtf.capture import ANSI_ESCAPE
+
+# 에러 위치로 보는 줄: 에러/예외 키워드 (소문자로 바꾼 줄에서 찾음)
+# 키워드마다 첫 글자로 시작하게 써서 re가 첫 글자 집합으로 후보 위치만 보게 함 (IGNORECASE나 \b로 시작하면 느림)
+ERROR_WORD = re.compile(
+    r'e(?<!\w.)(?:rrors?|xception)\b|t(?<!\w.)raceback\b|f(?<!\w.)(?:atal|ailed|ailure)\b'
+    r'|p(?<!\w.)anic(?:ked)?\b|c(?<!\w.)aused by\b|a(?<!\w.)bort(?:ed)?\b'
+)
+# 예외 클래스 이름 (TypeError, ModuleNotFoundError, NullPointerException)과 npm ERR! (원래 줄에서 대소문자를 구분해 찾음)
+# \w*(?:Error|Exception)\b와 같은 줄에 맞지만, 앞의 \w*는 search 결과를 바꾸지 않고 느리기만 해서 뺌
+ERROR_NAME = re.compile(r'(?:Error|Exception)\b|ERR!')
+# traceback 프레임과 컴파일러의 위치 표시 (at ..., File "...", --> src/main.rs, ^^^)
+TRACE_LINE = re.compile(r'^\s+(?:File "|at |--> )|^\s*\^+\s*$')
+# 진행 표시줄 (막대 + 퍼센트, 전송 속도, eta, 스피너)
+PROGRESS_LINE = re.compile(
+    r'[#=█▉▊▋▌▍▎▏▓▒░■□>\-]{4,}.*?\d{1,3}(?:\.\d+)?\s?%'
+    r'|\d{1,3}(?:\.\d+)?\s?%.*?[#=█▓▒░■□|]{4,}'
+    r'|\d+(?:\.\d+)?\s?[kKMG]i?B/s'
+    r'|\d+(?:\.\d+)?\s?it/s'
+    r'|\beta\s+\d'
+    r'|^\s*[⠀-⣿◐◓◑◒]\s'
+)
+SPINNERS = '◐◓◑◒'
+# 숫자만 다른 줄을 같은 줄로 보기 위함 (Compiling 12 of 980 같은 줄)
+DIGITS = re.compile(r'\d+')
+# 이만큼 이상 이어져야 숫자만 다른 줄을 접음 (정확히 같은 줄은 2줄부터 접음)
+MIN_SIMILAR_RUN = 4
+# 로그 처음에서 항상 남기는 줄 수 (어떤 명령어/설정으로 시작했는지)
+HEAD_LINES = 10
+
+
+class LogCompactor:
+    def __init__(self, window: int = None, max_lines: int = None, tail_lines: int = None):
+        """
+        로그 압축기 초기화
+
+        Args:
+            window: 에러 줄 앞뒤로 남길 줄 수 (기본 WTF_COMPACT_WINDOW, 15)
+            max_lines: 반복/진행 표시줄을 접은 뒤 이 줄 수 이하면 에러 주변만 고르지 않음
+                       (기본 WTF_COMPACT_MAX_LINES, 300)
+            tail_lines: 로그 끝에서 항상 남기는 줄 수 (기본 WTF_COMPACT_TAIL_LINES, 40)
+        """
+        self.window = window if window is not None else int(os.getenv('WTF_COMPACT_WINDOW', '15'))
+        self.max_lines = max_lines if max_lines is not None else int(os.getenv('WTF_COMPACT_MAX_LINES', '300'))
+        self.tail_lines = tail_lines if tail_lines is not None else int(os.getenv('WTF_COMPACT_TAIL_LINES', '40'))
+
+    def compact(self, text: str) -> Tuple[str, dict]:
+        """
+        로그를 압축함. 덜어낸 자리에는 무엇을 몇 줄 뺐는지 표시를 남김
+
+        1. 터미널 제어 시퀀스를 지우고, \\r로 덮어쓴 줄은 마지막 내용만 남김
+        2. 이어지는 진행 표시줄을 한 줄 표시로 바꿈
+        3. 같은 줄(또는 숫자만 다른 줄)이 이어지면 접음
+        4. 그래도 길면 처음/끝과 에러 줄 주변 window줄만 남김
+
+        Args:
+            text: 캡처한 stderr
+
+        Returns:
+            (압축한 텍스트, 통계 dict: original_bytes, compacted_bytes, original_lines,
+             progress_lines, repeated_lines, omitted_lines)
+        """
+        stats = {
+            'original_bytes': len(text.encode('utf-8', errors='replace')),
+            'original_lines': 0,
+            'progress_lines': 0,
+            'repeated_lines': 0,
+            'omitted_lines': 0,
+        }
+
+        lines = []
+        for line in ANSI_ESCAPE.sub('', text).split('\n'):
+            line = line.rstrip('\r')
+            if '\r' in line:
+                line = line.rsplit('\r', 1)[1]
+            lines.append(line)
+        if lines and lines[-1] == '':
+            lines.pop()
+        stats['original_lines'] = len(lines)
+
+        # (텍스트, 종류, 나타내는 원래 줄 수) 목록
+        # 종류: 'line', 'error'(에러 줄), 'progress'/'repeated'(접은 구간 표시)
+        entries = self._collapse(lines, stats)
+
+        if len(entries) > self.max_lines:
+            entries = self._window(entries, stats)
+
+        compacted = '\n'.join(line for line, _, _ in entries)
+        if text.endswith('\n') and compacted:
+            compacted += '\n'
+        stats['compacted_bytes'] = len(compacted.encode('utf-8', errors='replace'))
+        return compacted, stats
+
+    def _collapse(self, lines: List[str], stats: dict) -> List[Tuple[str, str, int]]:
+        """진행 표시줄과 반복되는 줄을 접음"""
+        # 줄마다 정규식을 한 번씩만 돌림
+        errors = [_is_error(line) for line in lines]
+        progress = [not error and _is_progress(line) for line, error in zip(lines, errors)]
+        keys = [DIGITS.sub('0', line) for line in lines]
+
+        def kept(index):
+            return (lines[index], 'error' if errors[index] else 'line', 1)
+
+        entries = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+
+            if progress[i]:
+                end = i + 1
+                while end < len(lines) and progress[end]:
+                    end += 1
+                stats['progress_lines'] += end - i
+                entries.append((f'... [{end - i} progress lines omitted] ...', 'progress', end - i))
+                i = end
+                continue
+
+            # 같은 줄이 이어지는 구간
+            end = i + 1
+            while end < len(lines) and lines[end] == line:
+                end += 1
+            if end - i > 1:
+                stats['repeated_lines'] += end - i - 1
+                entries.append(kept(i))
+                entries.append((f'... [previous line repeated {end - i - 1} more times] ...', 'repeated', end - i - 1))
+                i = end
+                continue
+
+            # 숫자만 다른 줄이 이어지는 구간 (처음과 마지막 줄만 남김)
+            end = i + 1
+            while end < len(lines) and keys[end] == keys[i]:
+                end += 1
+            if end - i >= MIN_SIMILAR_RUN and keys[i] != line:
+                stats['repeated_lines'] += end - i - 2
+                entries.append(kept(i))
+                entries.append((f'... [{end - i - 2} similar lines omitted] ...', 'repeated', end - i - 2))
+                entries.append(kept(end - 1))
+                i = end
+                continue
+
+            entries.append(kept(i))
+            i += 1
+        return entries
+
+    def _window(self, entries: List[Tuple[str, str, int]], stats: dict) -> List[Tuple[str, str, int]]:
+        """
+        처음 HEAD_LINES줄, 마지막 tail_lines줄, 에러 줄 앞뒤 window줄만 남김
+        (접은 구간 표시가 빠지면 그 구간이 나타내던 줄 수는 omitted_lines로 옮겨 셈)
+        """
+        keep = [False] * len(entries)
+        for index in range(min(HEAD_LINES, len(entries))):
+            keep[index] = True
+        for index in range(max(0, len(entries) - self.tail_lines), len(entries)):
+            keep[index] = True
+        for index, (_, kind, _) in enumerate(entries):
+            if kind == 'error':
+                for near in range(max(0, index - self.window), min(len(entries), index + self.window + 1)):
+                    keep[near] = True
+
+        result = []
+        omitted = 0
+        for entry, kept in zip(entries, keep):
+            if kept:
+                if omitted:
+                    result.append((f'... [{omitted} lines omitted] ...', 'omitted', omitted))
+                    omitted = 0
+                result.append(entry)
+                continue
+            _, kind, count = entry
+            if kind in ('progress', 'repeated'):
+                stats[f'{kind}_lines'] -= count
+            stats['omitted_lines'] += count
+            omitted += count
+        if omitted:
+            result.append((f'... [{omitted} lines omitted] ...', 'omitted', omitted))
+        return result
+
+
+def _is_error(line: str) -> bool:
+    return bool(ERROR_NAME.search(line) or ERROR_WORD.search(line.lower()) or TRACE_LINE.match(line))
+
+
+def _is_progress(line: str) -> bool:
+    # 대부분의 줄은 정규식까지 가지 않도록 진행 표시줄에 꼭 있는 글자부터 확인함
+    head = line.lstrip()[:1]
+    if not ('%' in line or '/s' in line or 'eta' in line or '\u2800' <= head <= '\u28ff' or (head and head in SPINNERS)):
+        return False
+    return bool(PROGRESS_LINE.search(line))
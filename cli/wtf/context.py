@@ -4,18 +4,35 @@
 """
 
 import os
-from typing import Optional
+from typing import Dict, List, Optional
+
+# 이보다 큰 파일은 생성/번들된 파일로 보고 읽지 않음
+MAX_FILE_BYTES = 5 * 1024 * 1024
+# 바이너리인지 확인할 때 읽는 앞부분 크기
+BINARY_SNIFF_BYTES = 8 * 1024
+# 한 줄이 이보다 길면 자름 (minified 파일)
+MAX_LINE_CHARS = 400
+# 백엔드가 프롬프트에 넣는 최대 프레임 수 (WTF_CONTEXT_FRAMES가 더 커도 이만큼만 보냄)
+MAX_FRAMES = 5
 
 
 class ContextExtractor:
-    def __init__(self, context_lines: int = 10):
+    def __init__(self, context_lines: int = 10, caller_context_lines: int = 3, max_frames: Optional[int] = None):
         """
         컨텍스트 추출기 초기화
 
         Args:
             context_lines: 에러 라인 앞뒤로 포함할 라인 수
+            caller_context_lines: 에러 위치를 부른 프레임에서 앞뒤로 포함할 라인 수
+            max_frames: 컨텍스트를 추출할 최대 프레임 수 (기본 WTF_CONTEXT_FRAMES, 3, 1~MAX_FRAMES로 맞춤)
         """
         self.context_lines = context_lines
+        self.caller_context_lines = caller_context_lines
+        if max_frames is None:
+            max_frames = int(os.getenv('WTF_CONTEXT_FRAMES', '3'))
+        self.max_frames = min(max(1, max_frames), MAX_FRAMES)
+        # 파일 경로 -> {라인 번호: 내용} (읽을 수 없는 파일은 None), 이 추출기를 쓰는 동안만 유지
+        self._files: Dict[str, Optional[Dict[int, str]]] = {}
 
     def extract(self, file_path: str, line_number: int) -> Optional[dict]:
         """
@@ -28,35 +45,102 @@ class ContextExtractor:
         Returns:
             file_path, line_number, code_snippet, language를 담은 dict
         """
-        if not os.path.exists(file_path):
-            return None
+        contexts = self.extract_frames([{'file_path': file_path, 'line_number': line_number}])
+        return contexts[0] if contexts else None
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+    def extract_frames(self, frames: List[dict]) -> List[dict]:
+        """
+        TracebackParser가 찾은 프레임(안쪽부터) 중 사용자 코드 프레임 max_frames개의 컨텍스트를 추출함
+        같은 파일의 프레임은 파일을 한 번만 읽어서 처리함
+
+        첫 프레임(에러 위치)은 context_lines, 나머지(호출한 쪽)는 caller_context_lines만큼 앞뒤를 보여줌.
+        사용자 코드 프레임이 없으면 첫 프레임만 시도함
+
+        Returns:
+            file_path, line_number, function, code_snippet, language를 담은 dict 목록 (읽은 것만)
+        """
+        selected = []
+        seen = set()
+        candidates = [frame for frame in frames if frame.get('category', 'user') == 'user'] or frames[:1]
+        for frame in candidates:
+            key = (frame['file_path'], frame['line_number'])
+            if key in seen:
+                continue
+            seen.add(key)
+            selected.append(frame)
+            if len(selected) >= self.max_frames:
+                break
+
+        # 파일마다 필요한 가장 큰 라인까지 한 번에 읽음
+        ranges = []
+        needed: Dict[str, int] = {}
+        for index, frame in enumerate(selected):
+            radius = self.context_lines if index == 0 else self.caller_context_lines
+            start = max(1, frame['line_number'] - radius)
+            end = frame['line_number'] + radius
+            ranges.append((start, end))
+            needed[frame['file_path']] = max(needed.get(frame['file_path'], 0), end)
 
-            # 시작과 끝 라인 계산
-            start_line = max(1, line_number - self.context_lines)
-            end_line = min(len(lines), line_number + self.context_lines)
+        for file_path, last_line in needed.items():
+            self._load(file_path, last_line, [r for f, r in zip(selected, ranges) if f['file_path'] == file_path])
+
+        contexts = []
+        for frame, (start, end) in zip(selected, ranges):
+            lines = self._files.get(frame['file_path'])
+            if not lines or frame['line_number'] not in lines:
+                continue
 
             # 스니펫 추출
             snippet_lines = []
-            for i in range(start_line - 1, end_line):
-                line_prefix = ">>> " if (i + 1) == line_number else "    "
-                snippet_lines.append(f"{line_prefix}{i + 1:4d} | {lines[i].rstrip()}")
-
-            # 파일 확장자에서 언어 감지
-            language = self._detect_language(file_path)
+            for number in range(start, end + 1):
+                if number not in lines:
+                    break
+                line_prefix = ">>> " if number == frame['line_number'] else "    "
+                snippet_lines.append(f"{line_prefix}{number:4d} | {lines[number]}")
 
-            return {
-                'file_path': file_path,
-                'line_number': line_number,
+            contexts.append({
+                'file_path': frame['file_path'],
+                'line_number': frame['line_number'],
+                'function': frame.get('function'),
                 'code_snippet': '\n'.join(snippet_lines),
-                'language': language
-            }
+                # 파일 확장자에서 언어 감지
+                'language': self._detect_language(frame['file_path'])
+            })
+        return contexts
+
+    def _load(self, file_path: str, last_line: int, ranges: List[tuple]) -> None:
+        """
+        파일 앞부분을 last_line까지만 줄 단위로 읽고 ranges 안의 줄만 보관함
+        이미 읽었으면 다시 읽지 않음 (같은 추출기에서 이전에 읽은 줄이 부족하면 다시 읽음)
+        """
+        cached = self._files.get(file_path, {})
+        if file_path in self._files and (cached is None or all(
+            number in cached for start, end in ranges for number in range(start, end + 1)
+        )):
+            return
+
+        self._files[file_path] = None
+        try:
+            if os.path.getsize(file_path) > MAX_FILE_BYTES:
+                return
+            with open(file_path, 'rb') as f:
+                if b'\0' in f.read(BINARY_SNIFF_BYTES):
+                    return
+                f.seek(0)
+
+                lines = {}
+                for number, raw in enumerate(f, start=1):
+                    if any(start <= number <= end for start, end in ranges):
+                        text = raw[:MAX_LINE_CHARS * 4].decode('utf-8', errors='replace').rstrip()
+                        if len(text) > MAX_LINE_CHARS:
+                            text = text[:MAX_LINE_CHARS] + ' …'
+                        lines[number] = text
+                    if number >= last_line:
+                        break
+        except (OSError, ValueError):
+            return
 
-        except Exception as e:
-            return None
+        self._files[file_path] = {**(cached or {}), **lines}
 
     def _detect_language(self, file_path: str) -> str:
         """파일 확장자에서 프로그래밍 언어를 감지함"""
@@ -64,10 +148,13 @@ class ContextExtractor:
         language_map = {
             '.py': 'python',
             '.js': 'javascript',
+            '.mjs': 'javascript',
+            '.cjs': 'javascript',
             '.ts': 'typescript',
             '.jsx': 'javascript',
             '.tsx': 'typescript',
             '.java': 'java',
+            '.kt': 'kotlin',
             '.go': 'go',
             '.rs': 'rust',
             '.cpp': 'cpp',
@@ -3,60 +3,306 @@
 명령어를 실행하고 stdout/stderr를 캡처함
 """
 
+import errno
+import os
+import signal
 import subprocess
 import sys
+import threading
+from typing import List, Tuple
+
+from wtf.capture import BoundedCapture
+
+try:
+    import fcntl
+    import pty
+    import termios
+except ImportError:  # Windows에서는 PTY 모드 없이 파이프로만 실행
+    pty = None
+
+# 파이프에서 한 번에 읽는 크기
+READ_SIZE = 64 * 1024
 
 
 class CommandExecutor:
+    def __init__(self):
+        """
+        실행기 초기화
+
+        캡처 크기는 환경 변수로 조절함 (스트림마다 따로 적용)
+            WTF_CAPTURE_HEAD_KB: 앞부분 보관 크기 (기본 16)
+            WTF_CAPTURE_TAIL_KB: 마지막 부분 보관 크기 (기본 256)
+            WTF_CAPTURE_TAIL_LINES: 마지막 부분 최대 줄 수 (기본 2000)
+
+        실행 방식은 WTF_PTY로 정함
+            auto (기본): 터미널에서 실행할 때만 PTY 사용
+            always / never: 항상 / 사용 안 함
+        """
+        self.head_bytes = int(os.getenv('WTF_CAPTURE_HEAD_KB', '16')) * 1024
+        self.tail_bytes = int(os.getenv('WTF_CAPTURE_TAIL_KB', '256')) * 1024
+        self.tail_lines = int(os.getenv('WTF_CAPTURE_TAIL_LINES', '2000'))
+        self.pty_mode = os.getenv('WTF_PTY', 'auto').lower()
+
     def run(self, command: str) -> dict:
         """
         명령어를 실행하고 출력을 캡처함
 
+        stdout과 stderr를 각각 스레드에서 동시에 읽어서 바로 터미널로 내보내고,
+        분석용으로는 앞부분 일부와 마지막 부분만 보관함 (출력이 길어도 메모리가 일정함)
+
+        PTY 모드에서는 stdout/stderr를 각각 의사 터미널에 연결해서 실행하므로
+        명령어가 터미널로 인식하고 색상/진행 표시줄/줄 단위 출력을 그대로 씀
+
         Args:
             command: 실행할 명령어 문자열
 
         Returns:
-            exit_code, stdout, stderr를 담은 dict
+            exit_code, stdout, stderr, stdout_bytes, stderr_bytes(전체 출력 크기), pty를 담은 dict
         """
-        try:
-            # stdout을 실시간으로 출력하면서 명령어 실행
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-
-            # stdout과 stderr 캡처
-            stdout_lines = []
-            stderr_lines = []
+        use_pty = self._use_pty()
+        stdout_capture = self._new_capture()
+        stderr_capture = self._new_capture()
 
-            # stdout을 실시간으로 읽기
-            if process.stdout:
-                for line in process.stdout:
-                    sys.stdout.write(line)
-                    sys.stdout.flush()
-                    stdout_lines.append(line)
-
-            # 프로세스 완료 대기하고 stderr 받기
-            _, stderr = process.communicate()
-            if stderr:
-                sys.stderr.write(stderr)
-                sys.stderr.flush()
-                stderr_lines.append(stderr)
+        try:
+            if use_pty:
+                exit_code = self._run_pty(command, stdout_capture, stderr_capture)
+            else:
+                exit_code = self._run_pipe(command, stdout_capture, stderr_capture)
 
             return {
-                'exit_code': process.returncode,
-                'stdout': ''.join(stdout_lines),
-                'stderr': ''.join(stderr_lines)
+                'exit_code': exit_code,
+                'stdout': stdout_capture.text(strip_ansi=use_pty),
+                'stderr': stderr_capture.text(strip_ansi=use_pty),
+                'stdout_bytes': stdout_capture.total_bytes,
+                'stderr_bytes': stderr_capture.total_bytes,
+                'pty': use_pty
             }
 
         except Exception as e:
             return {
                 'exit_code': 1,
                 'stdout': '',
-                'stderr': str(e)
+                'stderr': str(e),
+                'stdout_bytes': 0,
+                'stderr_bytes': 0,
+                'pty': use_pty
             }
+
+    def _use_pty(self) -> bool:
+        """PTY 모드로 실행할지 정함 (auto는 wtf의 stdout이 터미널일 때만)"""
+        if pty is None or self.pty_mode == 'never':
+            return False
+        if self.pty_mode == 'always':
+            return True
+        return sys.stdout.isatty()
+
+    def _run_pipe(self, command: str, stdout_capture: BoundedCapture, stderr_capture: BoundedCapture) -> int:
+        """stdout/stderr를 파이프로 연결해서 실행함"""
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        pumps, errors = self._start_pumps([
+            (process.stdout.fileno(), sys.stdout, stdout_capture),
+            (process.stderr.fileno(), sys.stderr, stderr_capture),
+        ])
+
+        exit_code = self._wait(process)
+        try:
+            self._join_pumps(pumps, errors)
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+        return exit_code
+
+    def _run_pty(self, command: str, stdout_capture: BoundedCapture, stderr_capture: BoundedCapture) -> int:
+        """
+        stdout/stderr를 각각 의사 터미널에 연결해서 실행함
+
+        stdin과 제어 터미널은 원래 터미널을 그대로 쓰므로 대화형 입력과 Ctrl+C/Ctrl+Z는
+        평소처럼 동작함. 창 크기 변경(SIGWINCH)은 의사 터미널에 복사하고,
+        wtf가 받은 SIGTERM/SIGHUP은 자식에게 전달함
+        """
+        masters, slaves = [], []
+        for _ in range(2):
+            master, slave = pty.openpty()
+            # 출력 바이트를 그대로 전달하도록 \n -> \r\n 변환을 끔 (원래 터미널이 변환함)
+            attrs = termios.tcgetattr(slave)
+            attrs[1] &= ~termios.ONLCR
+            termios.tcsetattr(slave, termios.TCSANOW, attrs)
+            masters.append(master)
+            slaves.append(slave)
+        self._copy_window_size(masters)
+
+        try:
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=slaves[0],
+                stderr=slaves[1]
+            )
+        finally:
+            for slave in slaves:
+                os.close(slave)
+
+        previous = self._forward_signals(process, masters)
+        try:
+            pumps, errors = self._start_pumps([
+                (masters[0], sys.stdout, stdout_capture),
+                (masters[1], sys.stderr, stderr_capture),
+            ])
+            exit_code = self._wait(process)
+            self._join_pumps(pumps, errors)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            for master in masters:
+                os.close(master)
+        return exit_code
+
+    def _forward_signals(self, process: subprocess.Popen, masters: List[int]) -> dict:
+        """
+        실행 중에 받은 시그널을 처리할 핸들러를 등록함
+
+        Returns:
+            원래 핸들러 (signum -> handler), 메인 스레드가 아니면 빈 dict
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+
+        def on_resize(signum, frame):
+            self._copy_window_size(masters)
+
+        def on_terminate(signum, frame):
+            if process.poll() is None:
+                process.send_signal(signum)
+
+        previous = {}
+        for signum, handler in (
+            (signal.SIGWINCH, on_resize),
+            (signal.SIGTERM, on_terminate),
+            (signal.SIGHUP, on_terminate),
+        ):
+            previous[signum] = signal.signal(signum, handler)
+        return previous
+
+    @staticmethod
+    def _copy_window_size(masters: List[int]) -> None:
+        """wtf가 붙어있는 터미널의 창 크기를 의사 터미널에 복사함"""
+        for stream in (sys.stdout, sys.stderr, sys.stdin):
+            try:
+                size = fcntl.ioctl(stream.fileno(), termios.TIOCGWINSZ, b"\0" * 8)
+                break
+            except (OSError, ValueError):
+                continue
+        else:
+            return
+
+        for master in masters:
+            try:
+                fcntl.ioctl(master, termios.TIOCSWINSZ, size)
+            except OSError:
+                pass
+
+    def _start_pumps(self, streams) -> Tuple[List[threading.Thread], List[BaseException]]:
+        """
+        (fd, 출력 스트림, 캡처 버퍼)마다 읽기 스레드를 시작함
+
+        Returns:
+            (스레드 목록, 스레드에서 난 예외를 모으는 목록)
+        """
+        errors: List[BaseException] = []
+
+        def run(fd, target, capture):
+            try:
+                self._pump(fd, target, capture)
+            except BaseException as e:
+                errors.append(e)
+
+        pumps = [
+            threading.Thread(target=run, args=stream, daemon=True)
+            for stream in streams
+        ]
+        for pump in pumps:
+            pump.start()
+        return pumps, errors
+
+    @staticmethod
+    def _join_pumps(pumps: List[threading.Thread], errors: List[BaseException]) -> None:
+        """읽기 스레드가 끝나기를 기다리고, 스레드에서 난 예외를 다시 던짐"""
+        for pump in pumps:
+            pump.join()
+        if errors:
+            raise errors[0]
+
+    def _new_capture(self) -> BoundedCapture:
+        return BoundedCapture(
+            head_bytes=self.head_bytes,
+            tail_bytes=self.tail_bytes,
+            tail_lines=self.tail_lines
+        )
+
+    @staticmethod
+    def _pump(fd: int, target, capture: BoundedCapture) -> None:
+        """
+        파이프/의사 터미널에서 읽은 조각을 그대로 터미널로 내보내고 캡처 버퍼에 넣음
+        줄 단위로 기다리지 않으므로 진행 표시줄 같은 부분 출력도 바로 보임
+
+        내보낼 곳이 닫히면 (wtf cmd | head) 더 쓰지 않고 읽는 쪽도 닫음.
+        wtf 없이 파이프로 이었을 때처럼 그 스트림에 쓰는 자식(과 그 자식들)이 SIGPIPE를 받으므로
+        가득 찬 파이프에서 멈추거나 끝없이 출력하며 남지 않음. 다른 스트림은 계속 읽어서 캡처함
+        """
+        out = getattr(target, 'buffer', None)
+        while True:
+            try:
+                data = os.read(fd, READ_SIZE)
+            except OSError as e:
+                # 의사 터미널은 자식 쪽이 모두 닫히면 EOF 대신 EIO를 냄 (Linux)
+                if e.errno == errno.EIO:
+                    break
+                raise
+            if not data:
+                break
+            capture.write(data)
+            try:
+                if out is not None:
+                    out.write(data)
+                    out.flush()
+                else:
+                    target.write(data.decode('utf-8', errors='replace'))
+                    target.flush()
+            except OSError:
+                _redirect_to_devnull(fd, os.O_RDONLY)
+                try:
+                    _redirect_to_devnull(target.fileno(), os.O_WRONLY)
+                except (OSError, ValueError, AttributeError):
+                    pass
+                break
+
+    @staticmethod
+    def _wait(process: subprocess.Popen) -> int:
+        """
+        프로세스 종료를 기다림
+        Ctrl+C는 같은 프로세스 그룹의 자식도 받으므로, wtf는 자식이 끝날 때까지 계속 기다림
+        """
+        while True:
+            try:
+                return process.wait()
+            except KeyboardInterrupt:
+                continue
+
+
+def _redirect_to_devnull(fd: int, flags: int) -> None:
+    """
+    fd를 /dev/null로 바꿔서 원래 가리키던 파이프를 닫음
+    (fd 번호는 그대로 남으므로 나중에 닫는 쪽이 다른 파일을 닫을 일이 없고,
+    wtf가 종료할 때 남은 버퍼를 flush해도 BrokenPipeError가 다시 나지 않음)
+    """
+    devnull = os.open(os.devnull, flags)
+    try:
+        os.dup2(devnull, fd)
+    finally:
+        os.close(devnull)
@@ -6,88 +6,266 @@ CLI-Mate: AI 기반 에러 분석 도구
     wtf <command>
     wtf python test.py
     wtf npm run build
+    wtf -b pytest          # 분석을 기다리지 않고 백그라운드로 보냄
+    wtf --fresh pytest     # 캐시된 분석 대신 새로 분석
+    wtf last               # 가장 최근 분석 결과
+    wtf show <id>          # id(앞부분)로 분석 결과 보기
+
+모든 실행 앞에 붙는 래퍼이므로 시작 시간을 줄이려고, 명령어가 성공하면 쓰지 않는
+모듈(click, requests, python-dotenv, 파서/마스킹 등)은 필요할 때 import함
 """
 
-import click
+import os
 import sys
+import time
+from typing import TYPE_CHECKING
+
 from wtf.executor import CommandExecutor
-from wtf.parser import TracebackParser
-from wtf.context import ContextExtractor
-from wtf.sanitizer import Sanitizer
-from wtf.api_client import APIClient
+
+if TYPE_CHECKING:
+    from wtf.api_client import APIClient
+    from wtf.cache import AnalysisCache
+
+# click의 불리언 환경 변수와 같은 값을 참으로 봄
+_TRUE_VALUES = ('1', 'true', 't', 'yes', 'y', 'on')
 
 
-@click.command(context_settings=dict(ignore_unknown_options=True))
-@click.argument('command', nargs=-1, type=click.UNPROCESSED, required=True)
-def cli(command):
+def main() -> None:
     """
-    명령어를 실행하고 발생하는 에러를 분석함
+    콘솔 진입점 (wtf)
+    wtf 옵션이나 하위 명령어 없이 명령어만 넘긴 흔한 경우에는 click 없이 바로 실행하고,
+    나머지(옵션, last/show, --help)는 click 명령어(wtf.cli)로 넘김
+    """
+    _load_env()
+    args = sys.argv[1:]
+    if args and not args[0].startswith('-') and not _is_subcommand(args):
+        run(
+            tuple(args),
+            background=_env_flag('WTF_BACKGROUND'),
+            fresh=_env_flag('WTF_NO_CACHE'),
+            refresh=_env_flag('WTF_CACHE_REFRESH')
+        )
+    else:
+        from wtf.cli import cli
+        cli()
+
 
-    예시:
-        wtf python test.py
-        wtf npm run build
+def run(command: tuple, background: bool = False, fresh: bool = False, refresh: bool = False) -> None:
     """
-    cmd_string = ' '.join(command)
+    명령어를 실행하고 실패하면 에러를 분석함 (원래 명령어의 exit code로 종료함)
 
-    # 컴포넌트 초기화
-    executor = CommandExecutor()
-    parser = TracebackParser()
-    context_extractor = ContextExtractor()
-    sanitizer = Sanitizer()
-    api_client = APIClient()
+    Args:
+        command: 실행할 명령어와 인자
+        background: 분석을 기다리지 않고 보관한 뒤 백그라운드로 보냄
+        fresh: 캐시된 분석을 쓰지 않음
+        refresh: 캐시된 분석을 보여준 뒤 백그라운드로 다시 분석함
+    """
+    if command == ('last',):
+        _show_entry(None)
+        return
+    if len(command) == 2 and command[0] == 'show':
+        _show_entry(command[1])
+        return
+
+    cmd_string = ' '.join(command)
 
     # 명령어 실행
-    result = executor.run(cmd_string)
+    result = CommandExecutor().run(cmd_string)
 
     # stdout은 실시간으로 출력됨 (executor에서 처리)
     # 명령어가 실패했는지 확인
     if result['exit_code'] != 0 and result['stderr']:
-        stderr = result['stderr']
+        _handle_failure(cmd_string, result['stderr'], background, fresh, refresh)
 
-        # traceback 파싱
-        traceback_info = parser.parse(stderr)
+    # 원래 명령어와 동일한 exit code로 종료
+    sys.exit(result['exit_code'])
 
-        # 파일과 라인 번호를 찾으면 코드 컨텍스트 추출
-        code_context = None
-        if traceback_info['file_path'] and traceback_info['line_number']:
-            code_context = context_extractor.extract(
-                file_path=traceback_info['file_path'],
-                line_number=traceback_info['line_number']
-            )
 
-        # 민감한 정보 마스킹
-        sanitized_error = sanitizer.sanitize(stderr)
-        if code_context:
-            code_context['code_snippet'] = sanitizer.sanitize(code_context['code_snippet'])
-
-        # 백엔드로 전송해서 분석
-        try:
-            click.echo("\n🔍 Analyzing error with AI...", err=True)
-            analysis = api_client.analyze_error(
-                command=cmd_string,
-                error_log=sanitized_error,
-                code_context=code_context
+def _handle_failure(cmd_string: str, stderr: str, background: bool, fresh: bool, refresh: bool) -> None:
+    """실패한 명령어의 에러를 파싱/마스킹하고 캐시된 결과를 보여주거나 분석을 보냄"""
+    # 분석에만 쓰는 컴포넌트는 실패했을 때만 import하고 만듦
+    from wtf.parser import TracebackParser
+    from wtf.context import ContextExtractor
+    from wtf.sanitizer import Sanitizer
+    from wtf.compactor import LogCompactor
+    from wtf.cache import AnalysisCache
+    from wtf import spool
+
+    parser = TracebackParser()
+    context_extractor = ContextExtractor()
+    sanitizer = Sanitizer()
+    cache = AnalysisCache()
+
+    # traceback 파싱
+    traceback_info = parser.parse(stderr)
+
+    # 사용자 코드 프레임 몇 개의 주변 코드를 추출 (첫 번째가 에러 위치)
+    code_frames = context_extractor.extract_frames(traceback_info['frames'])
+
+    # 진행 표시줄/반복되는 줄/에러와 먼 부분을 덜어내고 민감한 정보 마스킹
+    error_log = stderr
+    if not _env_flag('WTF_NO_COMPACT'):
+        error_log, stats = LogCompactor().compact(stderr)
+        if stats['compacted_bytes'] * 2 <= stats['original_bytes']:
+            _echo(
+                f"\n✂️  Compacted error log {stats['original_bytes'] // 1024}KB → {stats['compacted_bytes'] // 1024}KB "
+                f"({stats['progress_lines']} progress, {stats['repeated_lines']} repeated, "
+                f"{stats['omitted_lines']} far-from-error lines dropped)"
             )
+    sanitized_error = sanitizer.sanitize(error_log)
+    for frame in code_frames:
+        frame['code_snippet'] = sanitizer.sanitize(frame['code_snippet'])
 
-            # 분석 결과 표시
-            click.echo("\n" + "="*50, err=True)
-            click.echo(f"📌 {analysis['case_name']}", err=True)
-            click.echo("="*50, err=True)
-            click.echo(f"\n💡 Root Cause:\n{analysis['root_cause']}\n", err=True)
-            click.echo(f"🔧 Solution:\n{analysis['solution']}\n", err=True)
-            click.echo(f"🏷️  Tags: {', '.join(analysis['tags'])}", err=True)
+    payload = {
+        'command': cmd_string,
+        'error_log': sanitized_error,
+        'code_context': code_frames[0] if code_frames else None,
+        'code_frames': code_frames
+    }
 
-            if analysis.get('similar_cases'):
-                click.echo(f"\n📚 Found {len(analysis['similar_cases'])} similar past cases", err=True)
+    # 같은 에러를 최근에 분석했으면 백엔드 없이 바로 보여줌 (오프라인에서도 동작)
+    fingerprint = cache.fingerprint(cmd_string, sanitized_error)
+    cached = None if fresh else cache.get(fingerprint)
 
-            click.echo(f"\n🌐 View details: http://localhost:3000/errors/{analysis['id']}", err=True)
+    if cached:
+        _print_cached(cached)
+        if refresh:
+            spool.enqueue(payload, fingerprint)
+            spool.spawn_sender()
+            _echo("🔄 Refreshing in the background.")
+    elif background:
+        # 보관만 하고 바로 끝냄 (분리된 프로세스가 보내고, 결과는 wtf last/show로 봄)
+        entry_id = spool.enqueue(payload, fingerprint)
+        spool.spawn_sender()
+        _echo(f"\n📮 Queued for analysis ({entry_id[:8]}). Run `wtf show {entry_id[:8]}` later.")
+    else:
+        from wtf.api_client import APIClient
+        _analyze_now(APIClient(), cache, fingerprint, payload)
 
-        except Exception as e:
-            click.echo(f"\n⚠️  Failed to analyze error: {e}", err=True)
 
-    # 원래 명령어와 동일한 exit code로 종료
-    sys.exit(result['exit_code'])
+def _analyze_now(api_client: 'APIClient', cache: 'AnalysisCache', fingerprint: str, payload: dict) -> None:
+    """백엔드로 보내서 결과를 기다렸다가 표시함 (보내지 못하면 보관해서 나중에 보냄)"""
+    import uuid
+    from wtf.api_client import APIError
+    from wtf import spool
+
+    # 시간 초과 후 다시 보내도 백엔드가 같은 분석을 재사용하도록 실행마다 키를 만들고,
+    # 보관해서 다시 보낼 때도 같은 키를 씀
+    entry_id = str(uuid.uuid4())
+    try:
+        _echo("\n🔍 Analyzing error with AI...")
+        analysis = api_client.analyze_error(
+            command=payload['command'],
+            error_log=payload['error_log'],
+            code_context=payload['code_context'],
+            code_frames=payload['code_frames'],
+            idempotency_key=entry_id
+        )
+        spool.save_result(entry_id, payload, analysis)
+        cache.put(fingerprint, analysis)
+        _print_analysis(analysis)
+    except APIError as e:
+        _echo(f"\n⚠️  Failed to analyze error: {e}")
+        if e.retryable:
+            _queue_retry(payload, fingerprint, entry_id)
+    except Exception as e:
+        # 예상하지 못한 응답 등: 요청은 잃지 않도록 보관함 (같은 키라 백엔드에서 이미 끝났으면 결과만 다시 받음)
+        _echo(f"\n⚠️  Failed to analyze error: {e}")
+        _queue_retry(payload, fingerprint, entry_id)
+
+
+def _queue_retry(payload: dict, fingerprint: str, entry_id: str) -> None:
+    """이미 보낸 Idempotency-Key 그대로 요청을 보관하고 분리된 프로세스가 다시 보내게 함"""
+    from wtf import spool
+
+    spool.enqueue(payload, fingerprint, entry_id=entry_id)
+    spool.spawn_sender()
+    _echo(f"📮 Queued for retry ({entry_id[:8]}). Run `wtf show {entry_id[:8]}` later.")
+
+
+def _print_cached(entry: dict) -> None:
+    """캐시된 분석 결과를 언제 분석한 것인지와 함께 표시함"""
+    age = time.time() - entry['cached_at']
+    if age < 3600:
+        ago = f"{int(age // 60)}m"
+    elif age < 86400:
+        ago = f"{int(age // 3600)}h"
+    else:
+        ago = f"{int(age // 86400)}d"
+    _echo(f"\n⚡ Same error as before (analyzed {ago} ago). Use --fresh to re-analyze.")
+    _print_analysis(entry['analysis'])
+
+
+def _show_entry(prefix) -> None:
+    """보관된 분석 요청의 상태나 결과를 표시함 (prefix가 없으면 가장 최근 것)"""
+    from wtf import spool
+
+    entry = spool.find(prefix)
+    if entry is None:
+        _echo("No analyses found.")
+        sys.exit(1)
+
+    command = entry.get('command') or entry.get('payload', {}).get('command', '')
+    _echo(f"🆔 {entry['id'][:8]}  $ {command}")
+
+    if entry['status'] == 'done':
+        _print_analysis(entry['analysis'])
+    elif entry['status'] == 'pending':
+        _echo(f"⏳ Waiting to be analyzed (attempts: {entry['attempts']})")
+        if entry.get('last_error'):
+            _echo(f"   Last error: {entry['last_error']}")
+        # 보내는 프로세스가 끝났을 수도 있으므로 다시 띄움
+        spool.spawn_sender()
+    else:
+        _echo(f"❌ Analysis failed: {entry.get('last_error')}")
+
+
+def _print_analysis(analysis: dict) -> None:
+    """분석 결과 표시"""
+    _echo("\n" + "="*50)
+    _echo(f"📌 {analysis['case_name']}")
+    _echo("="*50)
+    _echo(f"\n💡 Root Cause:\n{analysis['root_cause']}\n")
+    _echo(f"🔧 Solution:\n{analysis['solution']}\n")
+    _echo(f"🏷️  Tags: {', '.join(analysis['tags'])}")
+
+    if analysis.get('similar_cases'):
+        _echo(f"\n📚 Found {len(analysis['similar_cases'])} similar past cases")
+
+    _echo(f"\n🌐 View details: http://localhost:3000/errors/{analysis['id']}")
+
+
+def _echo(message: str) -> None:
+    """명령어 출력과 섞이지 않도록 wtf의 메시지는 stderr로 냄"""
+    print(message, file=sys.stderr, flush=True)
+
+
+def _is_subcommand(args: list) -> bool:
+    return args == ['last'] or (len(args) == 2 and args[0] == 'show')
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, '').strip().lower() in _TRUE_VALUES
+
+
+def _load_env() -> None:
+    """
+    .env를 읽어서 환경 변수로 설정함 (이미 있는 값은 덮어쓰지 않음)
+    python-dotenv의 load_dotenv()처럼 이 패키지 위치부터 위로 찾고,
+    .env가 없으면 python-dotenv를 import하지 않음
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 
 if __name__ == '__main__':
-    cli()
+    main()
@@ -1,68 +1,326 @@
 """
 Traceback 파서 모듈
-에러 로그에서 파일 경로와 라인 번호를 추출함
+에러 로그에서 스택 프레임(파일 경로, 라인 번호, 함수)을 추출함
+
+언어마다 프레임/블록 시작 패턴을 LANGUAGES에 등록하고, 등록된 패턴을 모두 합친
+정규식 하나로 로그를 한 번만 훑음. 새 언어는 register(Language(...))로 추가함
 """
 
+import os
 import re
-from typing import Optional
+from typing import List, Optional
+
+# 로그가 이보다 길면 마지막 부분만 봄 (traceback은 보통 끝에 있음)
+MAX_SCAN_CHARS = 256 * 1024
+
+# 프레임 분류
+USER = 'user'
+SITE_PACKAGES = 'site-packages'
+NODE_MODULES = 'node_modules'
+STDLIB = 'stdlib'
+LIBRARY = 'library'
+
+
+class Language:
+    def __init__(
+        self,
+        name: str,
+        frames: List[str],
+        block_starts: List[str] = (),
+        language: Optional[str] = None,
+        outermost_first: bool = False,
+        contiguous: bool = False,
+        classify=None
+    ):
+        """
+        언어별 traceback 형식
+
+        Args:
+            name: 등록 이름
+            frames: 프레임 한 개에 맞는 패턴 (줄 시작 기준, file/line 그룹 필수, func 그룹 선택)
+            block_starts: 새 traceback(연쇄 예외, 다른 테스트 등)이 시작되는 줄 패턴
+                (file/line 그룹이 있으면 프레임으로도 씀)
+            language: 결과에 쓰는 언어 이름 (기본 name)
+            outermost_first: 바깥 호출부터 찍는 형식인지 (Python, pytest)
+            contiguous: 프레임이 줄줄이 붙어서 나오는 형식이면 사이에 다른 줄이 끼었을 때 새 블록으로 봄
+            classify: (file_path, function) -> (분류, 정리한 file_path) 함수
+        """
+        self.name = name
+        self.frames = list(frames)
+        self.block_starts = list(block_starts)
+        self.language = language or name
+        self.outermost_first = outermost_first
+        self.contiguous = contiguous
+        self.classify = classify or _classify_path
+
+
+LANGUAGES: List[Language] = []
+
+
+def register(language: Language) -> Language:
+    """언어를 등록함 (이후 만드는 TracebackParser부터 적용)"""
+    LANGUAGES.append(language)
+    return language
 
 
 class TracebackParser:
+    def __init__(self, max_scan_chars: int = MAX_SCAN_CHARS):
+        """
+        등록된 언어 패턴을 정규식 하나로 컴파일함
+
+        Args:
+            max_scan_chars: 로그에서 볼 마지막 부분의 최대 길이 (0이면 전체)
+        """
+        self.max_scan_chars = max_scan_chars
+        self.patterns = []  # 그룹 번호 순서대로 (언어, 블록 시작인지)
+        alternatives = []
+        for language in LANGUAGES:
+            for regex, starts_block in [(r, False) for r in language.frames] + [(r, True) for r in language.block_starts]:
+                index = len(self.patterns)
+                # 대안마다 그룹 이름이 겹치지 않도록 접두사를 붙임
+                regex = regex.replace('(?P<', f'(?P<p{index}_')
+                alternatives.append(f'(?P<p{index}>{regex})')
+                self.patterns.append((language, starts_block))
+
+        self.regex = re.compile('^(?:' + '|'.join(alternatives) + ')', re.MULTILINE)
+
     def parse(self, error_log: str) -> dict:
         """
-        traceback을 파싱해서 파일 경로와 라인 번호를 추출함
+        traceback을 파싱해서 모든 프레임을 추출하고 실패한 위치를 고름
+
+        지원하는 형식: Python(연쇄 예외 포함), pytest, Node.js, Java(Caused by), Go, Rust
 
-        지원하는 형식:
-        - Python: File "path/to/file.py", line 42
-        - Node.js: at /path/to/file.js:42:10
-        - Java: at ClassName.method(FileName.java:42)
+        실패한 위치는 마지막 traceback(Python은 최종 예외, Java는 가장 안쪽 원인)에서
+        가장 안쪽의 사용자 코드 프레임 (라이브러리/표준 라이브러리 프레임은 건너뜀)
 
         Returns:
-            file_path, line_number, language를 담은 dict
+            file_path, line_number, function, language: 실패한 위치 (못 찾으면 None, 'unknown')
+            frames: 마지막 traceback의 프레임 (안쪽부터)
+            tracebacks: 로그에 나온 traceback마다 프레임 목록 (로그 순서)
+            각 프레임은 file_path, line_number, function, language, category(user/site-packages/
+            node_modules/stdlib/library)를 담은 dict
         """
-        # Python 패턴
-        python_pattern = r'File "([^"]+)", line (\d+)'
-        match = re.search(python_pattern, error_log)
-        if match:
-            return {
-                'file_path': match.group(1),
-                'line_number': int(match.group(2)),
-                'language': 'python'
-            }
-
-        # Node.js 패턴
-        node_pattern = r'at .+ \(([^:]+):(\d+):\d+\)'
-        match = re.search(node_pattern, error_log)
-        if match:
-            return {
-                'file_path': match.group(1),
-                'line_number': int(match.group(2)),
-                'language': 'javascript'
-            }
-
-        # Node.js 대체 패턴
-        node_pattern2 = r'at ([^:]+):(\d+):\d+'
-        match = re.search(node_pattern2, error_log)
-        if match and not match.group(1).startswith('Object.'):
-            return {
-                'file_path': match.group(1),
-                'line_number': int(match.group(2)),
-                'language': 'javascript'
-            }
-
-        # Java 패턴
-        java_pattern = r'at .+\(([^:]+):(\d+)\)'
-        match = re.search(java_pattern, error_log)
-        if match:
-            return {
-                'file_path': match.group(1),
-                'line_number': int(match.group(2)),
-                'language': 'java'
-            }
-
-        # traceback을 찾지 못함
+        text = error_log
+        if self.max_scan_chars and len(text) > self.max_scan_chars:
+            text = text[-self.max_scan_chars:]
+            text = text[text.find('\n') + 1:]
+
+        blocks = self._scan(text)
+        frames = blocks[-1] if blocks else []
+        target = self._innermost_user_frame(blocks)
+
+        return {
+            'file_path': target['file_path'] if target else None,
+            'line_number': target['line_number'] if target else None,
+            'function': target['function'] if target else None,
+            'language': target['language'] if target else 'unknown',
+            'frames': frames,
+            'tracebacks': blocks
+        }
+
+    def _scan(self, text: str) -> List[List[dict]]:
+        """로그를 한 번 훑어서 traceback 블록별 프레임 목록을 만듦 (각 블록은 안쪽 프레임부터)"""
+        blocks = []
+        current = []
+        current_language = None
+        last_end = None
+
+        def close():
+            if current:
+                if current_language.outermost_first:
+                    current.reverse()
+                blocks.append(list(current))
+                current.clear()
+
+        for match in self.regex.finditer(text):
+            name = match.lastgroup
+            language, starts_block = self.patterns[int(name[1:])]
+            is_frame = match.group(f'{name}_file') if f'{name}_file' in self.regex.groupindex else None
+
+            new_block = (
+                starts_block
+                or language is not current_language
+                or (language.contiguous and last_end is not None and text[last_end:match.start()].strip())
+            )
+            if new_block:
+                close()
+                current_language = language
+
+            if is_frame:
+                current.append(self._frame(language, match, name))
+            last_end = match.end()
+
+        close()
+        return blocks
+
+    @staticmethod
+    def _frame(language: Language, match, name: str) -> dict:
+        file_path = match.group(f'{name}_file').strip()
+        function = match.group(f'{name}_func') if f'{name}_func' in match.re.groupindex else None
+        if function:
+            function = function.strip()
+        category, file_path = language.classify(file_path, function)
         return {
-            'file_path': None,
-            'line_number': None,
-            'language': 'unknown'
+            'file_path': file_path,
+            'line_number': int(match.group(f'{name}_line')),
+            'function': function,
+            'language': language.language,
+            'category': category
         }
+
+    @staticmethod
+    def _innermost_user_frame(blocks: List[List[dict]]) -> Optional[dict]:
+        """마지막 블록부터 거슬러 올라가며 가장 안쪽 사용자 프레임을 찾고, 없으면 마지막 블록의 첫 프레임"""
+        for frames in reversed(blocks):
+            for frame in frames:
+                if frame['category'] == USER:
+                    return frame
+        for frames in reversed(blocks):
+            if frames:
+                return frames[0]
+        return None
+
+
+_PYTHON_STDLIB = re.compile(r'[/\\]lib[/\\]python\d(?:\.\d+)?[/\\]|[/\\]Lib[/\\]')
+
+
+def _classify_path(file_path: str, function: Optional[str] = None):
+    """경로로 프레임을 분류함 (분류, file_path)"""
+    normalized = file_path.replace('\\', '/')
+    if '/site-packages/' in normalized or '/dist-packages/' in normalized:
+        return SITE_PACKAGES, file_path
+    if '/node_modules/' in normalized or normalized.startswith('node_modules/'):
+        return NODE_MODULES, file_path
+    return USER, file_path
+
+
+def _classify_python(file_path: str, function: Optional[str] = None):
+    category, file_path = _classify_path(file_path)
+    if category == USER and (file_path.startswith('<') or _PYTHON_STDLIB.search(file_path)):
+        # <frozen importlib._bootstrap>, <string> 같은 가짜 경로도 읽을 수 없으므로 사용자 코드로 보지 않음
+        category = STDLIB
+    return category, file_path
+
+
+def _classify_node(file_path: str, function: Optional[str] = None):
+    if file_path.startswith('file://'):
+        file_path = file_path[len('file://'):]
+    if file_path.startswith(('node:', 'internal/')) or file_path == '<anonymous>':
+        return STDLIB, file_path
+    return _classify_path(file_path)
+
+
+_JAVA_STDLIB = ('java.', 'javax.', 'jdk.', 'sun.', 'com.sun.', 'kotlin.', 'scala.')
+_JAVA_LIBRARY = (
+    'org.junit.', 'junit.', 'org.springframework.', 'org.apache.', 'org.hibernate.', 'com.google.',
+    'io.netty.', 'org.gradle.', 'org.mockito.', 'kotlinx.', 'com.fasterxml.', 'reactor.'
+)
+_JAVA_SOURCE_ROOTS = ('src/main/java', 'src/test/java', 'src/main/kotlin', 'src/test/kotlin', 'src', '.')
+
+
+def _classify_java(file_path: str, function: Optional[str] = None):
+    """Java 프레임은 파일 이름만 있으므로 패키지 이름으로 분류하고 소스 경로를 찾아봄"""
+    # app//com.example.Foo.bar 같은 모듈/클래스로더 접두사를 뗌
+    qualified = (function or '').rsplit('/', 1)[-1]
+    if qualified.startswith(_JAVA_STDLIB):
+        return STDLIB, file_path
+    if qualified.startswith(_JAVA_LIBRARY):
+        return LIBRARY, file_path
+
+    class_name = qualified.rsplit('.', 1)[0]
+    if '.' in class_name:
+        relative = os.path.join(*class_name.rsplit('.', 1)[0].split('.'), file_path)
+        for root in _JAVA_SOURCE_ROOTS:
+            candidate = os.path.normpath(os.path.join(root, relative))
+            if os.path.isfile(candidate):
+                return USER, candidate
+    return USER, file_path
+
+
+def _classify_go(file_path: str, function: Optional[str] = None):
+    normalized = file_path.replace('\\', '/')
+    if '/pkg/mod/' in normalized or '/vendor/' in normalized:
+        return LIBRARY, file_path
+    if (function or '').startswith(('runtime.', 'testing.')) or '/go/src/' in normalized or normalized.startswith('/usr/lib/go'):
+        return STDLIB, file_path
+    return USER, file_path
+
+
+def _classify_rust(file_path: str, function: Optional[str] = None):
+    normalized = file_path.replace('\\', '/')
+    if normalized.startswith('/rustc/') or '/library/std/' in normalized or '/library/core/' in normalized:
+        return STDLIB, file_path
+    if '/.cargo/registry/' in normalized or '/.cargo/git/' in normalized:
+        return LIBRARY, file_path
+    return USER, file_path
+
+
+register(Language(
+    'python',
+    frames=[r'[ \t]*File "(?P<file>[^"\n]+)", line (?P<line>\d+)(?:, in (?P<func>[^\n]+))?'],
+    block_starts=[r'Traceback \(most recent call last\):'],
+    outermost_first=True,
+    classify=_classify_python
+))
+
+register(Language(
+    'pytest',
+    language='python',
+    # tests/test_app.py:12: in test_divide / src/app.py:3: ZeroDivisionError / "tests/test_app.py:9: "(long 모드)
+    frames=[r'(?P<file>[^\s:"][^:\n]*\.py):(?P<line>\d+): (?:in (?P<func>[^\n]+)|[A-Za-z_]|[ \t]*$)'],
+    # ____________________ test_divide ____________________
+    block_starts=[r'_{3,} [^\n]+ _{3,}[ \t]*$'],
+    outermost_first=True,
+    classify=_classify_python
+))
+
+register(Language(
+    'node',
+    language='javascript',
+    frames=[
+        # at handler (/app/src/server.js:10:5), at async Promise.all (index 0)은 위치가 없어서 제외
+        r'[ \t]+at (?:async )?(?P<func>[^\n()]+?) \((?P<file>[^\n()]+?):(?P<line>\d+):\d+\)[ \t]*$',
+        # at /app/src/server.js:10:5 (cause가 붙은 에러는 마지막 프레임 뒤에 " {")
+        r'[ \t]+at (?:async )?(?P<file>[^\n() ]+?):(?P<line>\d+):\d+(?:[ \t]*\{)?[ \t]*$',
+    ],
+    contiguous=True,
+    classify=_classify_node
+))
+
+register(Language(
+    'java',
+    frames=[r'[ \t]+at (?P<func>[\w$.<>/-]+)\((?P<file>[^\n():]+):(?P<line>\d+)\)'],
+    block_starts=[r'(?:Exception in thread "[^"\n]*" |Caused by: )'],
+    contiguous=True,
+    classify=_classify_java
+))
+
+register(Language(
+    'go',
+    frames=[
+        # panic 스택: 함수 줄 다음 줄에 탭 + 경로:라인
+        r'(?P<func>[^\s(][^\n]*?)\([^\n()]*\)\n\t(?P<file>[^\n:]+\.go):(?P<line>\d+)',
+        # go test 실패: "    app_test.go:12: expected 3, got 4"
+        r'[ \t]+(?P<file>[\w./-]+_test\.go):(?P<line>\d+): ',
+        # go build/vet 에러: "./main.go:8:2: undefined: x"
+        r'(?P<file>\.{0,2}/?[\w./-]+\.go):(?P<line>\d+):\d+: ',
+    ],
+    block_starts=[r'goroutine \d+ \['],
+    classify=_classify_go
+))
+
+register(Language(
+    'rust',
+    frames=[
+        # RUST_BACKTRACE=1 프레임: "   3: app::main\n             at ./src/main.rs:4:5"
+        r'[ \t]*\d+: (?P<func>[^\n]+)\n[ \t]+at (?P<file>[^\n:]+\.rs):(?P<line>\d+)',
+        # 컴파일 에러 위치: "  --> src/main.rs:4:5"
+        r'[ \t]*--> (?P<file>[^\n:]+\.rs):(?P<line>\d+)',
+    ],
+    block_starts=[
+        # panic 위치 (새 형식 "panicked at src/main.rs:4:5:", 예전 형식 "panicked at 'msg', src/main.rs:4:5")
+        r"thread '[^'\n]*' panicked at (?:'[^\n]*', )?(?P<file>[^\n:']+\.rs):(?P<line>\d+)",
+        r'error(?:\[E\d+\])?: ',
+    ],
+    classify=_classify_rust
+))
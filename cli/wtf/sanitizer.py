@@ -5,25 +5,60 @@
 
 import re
 import os
-from dotenv import load_dotenv
+from typing import Iterable, Iterator, List, Tuple
 
-load_dotenv()
+# 이름에 이 단어가 들어간 환경 변수의 값은 로그에 그대로 나와도 가림
+SECRET_ENV_NAME = re.compile(r'KEY|TOKEN|SECRET|PASSWORD|PASSWD|CREDENTIAL|AUTH|PRIVATE|SESSION|COOKIE|DSN')
+# 이보다 짧은 값은 흔한 문자열과 겹칠 수 있어서 리터럴로 찾지 않음
+MIN_SECRET_LENGTH = 8
+# 이름 뒤에 값이 할당되는 형태 (key: value, key="value", KEY=value)
+KEY_NAMES = ['api_key', 'api-key', 'apikey', 'token', 'password', 'secret']
+ASSIGNMENT = r'["\t ]*[=:]["\t ]*[^\s"\']+'
+NAME_END = re.compile(r'["\t =:]')
+# sanitize_stream()이 줄바꿈을 못 찾아도 이만큼 모이면 처리해서 내보냄
+MAX_PENDING_CHARS = 1024 * 1024
 
 
 class Sanitizer:
-    def __init__(self):
-        """마스킹할 패턴들로 sanitizer 초기화"""
-        self.patterns = [
+    def __init__(self, environ=None):
+        """
+        마스킹 규칙을 하나의 정규식으로 컴파일함 (텍스트를 한 번만 훑음)
+
+        Args:
+            environ: 참조할 환경 변수 (기본 os.environ, 만들 때의 값을 씀)
+        """
+        environ = dict(os.environ if environ is None else environ)
+
+        secrets = self._secret_values(environ)
+        env_names = [name for name, value in environ.items() if value and re.fullmatch(r'[A-Z_]+', name)]
+
+        # (종류, 시작 문자열들, 시작 문자 바로 뒤에 확인할 조건, 뒤에 이어지는 패턴), 순서가 우선순위
+        rules = [
+            # 환경 변수에 들어있는 실제 비밀 값 (키 이름 없이 값만 찍힌 경우)
+            ('secret', secrets, '', ''),
             # API 키와 토큰
-            (r'(api[_-]?key|token|password|secret)["\s]*[=:]["\s]*([^\s"\']+)', r'\1=***'),
-            # 환경 변수 패턴
-            (r'([A-Z_]+)["\s]*=["\s]*([^\s"\']+)', self._mask_env_var),
+            ('key', KEY_NAMES, '', ASSIGNMENT),
+            # 값이 있는 환경 변수의 할당 (NAME=value, 앞에 대문자/_가 붙은 더 긴 이름은 제외)
+            ('env', env_names, r'(?<![A-Z_].)', ASSIGNMENT.replace('[=:]', '=')),
             # IP 주소
-            (r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'xxx.xxx.xxx.xxx'),
+            ('ip', list('0123456789'), r'(?<!\w.)', r'[0-9]{0,2}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\b'),
             # 홈 디렉토리 경로
-            (re.escape(os.path.expanduser('~')), '~'),
+            ('home', [os.path.expanduser('~')], '', ''),
         ]
 
+        # 모든 규칙을 "첫 글자 + 나머지" 대안으로 펼쳐서 하나의 정규식으로 합침
+        # 대안이 모두 글자 하나로 시작하면 re가 첫 글자 집합으로 후보 위치만 골라서 보므로,
+        # 규칙을 | 로 그냥 이은 것보다 훨씬 빠름. 대안 끝의 빈 그룹 번호로 어느 규칙인지 구분함
+        alternatives = []
+        self.kinds = [None]
+        for kind, words, guard, suffix in rules:
+            for first, rest in _literal_alternatives(words):
+                alternatives.append(f'{re.escape(first)}{guard}{rest}{suffix}()')
+                self.kinds.append(kind)
+
+        self.pattern = re.compile('|'.join(alternatives))
+        self.longest_secret = max((len(secret) for secret in secrets), default=0)
+
     def sanitize(self, text: str) -> str:
         """
         텍스트에서 민감한 정보를 제거함
@@ -34,19 +69,80 @@ class Sanitizer:
         Returns:
             민감정보가 제거된 텍스트
         """
-        result = text
-
-        for pattern, replacement in self.patterns:
-            if callable(replacement):
-                result = re.sub(pattern, replacement, result)
-            else:
-                result = re.sub(pattern, replacement, result)
-
-        return result
-
-    def _mask_env_var(self, match):
-        """환경 변수가 존재하면 마스킹함"""
-        var_name = match.group(1)
-        if os.getenv(var_name):
-            return f'{var_name}=***'
-        return match.group(0)
+        return self.pattern.sub(self._replace, text)
+
+    def sanitize_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        큰 로그를 조각 단위로 마스킹해서 돌려줌 (전체를 메모리에 올리지 않음)
+        규칙은 한 줄 안에서만 맞으므로 마지막 줄바꿈까지 처리하고 나머지는 다음 조각과 이어서 봄
+
+        Args:
+            chunks: 로그 조각 (크기와 경계는 상관없음)
+        """
+        pending = ''
+        for chunk in chunks:
+            pending += chunk
+            cut = pending.rfind('\n') + 1
+            if not cut and len(pending) >= MAX_PENDING_CHARS:
+                # 아주 긴 한 줄: 비밀 값이 경계에 걸리지 않도록 가장 긴 값만큼 남기고 처리함
+                cut = len(pending) - self.longest_secret
+            if cut > 0:
+                yield self.sanitize(pending[:cut])
+                pending = pending[cut:]
+        if pending:
+            yield self.sanitize(pending)
+
+    def _replace(self, match) -> str:
+        kind = self.kinds[match.lastindex]
+        if kind == 'secret':
+            return '***'
+        if kind in ('key', 'env'):
+            text = match.group(0)
+            return f'{text[:NAME_END.search(text).start()]}=***'
+        if kind == 'ip':
+            return 'xxx.xxx.xxx.xxx'
+        return '~'
+
+    @staticmethod
+    def _secret_values(environ: dict) -> List[str]:
+        """이름이 비밀처럼 보이는 환경 변수의 값 (여러 줄 값은 줄마다)"""
+        values = set()
+        for name, value in environ.items():
+            if not SECRET_ENV_NAME.search(name.upper()):
+                continue
+            for line in value.splitlines():
+                line = line.strip()
+                if len(line) >= MIN_SECRET_LENGTH:
+                    values.add(line)
+        return sorted(values)
+
+
+def _literal_alternatives(words: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    문자열 목록을 공통 접두사로 묶은 트라이로 만들고, 첫 글자마다 (첫 글자, 나머지 정규식)을 돌려줌
+    (Aho-Corasick처럼 한 위치에서 모든 후보를 한 글자씩 함께 따라가므로 후보가 많아도 빠름)
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return [(char, _trie_to_pattern(child)) for char, child in sorted(trie.items()) if char]
+
+
+def _trie_to_pattern(node: dict) -> str:
+    prefix = ''
+    # 갈라지지 않는 구간은 한 번에 이어 붙임 (긴 값에서 재귀가 깊어지지 않게)
+    while len(node) == 1 and '' not in node:
+        char, node = next(iter(node.items()))
+        prefix += re.escape(char)
+
+    branches = [re.escape(char) + _trie_to_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return prefix
+    pattern = branches[0] if len(branches) == 1 else f'(?:{"|".join(branches)})'
+    if '' in node:
+        # 여기서 끝나는 후보가 있으면 나머지는 선택 사항 (탐욕적이라 긴 후보를 먼저 시도함)
+        pattern = f'(?:{pattern})?'
+    return prefix + pattern
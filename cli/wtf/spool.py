@@ -0,0 +1,285 @@
+"""
+분석 요청 보관(spool) 모듈
+분석할 에러를 로컬 디렉토리에 보관하고, 분리된 백그라운드 프로세스가 모아서 백엔드로 보냄
+
+디렉토리 구조 (WTF_SPOOL_DIR, 기본 ~/.local/state/wtf/spool):
+    pending/<id>.json   보낼 요청 (payload, 시도 횟수, 다음 시도 시각)
+    results/<id>.json   받은 분석 결과
+    failed/<id>.json    재시도를 다 써도 실패한 요청
+    sender.lock         보내는 프로세스가 하나만 돌도록 잡는 잠금
+
+실행: python -m wtf.spool (spawn_sender()가 분리된 프로세스로 띄움)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+from wtf.cache import AnalysisCache
+
+try:
+    import fcntl
+except ImportError:  # Windows에서는 잠금 없이 실행 (보내는 프로세스가 겹칠 수 있음)
+    fcntl = None
+
+PENDING = 'pending'
+RESULTS = 'results'
+FAILED = 'failed'
+
+# 한 번에 보내는 요청 수
+BATCH_SIZE = 20
+# 요청 하나당 최대 시도 횟수
+MAX_ATTEMPTS = 8
+# 재시도 간격 (초, 시도할 때마다 두 배, 최대 MAX_BACKOFF)
+BASE_BACKOFF = 2
+MAX_BACKOFF = 300
+# 보내는 프로세스가 재시도를 기다리며 살아있는 최대 시간 (초)
+SENDER_LIFETIME = 15 * 60
+# 보관하는 결과/실패 파일 최대 개수 (오래된 것부터 지움)
+MAX_KEPT = 200
+
+
+def spool_dir() -> str:
+    """spool 디렉토리 경로 (WTF_SPOOL_DIR > XDG_STATE_HOME > 플랫폼 기본값)"""
+    if os.getenv('WTF_SPOOL_DIR'):
+        return os.getenv('WTF_SPOOL_DIR')
+    if os.name == 'nt':
+        base = os.getenv('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.getenv('XDG_STATE_HOME', os.path.expanduser('~/.local/state'))
+    return os.path.join(base, 'wtf', 'spool')
+
+
+def enqueue(payload: dict, fingerprint: Optional[str] = None, entry_id: Optional[str] = None) -> str:
+    """
+    분석 요청을 pending에 저장함
+
+    Args:
+        payload: /api/analyze 본문 (command, error_log, code_context, code_frames)
+        fingerprint: 결과를 분석 캐시에 넣을 때 쓸 에러 fingerprint
+        entry_id: 이미 이 id를 Idempotency-Key로 보냈으면 그 id (없으면 새로 만듦)
+
+    Returns:
+        요청 id (백엔드에 Idempotency-Key로도 쓰므로 재시도해도 분석은 한 번만 됨)
+    """
+    if entry_id is None:
+        entry_id = str(uuid.uuid4())
+    _write(PENDING, entry_id, {
+        'id': entry_id,
+        'created_at': time.time(),
+        'payload': payload,
+        'fingerprint': fingerprint,
+        'attempts': 0,
+        'next_attempt_at': 0,
+        'last_error': None
+    })
+    return entry_id
+
+
+def save_result(entry_id: str, payload: dict, analysis: dict) -> None:
+    """동기 모드에서 받은 결과도 results에 남겨서 wtf last/show로 다시 볼 수 있게 함"""
+    _write(RESULTS, entry_id, {
+        'id': entry_id,
+        'created_at': time.time(),
+        'command': payload.get('command'),
+        'analysis': analysis
+    })
+
+
+def find(prefix: Optional[str] = None) -> Optional[dict]:
+    """
+    id(앞부분만 써도 됨)로 요청을 찾음, prefix가 없으면 가장 최근 요청
+
+    Returns:
+        저장된 dict에 status(pending/done/failed)를 더한 것, 없으면 None
+    """
+    candidates = []
+    for state, status in ((RESULTS, 'done'), (PENDING, 'pending'), (FAILED, 'failed')):
+        for name in _list(state):
+            entry_id = name[:-len('.json')]
+            if prefix and not entry_id.startswith(prefix):
+                continue
+            entry = _read(state, entry_id)
+            if entry is not None:
+                entry['status'] = status
+                candidates.append(entry)
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda entry: entry.get('created_at', 0))
+
+
+def spawn_sender() -> None:
+    """보내는 프로세스를 터미널과 분리해서 띄움 (이미 돌고 있으면 새 프로세스는 바로 끝남)"""
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+
+    subprocess.Popen(
+        [sys.executable, '-m', 'wtf.spool'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs
+    )
+
+
+def run_sender() -> None:
+    """
+    pending의 요청을 BATCH_SIZE개씩 보냄
+    실패하면 지수 백오프로 다시 시도하고, 남은 요청이 없거나 SENDER_LIFETIME이 지나면 끝남
+    """
+    deadline = time.time() + SENDER_LIFETIME
+    while _flush(deadline):
+        # 잠금을 푸는 사이에 들어온 요청은 새 프로세스가 잠금을 못 잡고 끝났을 수 있으므로 다시 확인함
+        if not _list(PENDING) or time.time() >= deadline:
+            break
+
+
+def _flush(deadline: float) -> bool:
+    """
+    잠금을 잡고 pending이 빌 때까지(또는 deadline까지) 보냄
+
+    Returns:
+        잠금을 잡았는지 (다른 프로세스가 보내는 중이면 False)
+    """
+    os.makedirs(spool_dir(), mode=0o700, exist_ok=True)
+    lock_file = open(os.path.join(spool_dir(), 'sender.lock'), 'a+')
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False  # 다른 프로세스가 보내는 중 (새로 들어온 요청도 그 프로세스가 처리함)
+
+    # requests import는 느리므로 보내는 프로세스에서만 함
+    from wtf.api_client import APIClient
+
+    client = APIClient()
+    try:
+        while time.time() < deadline:
+            pending = [
+                entry for entry in (_read(PENDING, name[:-len('.json')]) for name in _list(PENDING))
+                if entry
+            ]
+            if not pending:
+                break
+
+            now = time.time()
+            due = sorted(
+                (entry for entry in pending if entry['next_attempt_at'] <= now),
+                key=lambda entry: entry['created_at']
+            )[:BATCH_SIZE]
+
+            if not due:
+                wake_at = min(entry['next_attempt_at'] for entry in pending)
+                time.sleep(max(0.5, min(wake_at, deadline) - now))
+                continue
+
+            for entry in due:
+                _send(client, entry)
+
+        _prune(RESULTS)
+        _prune(FAILED)
+    finally:
+        lock_file.close()
+    return True
+
+
+def _send(client, entry: dict) -> None:
+    """요청 하나를 보내고 결과에 따라 results/failed로 옮기거나 다음 시도를 예약함"""
+    from wtf.api_client import APIError
+
+    payload = entry['payload']
+    try:
+        analysis = client.analyze_error(
+            command=payload['command'],
+            error_log=payload['error_log'],
+            code_context=payload.get('code_context'),
+            code_frames=payload.get('code_frames'),
+            idempotency_key=entry['id']
+        )
+    except APIError as e:
+        entry['attempts'] += 1
+        entry['last_error'] = str(e)
+        if not e.retryable or entry['attempts'] >= MAX_ATTEMPTS:
+            _write(FAILED, entry['id'], entry)
+            _remove(PENDING, entry['id'])
+        else:
+            backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (entry['attempts'] - 1))
+            entry['next_attempt_at'] = time.time() + backoff
+            _write(PENDING, entry['id'], entry)
+        return
+
+    _write(RESULTS, entry['id'], {
+        'id': entry['id'],
+        'created_at': entry['created_at'],
+        'command': payload['command'],
+        'analysis': analysis
+    })
+    _remove(PENDING, entry['id'])
+
+    if entry.get('fingerprint'):
+        AnalysisCache().put(entry['fingerprint'], analysis)
+
+
+def _path(state: str, entry_id: str) -> str:
+    return os.path.join(spool_dir(), state, f'{entry_id}.json')
+
+
+def _write(state: str, entry_id: str, data: dict) -> None:
+    """임시 파일에 쓰고 이름을 바꿔서 읽는 쪽이 반쯤 쓴 파일을 보지 않게 함"""
+    path = _path(state, entry_id)
+    # 마스킹했어도 에러 로그가 들어있으므로 본인만 읽을 수 있게 만듦
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read(state: str, entry_id: str) -> Optional[dict]:
+    try:
+        with open(_path(state, entry_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove(state: str, entry_id: str) -> None:
+    try:
+        os.remove(_path(state, entry_id))
+    except FileNotFoundError:
+        pass
+
+
+def _list(state: str) -> List[str]:
+    try:
+        return [name for name in os.listdir(os.path.join(spool_dir(), state)) if name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+
+
+def _prune(state: str) -> None:
+    """MAX_KEPT개를 넘는 오래된 파일을 지움"""
+    directory = os.path.join(spool_dir(), state)
+    paths = [os.path.join(directory, name) for name in _list(state)]
+    if len(paths) <= MAX_KEPT:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:-MAX_KEPT]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == '__main__':
+    run_sender()